@@ -8,53 +8,175 @@ https://github.com/ludeeus/evmate
 from __future__ import annotations
 
 from datetime import timedelta
+from pathlib import Path
 from typing import TYPE_CHECKING
 
-from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT, Platform
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.const import (
+    CONF_IP_ADDRESS,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+    Platform,
+)
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 from homeassistant.loader import async_get_loaded_integration
 
+from .analytics import EVMateEnergyCosts, Tariff
 from .api import IntegrationEvmateApiClient
-from .const import DOMAIN, LOGGER
+from .archive import EVMateArchiver
+from .balancer import EVMateBalancer
+from .const import (
+    CONF_ARCHIVE,
+    CONF_BALANCER,
+    CONF_ENDPOINT_INTERVALS,
+    CONF_SLOW_REFRESH,
+    CONF_STREAMING,
+    DEFAULT_ENDPOINT_INTERVALS,
+    DEFAULT_SLOW_REFRESH,
+    DOMAIN,
+    ENDPOINTS,
+    LOGGER,
+)
 from .coordinator import EVMateDataUpdateCoordinator
 from .data import IntegrationEVMateData
+from .evse import EVMateEvseTracker
+from .fleet import async_get_fleet
+from .history import EVMateEnergyHistory
+from .services import async_setup_services
+from .statistics import EVMateStatisticsImporter
+from .stream import EVMateStreamer
+from .write import EVMateWriter
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
     from .data import IntegrationEVMateConfigEntry
 
+SNAPSHOT_STORAGE_VERSION = 1
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
 PLATFORMS: list[Platform] = [
     Platform.SENSOR,
     Platform.BINARY_SENSOR,
     Platform.SWITCH,
+    Platform.NUMBER,
+    Platform.SELECT,
 ]
 
 
+async def async_setup(
+    hass: HomeAssistant,
+    config: ConfigType,  # noqa: ARG001 Unused function argument: `config`
+) -> bool:
+    """Set up the services of the integration."""
+    async_setup_services(hass)
+    return True
+
+
 # https://developers.home-assistant.io/docs/config_entries_index/#setting-up-an-entry
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: IntegrationEVMateConfigEntry,
 ) -> bool:
     """Set up this integration using UI."""
+    fleet = async_get_fleet(hass)
+    # Unload callbacks run concurrently. These run one after the other and
+    # before the entry leaves the fleet, whose last meter closes the shared
+    # pool that e.g. the pending writes still need.
+    closers: list[Callable[[], Awaitable[None]]] = []
+
+    async def _async_close() -> None:
+        for close in reversed(closers):
+            await close()
+        await fleet.async_remove(entry.entry_id)
+
+    # Also runs when the setup fails
+    entry.async_on_unload(_async_close)
     coordinator = EVMateDataUpdateCoordinator(
         hass=hass,
         logger=LOGGER,
         name=DOMAIN,
-        update_interval=timedelta(hours=1),
+        intervals={
+            endpoint: timedelta(
+                seconds=entry.options.get(
+                    CONF_ENDPOINT_INTERVALS[endpoint],
+                    DEFAULT_ENDPOINT_INTERVALS[endpoint],
+                )
+            )
+            for endpoint in ENDPOINTS
+        },
+        schedule=False,
+        store=Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot"
+        ),
+    )
+    coordinator.slow_refresh = entry.options.get(
+        CONF_SLOW_REFRESH, DEFAULT_SLOW_REFRESH
+    )
+    recorder = "recorder" in hass.config.components
+    # All meters share the fleet's keep-alive pool and request limit
+    client = IntegrationEvmateApiClient(
+        address=entry.data[CONF_IP_ADDRESS],
+        port=entry.data[CONF_PORT],
+        session=fleet.session,
+        limiter=fleet.limiter,
     )
+    history = EVMateEnergyHistory(hass, entry.entry_id)
+    await history.async_load()
+    costs = None
+    if (tariff := Tariff.from_options(entry.options)) is not None:
+        costs = EVMateEnergyCosts(hass, entry.entry_id, tariff)
+        await costs.async_load()
     entry.runtime_data = IntegrationEVMateData(
-        client=IntegrationEvmateApiClient(
-            address=entry.data[CONF_IP_ADDRESS],
-            port=entry.data[CONF_PORT],
-            session=async_get_clientsession(hass),
-        ),
+        client=client,
         integration=async_get_loaded_integration(hass, entry.domain),
         coordinator=coordinator,
+        history=history,
+        evse=EVMateEvseTracker(hass, entry, coordinator),
+        writer=EVMateWriter(hass, client, coordinator),
+        statistics=(
+            EVMateStatisticsImporter(hass, entry.unique_id, entry.title)
+            if recorder
+            else None
+        ),
+        costs=costs,
     )
-
-    # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
-    await coordinator.async_config_entry_first_refresh()
+    if entry.options.get(CONF_ARCHIVE, False):
+        entry.runtime_data.archiver = EVMateArchiver(
+            hass, Path(hass.config.path(DOMAIN, "archive", entry.unique_id))
+        )
+        closers.append(entry.runtime_data.archiver.async_close)
+        # Config entries are not unloaded when Home Assistant stops
+        entry.async_on_unload(
+            hass.bus.async_listen(
+                EVENT_HOMEASSISTANT_FINAL_WRITE, entry.runtime_data.archiver.async_close
+            )
+        )
+
+    if await coordinator.async_restore():
+        # The entities come up from the last snapshot, the meter is read later
+        fleet.async_add(entry.entry_id, coordinator, refresh=True)
+    else:
+        # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
+        await coordinator.async_config_entry_first_refresh()
+        fleet.async_add(entry.entry_id, coordinator)
+    entry.async_on_unload(entry.runtime_data.evse.async_start())
+    closers.append(entry.runtime_data.writer.async_shutdown)
+    if entry.options.get(CONF_BALANCER, False):
+        entry.async_on_unload(
+            EVMateBalancer(coordinator, entry.runtime_data.writer).async_start()
+        )
+
+    if entry.options.get(CONF_STREAMING, False):
+        entry.async_create_background_task(
+            hass,
+            EVMateStreamer(client, coordinator).async_run(),
+            f"{DOMAIN} stream {entry.title}",
+        )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
@@ -75,5 +197,4 @@ async def async_reload_entry(
     entry: IntegrationEVMateConfigEntry,
 ) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
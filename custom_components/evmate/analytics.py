@@ -0,0 +1,236 @@
+"""Energy cost analytics of the hourly history for evmate."""
+
+from __future__ import annotations
+
+import operator
+from dataclasses import astuple, dataclass
+from datetime import date, datetime, timedelta
+from itertools import compress
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CONF_PEAK_END,
+    CONF_PEAK_START,
+    CONF_PRICE_EXPORT,
+    CONF_PRICE_OFFPEAK,
+    CONF_PRICE_PEAK,
+    COST_DAYS,
+    DEFAULT_PEAK_END,
+    DEFAULT_PEAK_START,
+    DOMAIN,
+    HOURLY_ENERGY_KWH,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from homeassistant.core import HomeAssistant
+
+    from .decoder import HourlyEnergy, MeterProfile
+
+STORAGE_VERSION = 1
+# Seconds to collect closed hours before the totals are written to storage.
+STORAGE_SAVE_DELAY = 300
+HOURS_PER_DAY = 24
+
+
+@dataclass(frozen=True, slots=True)
+class Tariff:
+    """Time-of-use tariff, the import price of every hour of the local day."""
+
+    import_prices: tuple[float, ...]
+    export_price: float
+    peak_hours: frozenset[int]
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> Tariff | None:
+        """Return the tariff of the entry options, None without import prices."""
+        peak = options.get(CONF_PRICE_PEAK, 0)
+        offpeak = options.get(CONF_PRICE_OFFPEAK, 0)
+        if not peak and not offpeak:
+            return None
+        start = int(options.get(CONF_PEAK_START, DEFAULT_PEAK_START))
+        end = int(options.get(CONF_PEAK_END, DEFAULT_PEAK_END))
+        peak_hours = frozenset(
+            hour
+            for hour in range(HOURS_PER_DAY)
+            # A peak that ends before it starts wraps around midnight
+            if (start <= hour < end if start <= end else hour >= start or hour < end)
+        )
+        return cls(
+            tuple(
+                peak if hour in peak_hours else offpeak for hour in range(HOURS_PER_DAY)
+            ),
+            options.get(CONF_PRICE_EXPORT, 0),
+            peak_hours,
+        )
+
+
+@dataclass(slots=True)
+class CostTotals:
+    """Energy (kWh), import cost and export revenue of a period."""
+
+    import_energy: float = 0.0
+    export_energy: float = 0.0
+    peak_import: float = 0.0
+    import_cost: float = 0.0
+    export_revenue: float = 0.0
+
+    def __add__(self, other: CostTotals) -> CostTotals:
+        """Return the totals of both periods."""
+        return CostTotals(*map(operator.add, astuple(self), astuple(other)))
+
+    @property
+    def peak_share(self) -> float | None:
+        """Return the percentage of the import in the peak hours."""
+        if not self.import_energy:
+            return None
+        return round(self.peak_import / self.import_energy * 100, 1)
+
+    def as_dict(self) -> dict[str, float | None]:
+        """Return the rounded totals, e.g. as a service response."""
+        return {
+            "import_energy": round(self.import_energy, 3),
+            "export_energy": round(self.export_energy, 3),
+            "peak_import": round(self.peak_import, 3),
+            "peak_share": self.peak_share,
+            "import_cost": round(self.import_cost, 2),
+            "export_revenue": round(self.export_revenue, 2),
+            "net_cost": round(self.import_cost - self.export_revenue, 2),
+        }
+
+
+def price_hours(
+    tariff: Tariff, hourly: HourlyEnergy, start: int, stop: int
+) -> CostTotals:
+    """
+    Return the totals of the valid hours ``[start, stop)`` of the history.
+
+    Every column is processed in one pass of ``map``/``compress`` over the
+    ``memoryview`` slices of the decoded "Es" array, no per-hour objects are
+    built.
+    """
+    valid = hourly.valid[start:stop]
+    hours = list(compress(hourly.hours[start:stop], valid))
+    imports = list(compress(hourly.imports[start:stop], valid))
+    exports = compress(hourly.exports[start:stop], valid)
+    cost = sum(map(operator.mul, imports, map(tariff.import_prices.__getitem__, hours)))
+    peak = sum(compress(imports, map(tariff.peak_hours.__contains__, hours)))
+    exported = sum(exports) * HOURLY_ENERGY_KWH
+    return CostTotals(
+        import_energy=sum(imports) * HOURLY_ENERGY_KWH,
+        export_energy=exported,
+        peak_import=peak * HOURLY_ENERGY_KWH,
+        import_cost=cost * HOURLY_ENERGY_KWH,
+        export_revenue=exported * tariff.export_price,
+    )
+
+
+class EVMateEnergyCosts:
+    """
+    Costs of the hourly history of one meter per hour, day and month.
+
+    A closed hour is priced once and added to the persisted totals of its day
+    and month. An update prices the hours that closed since the last one in
+    a batch per day, and the hour that is still open again. Days older than
+    ``COST_DAYS`` are dropped, months are kept.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, tariff: Tariff) -> None:
+        """Initialize the costs of the given config entry."""
+        self.tariff = tariff
+        self.days: dict[date, CostTotals] = {}
+        self.months: dict[date, CostTotals] = {}
+        # Start of the last priced closed hour
+        self._closed_until: datetime | None = None
+        self.current_hour: datetime | None = None
+        self.current = CostTotals()
+        self.last_hour: CostTotals | None = None
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.costs"
+        )
+
+    async def async_load(self) -> None:
+        """Load the persisted totals."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self._closed_until = datetime.fromisoformat(data["closed_until"])
+        self.days = {
+            date.fromisoformat(day): CostTotals(*totals)
+            for day, totals in data["days"].items()
+        }
+        self.months = {
+            date.fromisoformat(month): CostTotals(*totals)
+            for month, totals in data["months"].items()
+        }
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "closed_until": self._closed_until.isoformat(),
+            "days": {day.isoformat(): astuple(t) for day, t in self.days.items()},
+            "months": {
+                month.isoformat(): astuple(t) for month, t in self.months.items()
+            },
+        }
+
+    @callback
+    def async_update(self, profile: MeterProfile) -> None:
+        """Price the hours of a decoded updateData payload."""
+        hourly = profile.hourly
+        now = profile.time
+        if now is None or not hourly or hourly.hours[-1] != now.hour:
+            return
+        current = now.replace(minute=0, second=0, microsecond=0)
+        last = len(hourly) - 1
+        first = 0
+        if self._closed_until is not None:
+            unpriced = int((current - self._closed_until) / timedelta(hours=1)) - 1
+            first = max(last - unpriced, 0)
+        if first < last:
+            self._price_closed(hourly, first, last, current)
+        self.current_hour = current
+        self.current = price_hours(self.tariff, hourly, last, last + 1)
+
+    def _price_closed(
+        self, hourly: HourlyEnergy, first: int, last: int, current: datetime
+    ) -> None:
+        """Add the closed hours ``[first, last)`` to their days and months."""
+        # Split at midnight, every day is priced in one batch
+        starts = [first, *(i for i in range(first + 1, last) if hourly.hours[i] == 0)]
+        for start, stop in zip(starts, [*starts[1:], last], strict=True):
+            day = (current - timedelta(hours=last - start)).date()
+            totals = price_hours(self.tariff, hourly, start, stop)
+            self.days[day] = self.days.get(day, CostTotals()) + totals
+            month = day.replace(day=1)
+            self.months[month] = self.months.get(month, CostTotals()) + totals
+        self.last_hour = price_hours(self.tariff, hourly, last - 1, last)
+        self._closed_until = current - timedelta(hours=1)
+        oldest = current.date() - timedelta(days=COST_DAYS)
+        for day in [day for day in self.days if day < oldest]:
+            del self.days[day]
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    def today(self) -> CostTotals | None:
+        """Return the totals of the current day, None before an update."""
+        if self.current_hour is None:
+            return None
+        return self.days.get(self.current_hour.date(), CostTotals()) + self.current
+
+    def this_month(self) -> CostTotals | None:
+        """Return the totals of the current month, None before an update."""
+        if self.current_hour is None:
+            return None
+        month = self.current_hour.date().replace(day=1)
+        return self.months.get(month, CostTotals()) + self.current
+
+    def query(self, start: date, end: date) -> CostTotals:
+        """Return the totals of the days in ``[start, end)``."""
+        totals = sum(
+            (t for day, t in self.days.items() if start <= day < end), CostTotals()
+        )
+        if self.current_hour is not None and start <= self.current_hour.date() < end:
+            totals += self.current
+        return totals
@@ -2,13 +2,38 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextlib
+import hashlib
+import random
+import time
+from http import HTTPStatus
 from typing import TYPE_CHECKING, Any
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+import aiohttp
+from aiohttp import hdrs
+from yarl import URL
+
+from .const import (
+    CIRCUIT_BACKOFF_MAX,
+    CIRCUIT_BACKOFF_MIN,
+    CIRCUIT_THRESHOLD,
+    ENDPOINT_TIMEOUTS,
+    ENDPOINT_WRITE,
+    ENDPOINTS,
+    LOGGER,
+    METER_CONNECTION_LIMIT,
+    METER_KEEPALIVE_TIMEOUT,
+)
+from .metrics import EndpointMetrics
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
+    from collections.abc import AsyncIterator, Iterable
 
 
 class IntegrationEvmateApiClientError(Exception):
@@ -21,41 +46,367 @@ class IntegrationEvmateApiClientCommunicationError(
     """Exception to indicate a communication error."""
 
 
+class IntegrationEvmateApiClientCircuitOpenError(
+    IntegrationEvmateApiClientCommunicationError,
+):
+    """Exception to indicate that an unreachable meter is not requested."""
+
+
 class IntegrationEvmateApiClientAuthenticationError(
     IntegrationEvmateApiClientError,
 ):
     """Exception to indicate an authentication error."""
 
 
+class IntegrationEvmateApiClientPayloadError(
+    IntegrationEvmateApiClientError,
+):
+    """Exception to indicate an answer that is no valid payload."""
+
+
+class CircuitBreaker:
+    """
+    Stops requesting a meter that does not answer.
+
+    After ``threshold`` refreshes in a row in which no endpoint answered the
+    circuit opens, requests then fail at once without touching the network.
+    When the backoff elapsed a single request probes the meter. An answer
+    closes the circuit, a failure opens it again for twice the backoff, up to
+    ``max_backoff``. Every backoff is shortened by a random jitter of up to a
+    half, so the offline meters of a fleet do not probe together.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_THRESHOLD,
+        min_backoff: float = CIRCUIT_BACKOFF_MIN,
+        max_backoff: float = CIRCUIT_BACKOFF_MAX,
+    ) -> None:
+        """Initialize a closed circuit."""
+        self._threshold = threshold
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._backoff = min_backoff
+        self.failures = 0
+        # Monotonic time of the next probe, None while the circuit is closed
+        self.retry_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open while probing."""
+        if self.retry_at is None:
+            return "closed"
+        return "half_open" if self.probing else "open"
+
+    def allow(self, now: float) -> bool:
+        """Return whether the meter may be requested, start a probe if due."""
+        if self.retry_at is None:
+            return True
+        if self.probing or now < self.retry_at:
+            return False
+        self.probing = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after an answer."""
+        self.failures = 0
+        self._backoff = self._min_backoff
+        self.retry_at = None
+        self.probing = False
+
+    def record_failure(self, now: float) -> None:
+        """Count a refresh without answers, open the circuit at the threshold."""
+        self.failures += 1
+        if self.probing:
+            self._backoff = min(self._backoff * 2, self._max_backoff)
+            self.probing = False
+        elif self.retry_at is None and self.failures < self._threshold:
+            return
+        self.retry_at = now + self._backoff * random.uniform(0.5, 1)  # noqa: S311
+
+
 class IntegrationEvmateApiClient:
     """EVMate API Client."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         address: str,
         port: int,
-        hass: HomeAssistant,
+        session: aiohttp.ClientSession | None = None,
+        *,
+        connector: aiohttp.BaseConnector | None = None,
+        concurrent: bool = True,
+        timeouts: dict[str, float] | None = None,
+        limiter: asyncio.Semaphore | None = None,
     ) -> None:
-        """Sample API Client."""
-        self._hass = hass
-        self._session = async_get_clientsession(self._hass)
-        self._host = "http://" + address + ":" + str(port) + "/"
+        """
+        EVMate API Client.
+
+        Without an injected ``session`` the client opens its own one on
+        ``connector``, by default a dedicated keep-alive connector that never
+        holds more than ``METER_CONNECTION_LIMIT`` sockets to the meter. An
+        owned session is closed by ``async_close``. A ``limiter`` shared by
+        several clients caps their requests in flight; the endpoint timeout
+        only starts once a request got its slot.
+        """
+        self._owns_session = session is None
+        if session is None:
+            session = aiohttp.ClientSession(
+                connector=connector or self.create_connector()
+            )
+        self._session = session
+        self._host = URL.build(scheme="http", host=address, port=int(port))
+        # Built once, requests hand the prepared URL objects to aiohttp
+        self._urls = {
+            endpoint: self._host.with_path(f"/{endpoint}") for endpoint in ENDPOINTS
+        }
+        self._concurrent = concurrent
+        self._timeouts = {**ENDPOINT_TIMEOUTS, **(timeouts or {})}
+        self._limiter = limiter or contextlib.nullcontext()
+        self.request_count = 0
+        # Digest of the last body and its parsed payload per endpoint
+        self._bodies: dict[str, tuple[bytes, dict[str, Any]]] = {}
+        self.metrics = {endpoint: EndpointMetrics() for endpoint in ENDPOINTS}
+        self.breaker = CircuitBreaker()
+
+    @staticmethod
+    def create_connector() -> aiohttp.TCPConnector:
+        """Return a keep-alive connector sized for the meter's web server."""
+        return aiohttp.TCPConnector(
+            limit=METER_CONNECTION_LIMIT,
+            limit_per_host=METER_CONNECTION_LIMIT,
+            keepalive_timeout=METER_KEEPALIVE_TIMEOUT,
+        )
+
+    async def async_close(self) -> None:
+        """Close the session if the client opened it."""
+        if self._owns_session:
+            await self._session.close()
 
     async def async_get_data(self) -> dict[str, Any]:
-        """Get data from the API."""
-        result = {}
-        result.update(await self._endpoint_request("updateSetting"))
-        result.update(await self._endpoint_request("updateData"))
-        result.update(await self._endpoint_request("updateEvse"))
+        """
+        Get data from the API.
+
+        Payloads are merged in ``ENDPOINTS`` order regardless of which request
+        finished first, so later endpoints win on duplicate keys.
+        """
+        payloads = await self.async_get_endpoints(ENDPOINTS)
+        result: dict[str, Any] = {}
+        for endpoint in ENDPOINTS:
+            result.update(payloads.get(endpoint, {}))
         return result
 
+    async def async_get_endpoints(
+        self, endpoints: Iterable[str]
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get the payloads of the given endpoints keyed by endpoint.
+
+        In concurrent mode all endpoints are requested together, so a refresh
+        takes as long as the slowest endpoint instead of the sum of all of them.
+        An endpoint that fails or exceeds its timeout is left out of the result;
+        the call only fails when none of the requested endpoints answered, with
+        the error of the first one. While the circuit breaker is open it fails
+        at once with ``IntegrationEvmateApiClientCircuitOpenError``, a probe
+        only requests the first endpoint.
+        """
+        endpoints = tuple(endpoints)
+        if not endpoints:
+            return {}
+        now = time.monotonic()
+        if not self.breaker.allow(now):
+            msg = (
+                f"{self._host} did not answer {self.breaker.failures} times,"
+                f" next try in {self.breaker.retry_at - now:.0f} s"
+            )
+            raise IntegrationEvmateApiClientCircuitOpenError(msg)
+        if self.breaker.probing:
+            endpoints = endpoints[:1]
+        if self._concurrent:
+            payloads = await asyncio.gather(
+                *(self._endpoint_result(endpoint) for endpoint in endpoints)
+            )
+        else:
+            payloads = [await self._endpoint_result(endpoint) for endpoint in endpoints]
+
+        result: dict[str, dict[str, Any]] = {}
+        errors: dict[str, IntegrationEvmateApiClientError] = {}
+        for endpoint, payload in zip(endpoints, payloads, strict=True):
+            if isinstance(payload, IntegrationEvmateApiClientError):
+                errors[endpoint] = payload
+            else:
+                result[endpoint] = payload
+
+        # Only a meter that did not answer at all trips the breaker
+        if result or not all(
+            isinstance(error, IntegrationEvmateApiClientCommunicationError)
+            for error in errors.values()
+        ):
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(time.monotonic())
+        if not result:
+            raise next(
+                (
+                    error
+                    for error in errors.values()
+                    if isinstance(error, IntegrationEvmateApiClientAuthenticationError)
+                ),
+                errors[endpoints[0]],
+            )
+        for error in errors.values():
+            LOGGER.warning("Skipping in this refresh: %s", error)
+
+        return result
+
+    async def async_stream(
+        self, endpoint: str, min_interval: float
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield the payloads of an endpoint as the meter delivers them.
+
+        A chunked answer is read as a stream of newline separated payloads for
+        as long as the meter keeps it open. Any other answer is a single
+        payload, the endpoint is then requested again on the kept-alive
+        connection, at most once per ``min_interval`` seconds. An unchanged
+        body yields the previous payload object. Errors end the stream with
+        ``IntegrationEvmateApiClientCommunicationError``.
+
+        Every request waits for a slot of the ``limiter`` like a poll does, a
+        chunked answer gives its slot back once its headers arrived. Requests
+        count towards the circuit breaker and none is made while it is open.
+        """
+        loop = asyncio.get_running_loop()
+        # The read timeout applies between chunks, a stalled stream fails
+        timeout = aiohttp.ClientTimeout(sock_read=self._timeouts[endpoint])
+        metrics = self.metrics[endpoint]
+        while True:
+            now = time.monotonic()
+            if not self.breaker.allow(now):
+                msg = (
+                    f"Not streaming {self._urls[endpoint]},"
+                    f" next try in {self.breaker.retry_at - now:.0f} s"
+                )
+                raise IntegrationEvmateApiClientCircuitOpenError(msg)
+            started = loop.time()
+            self.request_count += 1
+            body = None
+            try:
+                async with self._limiter:
+                    response = await self._session.get(
+                        self._urls[endpoint], timeout=timeout
+                    )
+                    if response.headers.get(hdrs.TRANSFER_ENCODING) != "chunked":
+                        async with response:
+                            response.raise_for_status()
+                            body = await response.read()
+                if body is not None:
+                    payload = self._parse(endpoint, body)
+                    metrics.record_answer(loop.time() - started, len(body))
+                    self.breaker.record_success()
+                    yield payload
+                else:
+                    async with response:
+                        response.raise_for_status()
+                        self.breaker.record_success()
+                        async for line in response.content:
+                            if line.strip():
+                                payload = self._parse(endpoint, line)
+                                # Chunks come at the meter's pace, no latency
+                                metrics.record_answer(None, len(line))
+                                yield payload
+            except (aiohttp.ClientError, TimeoutError, ValueError) as exception:
+                metrics.record_failure(exception)
+                self.breaker.record_failure(time.monotonic())
+                msg = f"Streaming {self._urls[endpoint]} failed: {exception!r}"
+                raise IntegrationEvmateApiClientCommunicationError(msg) from exception
+            await asyncio.sleep(max(0, started + min_interval - loop.time()))
+
+    async def async_write(self, values: dict[str, str]) -> None:
+        """
+        Write settings to the meter.
+
+        All values are sent in one request, in the format the meter delivers
+        them in. Failures raise ``IntegrationEvmateApiClientCommunicationError``,
+        nothing is sent while the circuit breaker is open.
+        """
+        url = self._host.with_path(f"/{ENDPOINT_WRITE}")
+        if self.breaker.retry_at is not None:
+            msg = f"Not writing {values}, {self._host} does not answer"
+            raise IntegrationEvmateApiClientCircuitOpenError(msg)
+        self.request_count += 1
+        try:
+            async with (
+                self._limiter,
+                asyncio.timeout(self._timeouts[ENDPOINT_WRITE]),
+                self._session.post(url, data=values) as response,
+            ):
+                response.raise_for_status()
+        except (aiohttp.ClientError, TimeoutError) as exception:
+            msg = f"Writing {values} to {url} failed: {exception!r}"
+            raise IntegrationEvmateApiClientCommunicationError(msg) from exception
+
+    def _parse(self, endpoint: str, body: bytes) -> dict[str, Any]:
+        """
+        Return the payload of a body.
+
+        A body identical to the previous one of the endpoint is not parsed
+        again, the previous payload object is returned instead. Callers can
+        detect that cheaply by identity and must not modify the payload.
+        Bodies are decoded from bytes with orjson where it is installed.
+        """
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if (last := self._bodies.get(endpoint)) is not None and last[0] == digest:
+            return last[1]
+        started = time.perf_counter()
+        payload = json_loads(body)
+        self.metrics[endpoint].record_decode(time.perf_counter() - started)
+        self._bodies[endpoint] = (digest, payload)
+        return payload
+
+    async def _endpoint_result(
+        self, endpoint: str
+    ) -> dict[str, Any] | IntegrationEvmateApiClientError:
+        """Return the payload of an endpoint or the error it failed with."""
+        try:
+            return await self._endpoint_request(endpoint)
+        except IntegrationEvmateApiClientError as exception:
+            self.metrics[endpoint].record_failure(exception)
+            return exception
+
     async def _endpoint_request(self, endpoint: str) -> dict[str, Any]:
+        self.request_count += 1
+        url = self._urls[endpoint]
+        try:
+            async with self._limiter:
+                # Latency without the wait for a slot of the limiter
+                started = time.perf_counter()
+                async with (
+                    asyncio.timeout(self._timeouts[endpoint]),
+                    self._session.get(url) as response,
+                ):
+                    response.raise_for_status()
+                    body = await response.read()
+                latency = time.perf_counter() - started
+        except aiohttp.ClientResponseError as exception:
+            msg = f"{url} answered {exception.status} {exception.message}"
+            if exception.status in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN):
+                raise IntegrationEvmateApiClientAuthenticationError(msg) from exception
+            raise IntegrationEvmateApiClientCommunicationError(msg) from exception
+        except TimeoutError as exception:
+            msg = f"{url} did not answer within {self._timeouts[endpoint]} s"
+            raise IntegrationEvmateApiClientCommunicationError(msg) from exception
+        except aiohttp.ClientError as exception:
+            msg = f"Requesting {url} failed: {exception!r}"
+            raise IntegrationEvmateApiClientCommunicationError(msg) from exception
         try:
-            response = await self._session.get(self._host + endpoint)
-            response.raise_for_status()
-            payload = await response.text()
-            raw_json = json.loads(payload)
-        except Exception as e:  # noqa: BLE001
-            raw_json = {"error": e}
-
-        return raw_json
+            payload = self._parse(endpoint, body)
+        except ValueError as exception:
+            msg = f"{url} answered no valid JSON: {exception}"
+            raise IntegrationEvmateApiClientPayloadError(msg) from exception
+        if not isinstance(payload, dict):
+            msg = f"{url} answered {type(payload).__name__} instead of an object"
+            raise IntegrationEvmateApiClientPayloadError(msg)
+        self.metrics[endpoint].record_answer(latency, len(body))
+        return payload
@@ -0,0 +1,220 @@
+"""Archive of the payloads of an evmate meter and its replay."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import struct
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from itertools import groupby
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .api import IntegrationEvmateApiClientCommunicationError
+from .const import ARCHIVE_BATCH, ARCHIVE_FLUSH_DELAY, ARCHIVE_MAX_BYTES, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from datetime import datetime
+    from pathlib import Path
+
+    from homeassistant.core import Event, HomeAssistant
+
+# Every record is its UNIX time and the length of the JSON body that follows.
+_HEADER = struct.Struct("<dI")
+_SUFFIX = ".bin.gz"
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveRecord:
+    """The payloads that changed in one update, keyed by endpoint."""
+
+    time: datetime
+    payloads: dict[str, dict[str, Any]]
+
+
+def _day(timestamp: float) -> date:
+    """Return the local day of a UNIX time, the day of its archive file."""
+    return dt_util.as_local(dt_util.utc_from_timestamp(timestamp)).date()
+
+
+def _file_day(path: Path) -> date:
+    """Return the day of a ``YYYY-MM-DD.NNN.bin.gz`` archive file."""
+    return date.fromisoformat(path.name[:10])
+
+
+class EVMateArchiver:
+    """
+    Appends the payload changes of a meter to compressed files.
+
+    Records are buffered on the event loop and written in batches by the
+    executor, after ``ARCHIVE_BATCH`` records or ``ARCHIVE_FLUSH_DELAY``
+    seconds, whichever comes first. A batch is appended to the file of its
+    local day as one gzip member, a new file is started for every day and
+    once a file reaches ``max_bytes``. The payloads are encoded by the
+    executor, they are never modified in place once merged.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        directory: Path,
+        max_bytes: int = ARCHIVE_MAX_BYTES,
+    ) -> None:
+        """Initialize the archiver writing to ``directory``."""
+        self._hass = hass
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._buffer: list[tuple[float, dict[str, dict[str, Any]]]] = []
+        # Batches are written one after the other, in the order they were taken
+        self._lock = asyncio.Lock()
+        self._unsub_flush: Callable[[], None] | None = None
+        # File the last batch went to, only used by the executor
+        self._path: Path | None = None
+
+    @callback
+    def async_append(
+        self, payloads: dict[str, dict[str, Any]], timestamp: float
+    ) -> None:
+        """Buffer the changed payloads of an update at UNIX time ``timestamp``."""
+        self._buffer.append((timestamp, payloads))
+        if len(self._buffer) >= ARCHIVE_BATCH:
+            self._hass.async_create_task(self.async_flush(), eager_start=True)
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, ARCHIVE_FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    async def _async_scheduled_flush(self, _now: datetime) -> None:
+        self._unsub_flush = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the buffered records."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        records, self._buffer = self._buffer, []
+        if not records:
+            return
+        async with self._lock:
+            try:
+                await self._hass.async_add_executor_job(self._write, records)
+            except OSError as exception:
+                LOGGER.warning(
+                    "Archiving %s records to %s failed: %s",
+                    len(records),
+                    self.directory,
+                    exception,
+                )
+
+    async def async_close(self, _event: Event | None = None) -> None:
+        """Write the records still buffered, e.g. when Home Assistant stops."""
+        await self.async_flush()
+
+    def _write(self, records: list[tuple[float, dict[str, dict[str, Any]]]]) -> None:
+        """Append the records to the files of their days."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for day, group in groupby(records, key=lambda record: _day(record[0])):
+            chunks = []
+            for timestamp, payloads in group:
+                body = json_bytes(payloads)
+                chunks.append(_HEADER.pack(timestamp, len(body)))
+                chunks.append(body)
+            with gzip.open(self._file(day), "ab") as file:
+                file.write(b"".join(chunks))
+
+    def _file(self, day: date) -> Path:
+        """Return the file of a day to append to, starting a new one if full."""
+        path = self._path
+        if path is None or _file_day(path) != day:
+            # Continue the last file of the day, e.g. after a restart
+            existing = sorted(self.directory.glob(f"{day.isoformat()}.*{_SUFFIX}"))
+            path = existing[-1] if existing else self._name(day, 0)
+        if path.exists() and path.stat().st_size >= self._max_bytes:
+            path = self._name(day, int(path.name[11:14]) + 1)
+        self._path = path
+        return path
+
+    def _name(self, day: date, index: int) -> Path:
+        return self.directory / f"{day.isoformat()}.{index:03d}{_SUFFIX}"
+
+
+def read_archive(
+    directory: Path,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Iterator[ArchiveRecord]:
+    """
+    Yield the records of ``[start, end)`` in the order they were written.
+
+    Only the files of the days in the range are opened and they are read one
+    record at a time. The bodies of records outside the range are skipped
+    without decoding them. A file that ends in a partly written record, e.g.
+    after a crash, is read up to it.
+    """
+    first = None if start is None else dt_util.as_local(start).date()
+    last = None if end is None else dt_util.as_local(end).date()
+    start_ts = float("-inf") if start is None else start.timestamp()
+    end_ts = float("inf") if end is None else end.timestamp()
+    for path in sorted(directory.glob(f"*{_SUFFIX}")):
+        day = _file_day(path)
+        if first is not None and day < first:
+            continue
+        if last is not None and day > last:
+            return
+        yield from _read_file(path, start_ts, end_ts)
+
+
+def _read_file(path: Path, start: float, end: float) -> Iterator[ArchiveRecord]:
+    with gzip.open(path, "rb") as file:
+        try:
+            while len(header := file.read(_HEADER.size)) == _HEADER.size:
+                timestamp, length = _HEADER.unpack(header)
+                body = file.read(length)
+                if len(body) < length or timestamp >= end:
+                    return
+                if timestamp >= start:
+                    yield ArchiveRecord(
+                        dt_util.utc_from_timestamp(timestamp), json_loads(body)
+                    )
+        except (EOFError, gzip.BadGzipFile, zlib.error):
+            LOGGER.debug("Archive %s ends in a partly written record", path)
+
+
+class ArchiveReplayClient:
+    """
+    Serves archived records to a coordinator in place of the meter client.
+
+    Every request answers with the payloads of the next record, whatever
+    endpoints were asked for, and fails like an unreachable meter once the
+    records are used up. The records are read by the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, records: Iterable[ArchiveRecord]) -> None:
+        """Initialize the replay of ``records``, e.g. from ``read_archive``."""
+        self._hass = hass
+        self._records = iter(records)
+        self.request_count = 0
+        # Time the meter reported the payloads of the last request at
+        self.time: datetime | None = None
+
+    async def async_get_endpoints(
+        self,
+        endpoints: Iterable[str],  # noqa: ARG002 Unused method argument: `endpoints`
+    ) -> dict[str, dict[str, Any]]:
+        """Return the payloads of the next record."""
+        record = await self._hass.async_add_executor_job(next, self._records, None)
+        if record is None:
+            msg = "The archive has no more records"
+            raise IntegrationEvmateApiClientCommunicationError(msg)
+        self.request_count += 1
+        self.time = record.time
+        return record.payloads
@@ -0,0 +1,185 @@
+"""Solar surplus load balancing of the chargers of an evmate meter."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+
+from .const import (
+    BALANCER_HOLD,
+    BALANCER_HYSTERESIS,
+    BALANCER_RAMP,
+    DOMAIN,
+    EVSE_MAX_CURRENT,
+    EVSE_MIN_CURRENT,
+    LOGGER,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .coordinator import EVMateDataUpdateCoordinator
+    from .write import EVMateWriter
+
+PHASES = (1, 2, 3)
+# Keys of the coordinator values a balancing step depends on.
+BALANCER_KEYS = frozenset(
+    {
+        *(f"{prefix}{phase}" for prefix in "IPU" for phase in PHASES),
+        "BREAKER",
+        "in,MAX-CURRENT-FROM-GRID-A",
+        "in,PV-GRID-ASSIST-A",
+        "ACTUAL_OUTPUT_CURRENT",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class BalancerSample:
+    """Measurements a balancing step is computed from."""
+
+    # Current (A) of every phase at the grid connection, chargers included
+    phase_currents: tuple[float, float, float]
+    # Power (W) at the grid connection, negative while exporting
+    grid_power: float
+    # Average phase voltage (V)
+    voltage: float
+    # Current (A) every charger draws on each phase
+    evse_currents: tuple[float, ...]
+    # Current (A) a phase may draw from the grid
+    grid_limit: float
+    # Current (A) per phase that may be imported to keep charging on surplus
+    grid_assist: float = 0
+
+
+def sample_from_values(values: dict[str, Any]) -> BalancerSample | None:
+    """Return the sample of the coordinator values, None while incomplete."""
+    currents = tuple(values.get(f"I{phase}") for phase in PHASES)
+    powers = [values.get(f"P{phase}") for phase in PHASES]
+    voltages = [values.get(f"U{phase}") for phase in PHASES]
+    evse_currents = values.get("ACTUAL_OUTPUT_CURRENT")
+    limits = [
+        limit
+        for limit in (values.get("BREAKER"), values.get("in,MAX-CURRENT-FROM-GRID-A"))
+        if limit
+    ]
+    if None in currents or None in powers or None in voltages or not limits:
+        return None
+    if not evse_currents or None in evse_currents:
+        return None
+    return BalancerSample(
+        phase_currents=currents,
+        grid_power=sum(powers),
+        voltage=sum(voltages) / len(voltages),
+        evse_currents=evse_currents,
+        grid_limit=min(limits),
+        grid_assist=values.get("in,PV-GRID-ASSIST-A") or 0,
+    )
+
+
+class SurplusBalancer:
+    """
+    Control loop computing the charging current of every charger.
+
+    The current the chargers may draw together is the smaller of the phase
+    headroom below the grid limit and the export surplus plus the allowed grid
+    assist, both on top of what the chargers draw now. It is shared evenly.
+    Charging starts ``hysteresis`` A above the minimum current and stops below
+    it, each not before ``hold`` s after the last start or stop unless the grid
+    limit forces it. Setpoints rise by at most ``ramp`` A/s and drop at once.
+    A step is a handful of arithmetic operations per phase and charger.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_current: float = EVSE_MIN_CURRENT,
+        max_current: float = EVSE_MAX_CURRENT,
+        hysteresis: float = BALANCER_HYSTERESIS,
+        ramp: float = BALANCER_RAMP,
+        hold: float = BALANCER_HOLD,
+    ) -> None:
+        """Initialize the balancer with no charger charging."""
+        self._min = min_current
+        self._max = max_current
+        self._hysteresis = hysteresis
+        self._ramp = ramp
+        self._hold = hold
+        self._setpoint = 0.0
+        self._last_step: float | None = None
+        self._last_switch = -math.inf
+
+    def step(self, sample: BalancerSample, now: float) -> tuple[int, ...]:
+        """Return the current (A) of every charger, 0 for paused."""
+        count = len(sample.evse_currents)
+        if not count:
+            return ()
+        drawn = sum(sample.evse_currents)
+        headroom = min(sample.grid_limit - current for current in sample.phase_currents)
+        by_grid = (drawn + headroom) / count
+        surplus = -sample.grid_power / (sample.voltage * len(sample.phase_currents))
+        by_surplus = (drawn + surplus + sample.grid_assist) / count
+        target = min(by_grid, by_surplus, self._max)
+
+        elapsed = 0.0 if self._last_step is None else now - self._last_step
+        self._last_step = now
+        held = now - self._last_switch >= self._hold
+        if not self._setpoint:
+            if target >= self._min + self._hysteresis and held:
+                self._setpoint = self._min
+                self._last_switch = now
+        elif by_grid < self._min or (target < self._min and held):
+            self._setpoint = 0.0
+            self._last_switch = now
+        else:
+            target = max(target, self._min)
+            self._setpoint = min(target, self._setpoint + self._ramp * elapsed)
+        return (math.floor(self._setpoint),) * count
+
+
+class EVMateBalancer:
+    """Runs the surplus balancer on every coordinator update of a meter."""
+
+    def __init__(
+        self,
+        coordinator: EVMateDataUpdateCoordinator,
+        writer: EVMateWriter,
+        balancer: SurplusBalancer | None = None,
+    ) -> None:
+        """Initialize the balancer of a meter."""
+        self._coordinator = coordinator
+        self._writer = writer
+        self._balancer = balancer or SurplusBalancer()
+        self._written: tuple[int, ...] = ()
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start balancing, return the callback that stops it."""
+        return self._coordinator.async_add_listener(self.async_update)
+
+    @callback
+    def async_update(self) -> None:
+        """Compute the setpoints of new measurements and write the changed ones."""
+        changed = self._coordinator.changed_keys
+        if changed is not None and BALANCER_KEYS.isdisjoint(changed):
+            return
+        if (sample := sample_from_values(self._coordinator.values)) is None:
+            return
+        setpoints = self._balancer.step(sample, time.monotonic())
+        if setpoints == self._written:
+            return
+        LOGGER.debug("Balancing chargers to %s A", setpoints)
+        written, self._written = self._written, setpoints
+        entry = self._coordinator.config_entry
+        for evse, current in enumerate(setpoints, 1):
+            if evse <= len(written) and written[evse - 1] == current:
+                continue
+            entry.async_create_background_task(
+                self._coordinator.hass,
+                self._writer.async_set(f"inp,EVSE{evse}", str(current)),
+                f"{DOMAIN} balance EVSE {evse}",
+            )
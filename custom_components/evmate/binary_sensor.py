@@ -4,18 +4,15 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from homeassistant.components.binary_sensor import (
-    BinarySensorEntity,
-    BinarySensorEntityDescription,
-)
+from homeassistant.components.binary_sensor import BinarySensorEntity
 
-from .const import BINARY_SENSOR_TYPES
+from .entity import EVMateEntity, EVMateEvseEntity
+from .schema import BINARY_SENSOR_TYPES, EVSE_BINARY_SENSOR_TYPES
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-    from .coordinator import EVMateDataUpdateCoordinator
     from .data import IntegrationEVMateConfigEntry
 
 
@@ -35,40 +32,30 @@ async def async_setup_entry(
         )
         for entity_description in BINARY_SENSOR_TYPES
     )
+    entry.runtime_data.evse.async_add_platform(
+        lambda evse: (
+            EVMateEvseBinarySensor(
+                entity_description, entry.runtime_data.coordinator, evse
+            )
+            for entity_description in EVSE_BINARY_SENSOR_TYPES
+        ),
+        async_add_entities,
+    )
 
 
-class EVMateBinarySensor(BinarySensorEntity):
+class EVMateBinarySensor(EVMateEntity, BinarySensorEntity):
     """EVMate Binary sensor class."""
 
-    def __init__(
-        self,
-        unique_id: str,
-        description: BinarySensorEntityDescription,
-        coordinator: EVMateDataUpdateCoordinator,
-    ) -> None:
-        """Initialize the Binary sensor class."""
-        super().__init__()
-        self.entity_description = description
-        self._coordinator = coordinator
-        self._attr_name = description.name
-        self._attr_unique_id = unique_id
-
     @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._coordinator.last_update_success
+    def is_on(self) -> bool | None:
+        """Return the state of the binary sensor."""
+        return self.coordinator.values.get(self.entity_description.key)
 
-    async def async_added_to_hass(self) -> None:
-        """Connect to dispatcher listening for entity data notifications."""
-        self.async_on_remove(
-            self._coordinator.async_add_listener(self.async_write_ha_state)
-        )
 
-    async def async_update(self) -> None:
-        """Get the latest data from OWM and updates the states."""
-        await self._coordinator.async_request_refresh()
+class EVMateEvseBinarySensor(EVMateEvseEntity, BinarySensorEntity):
+    """EVMate binary sensor of one charger."""
 
     @property
-    def is_on(self) -> bool:
-        """Return the state of the binary sensor."""
-        return self._coordinator.data.get(self.entity_description.key, "0") == "1"
+    def is_on(self) -> bool | None:
+        """Return the state of the charger."""
+        return self.evse_value
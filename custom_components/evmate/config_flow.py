@@ -5,8 +5,9 @@ from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.core import callback
 from homeassistant.helpers import selector
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from slugify import slugify
 
 from .api import (
@@ -15,7 +16,34 @@ from .api import (
     IntegrationEvmateApiClientCommunicationError,
     IntegrationEvmateApiClientError,
 )
-from .const import DOMAIN, LOGGER
+from .const import (
+    CONF_ARCHIVE,
+    CONF_BALANCER,
+    CONF_ENDPOINT_INTERVALS,
+    CONF_PEAK_END,
+    CONF_PEAK_START,
+    CONF_PRICE_EXPORT,
+    CONF_PRICE_OFFPEAK,
+    CONF_PRICE_PEAK,
+    CONF_PUBLISH_AGGREGATE,
+    CONF_PUBLISH_INTERVALS,
+    CONF_SLOW_REFRESH,
+    CONF_STREAMING,
+    DEFAULT_ENDPOINT_INTERVALS,
+    DEFAULT_PEAK_END,
+    DEFAULT_PEAK_START,
+    DEFAULT_PUBLISH_AGGREGATE,
+    DEFAULT_SLOW_REFRESH,
+    DISCOVERY_PORT,
+    DOMAIN,
+    ENDPOINT_SETTING,
+    ENDPOINTS,
+    LOGGER,
+    PUBLISH_AGGREGATES,
+)
+from .discovery import DiscoveredMeter, async_discover
+
+CONF_METER = "meter"
 
 
 class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
@@ -23,15 +51,87 @@ class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,  # noqa: ARG004
+    ) -> EVMateOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return EVMateOptionsFlowHandler()
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered: dict[str, DiscoveredMeter] = {}
+
     async def async_step_user(
         self,
-        user_input: dict | None = None,
+        user_input: dict | None = None,  # noqa: ARG002
     ) -> config_entries.ConfigFlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["discover", "manual"])
+
+    async def async_step_discover(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Offer the meters found on the local networks."""
+        if user_input is not None:
+            meter = self._discovered[user_input[CONF_METER]]
+            await self.async_set_unique_id(meter.meter_id)
+            self._abort_if_unique_id_configured(
+                updates={CONF_IP_ADDRESS: meter.address, CONF_PORT: meter.port}
+            )
+            # Entries added by their address are keyed by it, not by the ID
+            self._async_abort_entries_match({CONF_IP_ADDRESS: meter.address})
+            return self.async_create_entry(
+                title=meter.address,
+                data={CONF_IP_ADDRESS: meter.address, CONF_PORT: meter.port},
+            )
+
+        configured = self._async_current_ids(include_ignore=False)
+        addresses = {
+            entry.data.get(CONF_IP_ADDRESS)
+            for entry in self._async_current_entries(include_ignore=False)
+        }
+        self._discovered = {
+            meter.meter_id: meter
+            for meter in await async_discover(self.hass)
+            if meter.meter_id not in configured and meter.address not in addresses
+        }
+        if not self._discovered:
+            return self.async_abort(reason="no_devices_found")
+        return self.async_show_form(
+            step_id="discover",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_METER): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=[
+                                selector.SelectOptionDict(
+                                    value=meter.meter_id,
+                                    label=f"{meter.address} (ID {meter.meter_id},"
+                                    f" version {meter.sw_version})",
+                                )
+                                for meter in self._discovered.values()
+                            ],
+                        ),
+                    ),
+                },
+            ),
+        )
+
+    async def async_step_manual(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Handle a meter entered by its address."""
         _errors = {}
         if user_input is not None:
+            self._async_abort_entries_match(
+                {CONF_IP_ADDRESS: user_input[CONF_IP_ADDRESS]}
+            )
             try:
-                await self._test_user_input(
+                meter_id = await self._test_user_input(
                     address=user_input[CONF_IP_ADDRESS],
                     port=user_input[CONF_PORT],
                 )
@@ -45,11 +145,10 @@ class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 LOGGER.exception(exception)
                 _errors["base"] = "unknown"
             else:
+                # Meters without an ID fall back to their address, which
+                # can change
                 await self.async_set_unique_id(
-                    ## Do NOT use this in production code
-                    ## The unique_id should never be something that can change
-                    ## https://developers.home-assistant.io/docs/config_entries_config_flow_handler#unique-ids
-                    unique_id=slugify(user_input[CONF_IP_ADDRESS])
+                    meter_id or slugify(user_input[CONF_IP_ADDRESS])
                 )
                 self._abort_if_unique_id_configured()
                 return self.async_create_entry(
@@ -58,7 +157,7 @@ class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(
                 {
                     vol.Required(
@@ -68,7 +167,9 @@ class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                             type=selector.TextSelectorType.TEXT,
                         ),
                     ),
-                    vol.Required(CONF_PORT, default=8000): selector.TextSelector(
+                    vol.Required(
+                        CONF_PORT, default=DISCOVERY_PORT
+                    ): selector.TextSelector(
                         selector.TextSelectorConfig(
                             type=selector.TextSelectorType.NUMBER,
                         ),
@@ -78,11 +179,136 @@ class EVMateFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors=_errors,
         )
 
-    async def _test_user_input(self, address: str, port: int) -> None:
-        """Validate user's input."""
+    async def _test_user_input(self, address: str, port: int) -> str | None:
+        """Validate user's input, returning the ID of the meter."""
         client = IntegrationEvmateApiClient(
             address=address,
             port=port,
-            session=async_create_clientsession(self.hass),
+            session=async_get_clientsession(self.hass),
+        )
+        payloads = await client.async_get_endpoints([ENDPOINT_SETTING])
+        meter_id = payloads[ENDPOINT_SETTING].get("ID")
+        return None if meter_id is None else str(meter_id)
+
+
+class EVMateOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for EVMate."""
+
+    async def async_step_init(
+        self,
+        user_input: dict | None = None,
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the polling intervals of the meter endpoints."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_ENDPOINT_INTERVALS[endpoint],
+                        default=self.config_entry.options.get(
+                            CONF_ENDPOINT_INTERVALS[endpoint],
+                            DEFAULT_ENDPOINT_INTERVALS[endpoint],
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=86400,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        ),
+                    )
+                    for endpoint in ENDPOINTS
+                }
+                | {
+                    vol.Required(
+                        CONF_STREAMING,
+                        default=self.config_entry.options.get(CONF_STREAMING, False),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_ARCHIVE,
+                        default=self.config_entry.options.get(CONF_ARCHIVE, False),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_BALANCER,
+                        default=self.config_entry.options.get(CONF_BALANCER, False),
+                    ): selector.BooleanSelector(),
+                    vol.Required(
+                        CONF_SLOW_REFRESH,
+                        default=self.config_entry.options.get(
+                            CONF_SLOW_REFRESH, DEFAULT_SLOW_REFRESH
+                        ),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=60,
+                            step=0.1,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        ),
+                    ),
+                }
+                | {
+                    vol.Required(
+                        option,
+                        default=self.config_entry.options.get(option, 0),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=3600,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement="s",
+                        ),
+                    )
+                    for option in CONF_PUBLISH_INTERVALS.values()
+                }
+                | {
+                    vol.Required(
+                        CONF_PUBLISH_AGGREGATE,
+                        default=self.config_entry.options.get(
+                            CONF_PUBLISH_AGGREGATE, DEFAULT_PUBLISH_AGGREGATE
+                        ),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=list(PUBLISH_AGGREGATES),
+                            translation_key=CONF_PUBLISH_AGGREGATE,
+                        ),
+                    ),
+                }
+                | {
+                    vol.Required(
+                        option,
+                        default=self.config_entry.options.get(option, 0),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=100,
+                            step=0.0001,
+                            mode=selector.NumberSelectorMode.BOX,
+                            unit_of_measurement=f"{self.hass.config.currency}/kWh",
+                        ),
+                    )
+                    for option in (
+                        CONF_PRICE_PEAK,
+                        CONF_PRICE_OFFPEAK,
+                        CONF_PRICE_EXPORT,
+                    )
+                }
+                | {
+                    vol.Required(
+                        option,
+                        default=self.config_entry.options.get(option, default),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0, max=24, mode=selector.NumberSelectorMode.BOX
+                        ),
+                    )
+                    for option, default in (
+                        (CONF_PEAK_START, DEFAULT_PEAK_START),
+                        (CONF_PEAK_END, DEFAULT_PEAK_END),
+                    )
+                },
+            ),
         )
-        await client.async_get_data()
@@ -1,44 +1,483 @@
 """Constants for evmate."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from logging import Logger, getLogger
+from typing import Any
 
-from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 from homeassistant.components.sensor import SensorEntityDescription
-from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.components.sensor.const import SensorDeviceClass, SensorStateClass
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfInformation,
+    UnitOfPower,
+    UnitOfTime,
+)
+from homeassistant.helpers.typing import StateType
 
 LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "evmate"
 
+ENDPOINT_SETTING = "updateSetting"
+ENDPOINT_DATA = "updateData"
+ENDPOINT_EVSE = "updateEvse"
+
+# Merge order of the endpoint payloads, later endpoints win on duplicate keys.
+ENDPOINTS: tuple[str, ...] = (ENDPOINT_SETTING, ENDPOINT_DATA, ENDPOINT_EVSE)
+
+# Settings are written by posting the changed keys as a form to this path.
+ENDPOINT_WRITE = "updateSetting"
+# Seconds in which setting changes are coalesced into a single write.
+WRITE_DEBOUNCE = 1.0
+
+# Option to balance the chargers on solar surplus and phase headroom.
+CONF_BALANCER = "balancer"
+# Charging current range (A) of a charger.
+EVSE_MIN_CURRENT = 6
+EVSE_MAX_CURRENT = 32
+# Amps above the minimum current needed to start charging, A/s the setpoint
+# may rise by, and seconds between a start and a stop of charging.
+BALANCER_HYSTERESIS = 1.0
+BALANCER_RAMP = 1.0
+BALANCER_HOLD = 60
+
+# Chargers connected to the meter, each one gets a device of its own.
+EVSE_COUNT_KEY = "NUMBER_OF_EVSE"
+MAX_EVSE = 10
+
+# Options of the time-of-use tariff: the import price per kWh in and out of
+# the peak hours [start, end) of the local day and the export price. Costs
+# are only computed with an import price.
+CONF_PRICE_PEAK = "price_peak"
+CONF_PRICE_OFFPEAK = "price_offpeak"
+CONF_PEAK_START = "peak_start"
+CONF_PEAK_END = "peak_end"
+CONF_PRICE_EXPORT = "price_export"
+DEFAULT_PEAK_START = 7
+DEFAULT_PEAK_END = 21
+# Days of cost totals kept for the range queries.
+COST_DAYS = 400
+
+# Meters are discovered by fingerprinting every address of the local /24
+# networks on the default port, that many at a time and each within the
+# timeout (s).
+DISCOVERY_PORT = 8000
+DISCOVERY_PARALLEL = 64
+DISCOVERY_TIMEOUT = 1.0
+DISCOVERY_MAX_PREFIX = 24
+
+# Seconds to wait for a single endpoint before it is dropped from the refresh.
+ENDPOINT_TIMEOUTS: dict[str, float] = {
+    ENDPOINT_SETTING: 10,
+    ENDPOINT_DATA: 10,
+    ENDPOINT_EVSE: 5,
+}
+
+# The meter's embedded web server only serves a few sockets, a dedicated
+# connector keeps at most this many connections to it open and reuses them.
+METER_CONNECTION_LIMIT = 2
+METER_KEEPALIVE_TIMEOUT = 60
+
+# Refreshes without any answer after which a meter is no longer requested, and
+# the seconds until it is probed again, doubled after every failed probe.
+CIRCUIT_THRESHOLD = 3
+CIRCUIT_BACKOFF_MIN = 10
+CIRCUIT_BACKOFF_MAX = 600
+
+# Polling intervals after which the last payload of an endpoint that keeps
+# failing is stale, the entities read from it become unavailable.
+STALE_INTERVALS = 3
+
+# Seconds to collect payload changes before the startup snapshot is written.
+SNAPSHOT_SAVE_DELAY = 60
+
+# Requests in flight across all meters and sockets of the connector they share.
+FLEET_MAX_REQUESTS = 8
+FLEET_CONNECTION_LIMIT = 64
+
+# Option keys and default polling intervals (seconds) of the single endpoints.
+CONF_ENDPOINT_INTERVALS: dict[str, str] = {
+    ENDPOINT_SETTING: "setting_interval",
+    ENDPOINT_DATA: "data_interval",
+    ENDPOINT_EVSE: "evse_interval",
+}
+DEFAULT_ENDPOINT_INTERVALS: dict[str, int] = {
+    ENDPOINT_SETTING: 3600,
+    ENDPOINT_DATA: 5,
+    ENDPOINT_EVSE: 30,
+}
+
+
+# Option with the seconds above which a refresh is logged with its timings,
+# 0 disables the log.
+CONF_SLOW_REFRESH = "slow_refresh"
+DEFAULT_SLOW_REFRESH = 0
+
+# Options with the seconds over which the measurements of a group of device
+# classes are aggregated before they are written to the state machine, 0
+# writes every change. A sample that moved past the significance threshold
+# (in the unit of the class) from the written value is written at once.
+CONF_PUBLISH_INTERVALS: dict[str, str] = {
+    group: f"{group}_publish_interval" for group in ("voltage", "current", "power")
+}
+PUBLISH_GROUPS: dict[SensorDeviceClass, tuple[str, float]] = {
+    SensorDeviceClass.VOLTAGE: ("voltage", 5),
+    SensorDeviceClass.CURRENT: ("current", 1),
+    SensorDeviceClass.POWER: ("power", 250),
+    SensorDeviceClass.APPARENT_POWER: ("power", 250),
+    SensorDeviceClass.REACTIVE_POWER: ("power", 250),
+}
+# Option with the value of a window that is written: mean, min or max.
+CONF_PUBLISH_AGGREGATE = "publish_aggregate"
+PUBLISH_AGGREGATES = ("mean", "min", "max")
+DEFAULT_PUBLISH_AGGREGATE = "mean"
+
+
+# Option to stream updateData instead of polling it.
+CONF_STREAMING = "streaming"
+# Minimum seconds between two requests of a stream the meter does not keep open.
+STREAM_INTERVAL = 0.5
+# Seconds to poll after a stream failed before it is retried, doubled up to max.
+STREAM_BACKOFF_MIN = 5
+STREAM_BACKOFF_MAX = 300
+
+# Option to archive the payload changes of the meter under the config directory.
+CONF_ARCHIVE = "archive"
+# Changes collected, or seconds waited, before they are written to the archive,
+# and the compressed size (bytes) of a file before the next one is started.
+ARCHIVE_BATCH = 100
+ARCHIVE_FLUSH_DELAY = 60
+ARCHIVE_MAX_BYTES = 16 * 1024 * 1024
+
+# kWh per unit of the energy counters and of the daily/monthly history.
+COUNTER_ENERGY_KWH = 0.01
+# kWh per unit of the hourly "Es" history.
+HOURLY_ENERGY_KWH = 0.001
+
+# Cumulative energy counters per phase, the imports first, then the exports.
+COUNTER_KEYS: tuple[str, ...] = tuple(
+    f"E{phase}t{direction}" for direction in "PN" for phase in (1, 2, 3)
+)
+# Windows (s) of the rolling averages of the phase readings, the last one is
+# the demand period. The ring keeps that many samples, 15 minutes of
+# readings streamed every 0.5 s; faster samples shorten the windows.
+DEMAND_WINDOWS: tuple[int, ...] = (60, 300, 900)
+DEMAND_PERIOD = 900
+RING_CAPACITY = 1800
+# Fired when the projected energy of the demand period crosses the limit.
+EVENT_DEMAND_LIMIT = f"{DOMAIN}_demand_limit"
+DEMAND_LIMIT_KEY = "in,MAX-E15-KWH"
+
+# W per phase a counter step may imply, a larger step is a glitch.
+DELTA_MAX_POWER = 50_000
+# Seconds the meter clock may be off before the days follow the local clock.
+CLOCK_SKEW_TOLERANCE = 300
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateComputedSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor computed by the coordinator instead of read from a key."""
+
+    value_fn: Callable[[Any], StateType]
+    attributes_fn: Callable[[Any], dict[str, Any] | None] | None = None
+    # Keys of the coordinator data the value is computed from, None for all
+    data_keys: frozenset[str] | None = None
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _endpoint_metrics(coordinator: Any, name: str) -> dict[str, Any]:
+    """Return an attribute of the request metrics of every endpoint."""
+    metrics = coordinator.config_entry.runtime_data.client.metrics
+    return {endpoint: getattr(metrics[endpoint], name) for endpoint in metrics}
+
 
-SENSOR_TYPES: tuple[SensorEntityDescription, ...] = (
-    SensorEntityDescription(
-        key="U1",
-        name="Voltage L1",
-        native_unit_of_measurement="V",
-        device_class=SensorDeviceClass.VOLTAGE,
+def _latency_p95(coordinator: Any) -> dict[str, float | None]:
+    metrics = coordinator.config_entry.runtime_data.client.metrics
+    return {
+        endpoint: _milliseconds(endpoint_metrics.latency_quantile(0.95))
+        for endpoint, endpoint_metrics in metrics.items()
+    }
+
+
+DIAGNOSTIC_SENSOR_TYPES: tuple[EVMateComputedSensorEntityDescription, ...] = (
+    EVMateComputedSensorEntityDescription(
+        key="requests_per_update",
+        name="Requests per update",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.last_update_requests,
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="update_latency",
+        name="Update latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: _milliseconds(coordinator.last_update_latency),
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="request_latency_p95",
+        name="Request latency 95th percentile",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: max(
+            (p95 for p95 in _latency_p95(coordinator).values() if p95 is not None),
+            default=None,
+        ),
+        attributes_fn=_latency_p95,
     ),
-    SensorEntityDescription(
-        key="U2",
-        name="Vlatage L2",
-        native_unit_of_measurement="V",
-        device_class=SensorDeviceClass.VOLTAGE,
+    EVMateComputedSensorEntityDescription(
+        key="fan_out_time",
+        name="Entity update time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: _milliseconds(coordinator.last_fan_out),
     ),
-    SensorEntityDescription(
-        key="U3",
-        name="Voltage L3",
-        native_unit_of_measurement="V",
-        device_class=SensorDeviceClass.VOLTAGE,
+    EVMateComputedSensorEntityDescription(
+        key="decode_time",
+        name="Decode time",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: _milliseconds(
+            sum(
+                seconds
+                for seconds in _endpoint_metrics(
+                    coordinator, "last_decode_time"
+                ).values()
+                if seconds is not None
+            )
+        ),
     ),
+    EVMateComputedSensorEntityDescription(
+        key="bytes_received",
+        name="Data received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        suggested_unit_of_measurement=UnitOfInformation.KILOBYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: sum(
+            _endpoint_metrics(coordinator, "bytes_received").values()
+        ),
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="consecutive_failures",
+        name="Failed requests in a row",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: max(
+            _endpoint_metrics(coordinator, "consecutive_failures").values()
+        ),
+        attributes_fn=lambda coordinator: _endpoint_metrics(
+            coordinator, "consecutive_failures"
+        ),
+    ),
+)
+
+PROFILE_KEYS = frozenset({"Es", "Pm", "WATTMETER_TIME"})
+DELTA_KEYS = frozenset({*COUNTER_KEYS, "WATTMETER_TIME"})
+
+DELTA_SENSOR_TYPES: tuple[EVMateComputedSensorEntityDescription, ...] = tuple(
+    description
+    for export, direction in ((False, "import"), (True, "export"))
+    for description in (
+        EVMateComputedSensorEntityDescription(
+            key=f"{direction}_power_from_energy",
+            name=f"{direction.capitalize()} power from energy counters",
+            native_unit_of_measurement=UnitOfPower.WATT,
+            device_class=SensorDeviceClass.POWER,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=0,
+            entity_registry_enabled_default=False,
+            data_keys=DELTA_KEYS,
+            value_fn=lambda coordinator, export=export: coordinator.deltas.power(
+                export=export
+            ),
+            attributes_fn=lambda coordinator, export=export: {
+                "interval_energy": coordinator.deltas.interval_energy(export=export)
+            },
+        ),
+        EVMateComputedSensorEntityDescription(
+            key=f"{direction}_energy_today",
+            name=f"Energy {direction} today",
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            device_class=SensorDeviceClass.ENERGY,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            suggested_display_precision=2,
+            entity_registry_enabled_default=False,
+            data_keys=DELTA_KEYS,
+            value_fn=lambda coordinator, export=export: coordinator.deltas.today(
+                export=export
+            ),
+        ),
+    )
+)
+
+DEMAND_KEYS = frozenset(
+    {
+        *(f"{prefix}{phase}" for prefix in "PIU" for phase in (1, 2, 3)),
+        "WATTMETER_TIME",
+        DEMAND_LIMIT_KEY,
+    }
 )
 
-BINARY_SENSOR_TYPES: tuple[BinarySensorEntityDescription, ...] = (
-    BinarySensorEntityDescription(
-        key="sw,AUTOMATIC UPDATE",
-        name="Automatic update",
+
+def _demand_attributes(coordinator: Any) -> dict[str, Any]:
+    demand = coordinator.demand
+    return {
+        "energy": round(demand.energy, 3),
+        "limit": demand.limit,
+        **{
+            f"average_power_{seconds // 60}min": None
+            if (power := demand.ring.power(seconds)) is None
+            else round(power)
+            for seconds in DEMAND_WINDOWS
+        },
+    }
+
+
+DEMAND_SENSOR_TYPES: tuple[EVMateComputedSensorEntityDescription, ...] = (
+    EVMateComputedSensorEntityDescription(
+        key="projected_15min_energy",
+        name="Projected 15-minute energy",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        suggested_display_precision=2,
+        data_keys=DEMAND_KEYS,
+        value_fn=lambda coordinator: coordinator.demand.projected_energy,
+        attributes_fn=_demand_attributes,
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="time_to_15min_limit",
+        name="Time to 15-minute energy limit",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        suggested_unit_of_measurement=UnitOfTime.MINUTES,
+        data_keys=DEMAND_KEYS,
+        value_fn=lambda coordinator: coordinator.demand.time_to_limit,
+    ),
+)
+
+PROFILE_SENSOR_TYPES: tuple[EVMateComputedSensorEntityDescription, ...] = (
+    EVMateComputedSensorEntityDescription(
+        key="peak_15min_power",
+        name="Peak 15-minute power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        data_keys=PROFILE_KEYS,
+        value_fn=lambda coordinator: getattr(
+            coordinator.profile, "peak_15min_power", None
+        ),
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="hour_import",
+        name="Energy import this hour",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        data_keys=PROFILE_KEYS,
+        value_fn=lambda coordinator: getattr(coordinator.profile, "hour_import", None),
+        attributes_fn=lambda coordinator: (
+            {"projection": coordinator.profile.hour_import_projection}
+            if coordinator.profile
+            else None
+        ),
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="last_hour_import",
+        name="Energy import last hour",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        data_keys=PROFILE_KEYS,
+        value_fn=lambda coordinator: getattr(
+            coordinator.profile, "last_hour_import", None
+        ),
+        attributes_fn=lambda coordinator: (
+            {"hourly": coordinator.profile.hourly.series()}
+            if coordinator.profile
+            else None
+        ),
+    ),
+    EVMateComputedSensorEntityDescription(
+        key="last_hour_export",
+        name="Energy export last hour",
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        data_keys=PROFILE_KEYS,
+        value_fn=lambda coordinator: getattr(
+            coordinator.profile, "last_hour_export", None
+        ),
+    ),
+)
+
+
+def _costs(coordinator: Any, period: str) -> Any:
+    """Return the cost totals of ``today``, ``this_month`` or ``last_hour``."""
+    if (costs := coordinator.config_entry.runtime_data.costs) is None:
+        return None
+    return costs.last_hour if period == "last_hour" else getattr(costs, period)()
+
+
+def _cost_value(coordinator: Any, period: str, field: str) -> float | None:
+    totals = _costs(coordinator, period)
+    return None if totals is None else round(getattr(totals, field), 2)
+
+
+def _cost_attributes(coordinator: Any, period: str) -> dict[str, Any] | None:
+    totals = _costs(coordinator, period)
+    return None if totals is None else totals.as_dict()
+
+
+# The currency of the Home Assistant configuration is the unit of the costs,
+# the sensors are only added with a tariff.
+COST_SENSOR_TYPES: tuple[EVMateComputedSensorEntityDescription, ...] = (
+    *(
+        EVMateComputedSensorEntityDescription(
+            key=f"{field}_{period}",
+            name=f"{label} {period.replace('_', ' ')}",
+            device_class=SensorDeviceClass.MONETARY,
+            suggested_display_precision=2,
+            data_keys=PROFILE_KEYS,
+            value_fn=lambda coordinator, period=period, field=field: _cost_value(
+                coordinator, period, field
+            ),
+            attributes_fn=lambda coordinator, period=period: _cost_attributes(
+                coordinator, period
+            ),
+        )
+        for period in ("today", "this_month", "last_hour")
+        for field, label in (
+            ("import_cost", "Energy cost"),
+            ("export_revenue", "Export revenue"),
+        )
     ),
-    BinarySensorEntityDescription(
-        key="sw,ENABLE CHARGING",
-        name="Enable charging",
+    EVMateComputedSensorEntityDescription(
+        key="peak_import_share_today",
+        name="Peak-hour import share today",
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=1,
+        data_keys=PROFILE_KEYS,
+        value_fn=lambda coordinator: getattr(
+            _costs(coordinator, "today"), "peak_share", None
+        ),
     ),
 )
@@ -2,31 +2,405 @@
 
 from __future__ import annotations
 
+import time
 from typing import TYPE_CHECKING, Any
 
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .api import (
     IntegrationEvmateApiClientAuthenticationError,
     IntegrationEvmateApiClientError,
 )
+from .const import (
+    DOMAIN,
+    ENDPOINT_DATA,
+    ENDPOINTS,
+    EVENT_DEMAND_LIMIT,
+    LOGGER,
+    SNAPSHOT_SAVE_DELAY,
+    STALE_INTERVALS,
+)
+from .decoder import decode_profile
+from .delta import EnergyDeltas
+from .demand import DemandGuard
+from .schema import KNOWN_KEYS, extract_values
 
 if TYPE_CHECKING:
+    from datetime import timedelta
+    from logging import Logger
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.storage import Store
+
     from .data import IntegrationEVMateConfigEntry
+    from .decoder import MeterProfile
+
+_MISSING = object()
 
 
 # https://developers.home-assistant.io/docs/integration_fetching_data#coordinated-single-api-poll-for-data-for-all-entities
 class EVMateDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the API."""
+    """
+    Class to manage fetching data from the API.
+
+    Every endpoint is polled on its own interval. The coordinator ticks at the
+    shortest of them and only requests the endpoints that are due, the payloads
+    of the others are kept from their last fetch. Listeners are only notified
+    when one of the endpoint payloads changed. With ``schedule`` off the
+    coordinator does not schedule its own refreshes, the fleet does. Refreshes
+    slower than ``slow_refresh`` seconds are logged with the timings of their
+    requests.
+
+    An endpoint that fails keeps its last good payload. Once that is older
+    than ``STALE_INTERVALS`` of its intervals the endpoint is stale and the
+    entities read from it are unavailable until it answers again.
+
+    With a ``store`` the payloads are saved as a snapshot that the next start
+    restores, the entities come up from it while the meter is still being
+    read. Restored payloads are due at once and count as received at the
+    restore, they go stale like any other if the meter does not answer.
+    """
 
     config_entry: IntegrationEVMateConfigEntry
+    # Endpoints whose last good payload is too old, as of the last update
+    stale_endpoints: frozenset[str] = frozenset()
+    # True while the data is the snapshot of a previous run
+    restored: bool = False
+
+    def __init__(  # noqa: PLR0913
+        self,
+        hass: HomeAssistant,
+        logger: Logger,
+        name: str,
+        intervals: dict[str, timedelta],
+        *,
+        schedule: bool = True,
+        store: Store[dict[str, Any]] | None = None,
+    ) -> None:
+        """Initialize the coordinator with per-endpoint polling intervals."""
+        self.refresh_interval = min(intervals.values())
+        super().__init__(
+            hass=hass,
+            logger=logger,
+            name=name,
+            update_interval=self.refresh_interval if schedule else None,
+            always_update=False,
+        )
+        self._intervals = {
+            endpoint: interval.total_seconds()
+            for endpoint, interval in intervals.items()
+        }
+        self._payloads: dict[str, dict[str, Any]] = {}
+        # Endpoints whose payload was not reported by the meter, e.g. values
+        # being written, they are archived once the meter reports them again
+        self._unarchived: set[str] = set()
+        self._store = store
+        self._next_fetch: dict[str, float] = {}
+        # Monotonic time the last good payload of every endpoint arrived at
+        self.received: dict[str, float] = {}
+        # Endpoints delivered by a stream instead of being polled
+        self._streamed: set[str] = set()
+        # Number of HTTP requests the last update caused.
+        self.last_update_requests = 0
+        # Seconds the requests of the last update took, None without requests.
+        self.last_update_latency: float | None = None
+        # Seconds the last notification of the listeners took and their count.
+        self.last_fan_out: float | None = None
+        self._fan_outs = 0
+        # Seconds a refresh may take before it is logged, 0 logs none.
+        self.slow_refresh: float = 0
+        self._last_due: list[str] = []
+        self.profile: MeterProfile | None = None
+        self.deltas = EnergyDeltas()
+        self.demand = DemandGuard()
+        # Keys whose value changed in the last update, None when all did.
+        self.changed_keys: set[str] | None = None
+        # Entity values of the schema keys, converted once per change.
+        self.values: dict[str, Any] = {}
+        self._unknown_keys: set[str] = set()
+
+    async def async_restore(self) -> bool:
+        """Load the snapshot of the previous run, return whether there was one."""
+        if self._store is None or (snapshot := await self._store.async_load()) is None:
+            return False
+        now = time.monotonic()
+        self.data = self._merge(snapshot["payloads"], now, reported=False)
+        self._next_fetch = dict.fromkeys(self._payloads, now)
+        # Nothing is counted from the snapshot, the counters may have moved on
+        # for hours. The first live sample is the baseline of the energy
+        # deltas and of the demand.
+        self.restored = True
+        return True
+
+    def _due_endpoints(self, now: float) -> list[str]:
+        """Return the endpoints whose interval elapsed or that have no payload."""
+        return [
+            endpoint
+            for endpoint in ENDPOINTS
+            if endpoint not in self._payloads
+            or (endpoint not in self._streamed and now >= self._next_fetch[endpoint])
+        ]
+
+    async def async_refresh(self) -> None:
+        """Refresh the data and log the refresh if it was slow."""
+        started = time.perf_counter()
+        fan_outs = self._fan_outs
+        stale = self.stale_endpoints
+        await super().async_refresh()
+        if (
+            self.stale_endpoints != stale
+            and self._fan_outs == fan_outs
+            and self.last_update_success
+        ):
+            # No data changed, the entities still have to follow the staleness
+            self.changed_keys = set()
+            self.async_update_listeners()
+        elapsed = time.perf_counter() - started
+        if self.slow_refresh and elapsed > self.slow_refresh:
+            fan_out = self.last_fan_out if self._fan_outs != fan_outs else 0
+            self._log_slow_refresh(elapsed, fan_out or 0)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners and measure how long that took."""
+        started = time.perf_counter()
+        super().async_update_listeners()
+        self.last_fan_out = time.perf_counter() - started
+        self._fan_outs += 1
+
+    def _log_slow_refresh(self, elapsed: float, fan_out: float) -> None:
+        metrics = self.config_entry.runtime_data.client.metrics
+        LOGGER.warning(
+            "Refreshing %s took %.0f ms (requests %.0f ms, listeners %.1f ms): %s",
+            self.config_entry.title,
+            elapsed * 1000,
+            (self.last_update_latency or 0) * 1000 if self._last_due else 0,
+            fan_out * 1000,
+            ", ".join(
+                f"{endpoint} {(metrics[endpoint].last_latency or 0) * 1000:.0f} ms"
+                f" {metrics[endpoint].last_bytes} B decoded in"
+                f" {(metrics[endpoint].last_decode_time or 0) * 1000:.1f} ms"
+                f" {metrics[endpoint].consecutive_failures} failures in a row"
+                for endpoint in self._last_due
+            )
+            or "no requests",
+        )
+
+    @callback
+    def async_set_streaming(self, endpoint: str, *, streaming: bool) -> None:
+        """Stop or resume polling an endpoint whose payloads are pushed."""
+        if streaming:
+            self._streamed.add(endpoint)
+        else:
+            self._streamed.discard(endpoint)
+
+    @callback
+    def async_set_endpoint_payload(
+        self, endpoint: str, payload: dict[str, Any]
+    ) -> None:
+        """
+        Merge a payload pushed by the meter and notify the listeners.
+
+        Unlike ``async_set_updated_data`` this leaves the refresh schedule
+        alone, frequent pushes must not postpone the polled endpoints.
+        """
+        self._async_set_payloads({endpoint: payload})
+
+    @callback
+    def async_set_optimistic(self, endpoint: str, values: dict[str, Any]) -> None:
+        """Apply values that are being written before the meter confirms them."""
+        if endpoint in self._payloads:
+            self._async_set_payloads(
+                {endpoint: {**self._payloads[endpoint], **values}}, reported=False
+            )
+
+    async def async_refresh_endpoints(self, endpoints: list[str]) -> None:
+        """Re-read only the given endpoints, e.g. to confirm a write."""
+        client = self.config_entry.runtime_data.client
+        try:
+            payloads = await client.async_get_endpoints(endpoints)
+        except IntegrationEvmateApiClientError as exception:
+            LOGGER.warning("Re-reading %s failed: %s", endpoints, exception)
+            return
+        self._async_set_payloads(payloads)
+
+    @callback
+    def _async_set_payloads(
+        self, payloads: dict[str, dict[str, Any]], *, reported: bool = True
+    ) -> None:
+        """Merge endpoint payloads outside of a refresh and notify on change."""
+        if self.data is None:
+            return
+        data = self._merge(payloads, time.monotonic(), reported=reported)
+        if data is not self.data:
+            self.data = data
+            self.async_update_listeners()
 
     async def _async_update_data(self) -> Any:
         """Update data via library."""
+        client = self.config_entry.runtime_data.client
+        request_count = client.request_count
+        now = time.monotonic()
+        if self.data is not None:
+            self.changed_keys = set()
+        self._last_due = due = self._due_endpoints(now)
+        if not due:
+            self.last_update_requests = 0
+            self.stale_endpoints = self._stale_endpoints(now)
+            return self.data
         try:
-            return await self.config_entry.runtime_data.client.async_get_data()
+            payloads = await client.async_get_endpoints(due)
+            self.last_update_latency = time.monotonic() - now
         except IntegrationEvmateApiClientAuthenticationError as exception:
             raise ConfigEntryAuthFailed(exception) from exception
         except IntegrationEvmateApiClientError as exception:
             raise UpdateFailed(exception) from exception
+        finally:
+            self.last_update_requests = client.request_count - request_count
+
+        data = self._merge(payloads, now)
+        self.stale_endpoints = self._stale_endpoints(now)
+        return data
+
+    @callback
+    def _async_archive(self, endpoints: set[str]) -> None:
+        """Archive the payloads of endpoints the meter reported."""
+        if not endpoints:
+            return
+        self._unarchived -= endpoints
+        if (archiver := self.config_entry.runtime_data.archiver) is not None:
+            archiver.async_append(
+                {endpoint: self._payloads[endpoint] for endpoint in endpoints},
+                dt_util.utcnow().timestamp(),
+            )
+
+    def _stale_endpoints(self, now: float) -> frozenset[str]:
+        """Return the endpoints whose last good payload is too old."""
+        return frozenset(
+            endpoint
+            for endpoint, received in self.received.items()
+            if now - received > STALE_INTERVALS * self._intervals[endpoint]
+        )
+
+    def _merge(
+        self, payloads: dict[str, dict[str, Any]], now: float, *, reported: bool = True
+    ) -> Any:
+        """
+        Merge new endpoint payloads, returning the current data if none changed.
+
+        Payloads that were not ``reported`` by the meter, the restored snapshot
+        and values being written, are neither archived nor end the restore.
+        They only fill the entities, nothing is counted or fired from them.
+        """
+        # An unchanged body hands back the very same payload object
+        changed: dict[str, dict[str, Any]] = {}
+        # The first live payload ends the restore, the entities drop the flag
+        was_restored = self.restored and reported
+        if reported:
+            self.restored = False
+        for endpoint, payload in payloads.items():
+            self._next_fetch[endpoint] = now + self._intervals[endpoint]
+            self.received[endpoint] = now
+            previous = self._payloads.get(endpoint)
+            if previous is not payload and previous != payload:
+                changed[endpoint] = previous or {}
+                self._payloads[endpoint] = payload
+                self._check_keys(endpoint, payload)
+
+        # The first live payload is processed even if the snapshot matches it
+        process_data = ENDPOINT_DATA in changed or (
+            was_restored and ENDPOINT_DATA in payloads
+        )
+        if process_data:
+            self._async_process_data(
+                self._payloads[ENDPOINT_DATA], now, reported=reported
+            )
+        if changed and self._store is not None:
+            self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+        if reported:
+            self._async_archive(payloads.keys() & self._unarchived | changed.keys())
+        else:
+            self._unarchived.update(changed)
+
+        if not changed and not was_restored and self.data is not None:
+            # Returning the same object keeps the listeners quiet.
+            return self.data
+
+        data: dict[str, Any] = {}
+        for endpoint in ENDPOINTS:
+            data.update(self._payloads.get(endpoint, {}))
+        if self.data is None:
+            self.values = extract_values(data)
+        else:
+            self.changed_keys = self._changed_keys(changed, data)
+            self.values.update(extract_values(data, self.changed_keys))
+        if process_data and reported:
+            self._async_sample_demand(now)
+        return data
+
+    @callback
+    def _async_sample_demand(self, now: float) -> None:
+        """Add the phase readings to the demand guard, firing its crossings."""
+        exceeded = self.demand.add(self.values, now, dt_util.now())
+        if exceeded is not None:
+            self.hass.bus.async_fire(
+                EVENT_DEMAND_LIMIT,
+                {
+                    "entry_id": self.config_entry.entry_id,
+                    "exceeded": exceeded,
+                    "projected_energy": self.demand.projected_energy,
+                    "limit": self.demand.limit,
+                },
+            )
+
+    def _snapshot(self) -> dict[str, Any]:
+        return {"payloads": self._payloads}
+
+    def _check_keys(self, endpoint: str, payload: dict[str, Any]) -> None:
+        """Log the keys missing from the schema, once per key."""
+        if unknown := payload.keys() - KNOWN_KEYS - self._unknown_keys:
+            self._unknown_keys.update(unknown)
+            LOGGER.info(
+                "%s of %s delivers keys unknown to this integration: %s",
+                endpoint,
+                self.config_entry.title,
+                ", ".join(sorted(unknown)),
+            )
+
+    def _changed_keys(
+        self, previous: dict[str, dict[str, Any]], data: dict[str, Any]
+    ) -> set[str]:
+        """Return the keys of the changed endpoints whose merged value changed."""
+        keys: set[str] = set()
+        for endpoint, payload in previous.items():
+            keys.update(payload.keys() | self._payloads[endpoint].keys())
+        return {
+            key
+            for key in keys
+            if self.data.get(key, _MISSING) != data.get(key, _MISSING)
+        }
+
+    @callback
+    def _async_process_data(
+        self, payload: dict[str, Any], now: float, *, reported: bool = True
+    ) -> None:
+        """Decode a new updateData payload and merge it into the history."""
+        self.profile = decode_profile(payload)
+        if not reported:
+            return
+        self.deltas.update(payload, now, dt_util.now(), self.profile.time)
+        runtime_data = self.config_entry.runtime_data
+        runtime_data.history.async_update(payload)
+        if runtime_data.costs is not None:
+            runtime_data.costs.async_update(self.profile)
+        if runtime_data.statistics is not None:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                runtime_data.statistics.async_import(
+                    self.profile, runtime_data.history
+                ),
+                f"{DOMAIN} statistics import",
+            )
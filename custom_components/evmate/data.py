@@ -10,8 +10,14 @@ from homeassistant.config_entries import ConfigEntry
 if TYPE_CHECKING:
     from homeassistant.loader import Integration
 
+    from .analytics import EVMateEnergyCosts
     from .api import IntegrationEvmateApiClient
+    from .archive import EVMateArchiver
     from .coordinator import EVMateDataUpdateCoordinator
+    from .evse import EVMateEvseTracker
+    from .history import EVMateEnergyHistory
+    from .statistics import EVMateStatisticsImporter
+    from .write import EVMateWriter
 
 type IntegrationEVMateConfigEntry = ConfigEntry[IntegrationEVMateData]
 
@@ -23,3 +29,9 @@ class IntegrationEVMateData:
     client: IntegrationEvmateApiClient
     coordinator: EVMateDataUpdateCoordinator
     integration: Integration
+    history: EVMateEnergyHistory
+    evse: EVMateEvseTracker
+    writer: EVMateWriter
+    statistics: EVMateStatisticsImporter | None = None
+    costs: EVMateEnergyCosts | None = None
+    archiver: EVMateArchiver | None = None
@@ -0,0 +1,125 @@
+"""Decoder of the packed "Es" and "Pm" arrays of updateData for evmate."""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .history import meter_time
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# Values per hour in "Es": hour, import Wh, export Wh, valid flag.
+HOURLY_GROUP = 4
+# Samples of "Pm" (one per minute) averaged for the demand peak.
+DEMAND_WINDOW = 15
+
+
+class HourlyEnergy:
+    """
+    Hours of the "Es" array as strided views over one ``array``.
+
+    The array starts with its own length followed by one group per hour, the
+    oldest hour first and the hour that is still counted last. The columns are
+    ``memoryview`` slices of the same buffer, no per-hour objects are built.
+    """
+
+    __slots__ = ("exports", "hours", "imports", "valid")
+
+    def __init__(self, es: list[int]) -> None:
+        """Wrap the raw "Es" array."""
+        buffer = array("i", es)
+        groups = max(len(buffer) - 1, 0) // HOURLY_GROUP
+        view = memoryview(buffer)[1 : 1 + groups * HOURLY_GROUP]
+        self.hours = view[0::HOURLY_GROUP]
+        self.imports = view[1::HOURLY_GROUP]
+        self.exports = view[2::HOURLY_GROUP]
+        self.valid = view[3::HOURLY_GROUP]
+
+    def __len__(self) -> int:
+        """Return the number of hours."""
+        return len(self.hours)
+
+    def series(self) -> list[list[int]]:
+        """Return the [hour, import Wh, export Wh] series, oldest first."""
+        return [
+            list(group)
+            for group in zip(self.hours, self.imports, self.exports, strict=True)
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class MeterProfile:
+    """Decoded hourly energy and power profile of one updateData payload."""
+
+    hourly: HourlyEnergy
+    power: memoryview
+    time: datetime | None
+    average_power: float | None = None
+    peak_15min_power: float | None = None
+    hour_import: int | None = None
+    hour_export: int | None = None
+    hour_import_projection: float | None = None
+    last_hour_import: int | None = None
+    last_hour_export: int | None = None
+
+
+def _demand(power: memoryview) -> tuple[float | None, float | None]:
+    """Return the average and the peak 15-sample mean of the power profile."""
+    if not power:
+        return None, None
+    total = 0
+    window = 0
+    peak = None
+    for index, sample in enumerate(power):
+        total += sample
+        window += sample
+        if index >= DEMAND_WINDOW:
+            window -= power[index - DEMAND_WINDOW]
+        if index >= DEMAND_WINDOW - 1 and (peak is None or window > peak):
+            peak = window
+    return (
+        total / len(power),
+        None if peak is None else peak / DEMAND_WINDOW,
+    )
+
+
+def decode_profile(data: dict[str, Any]) -> MeterProfile:
+    """Decode the "Es" and "Pm" arrays of an updateData payload."""
+    hourly = HourlyEnergy(data.get("Es", []))
+    # "Pm" also starts with its own length, one power sample (W) per minute follows
+    power = memoryview(array("i", data.get("Pm", [])))[1:]
+    try:
+        now = meter_time(data["WATTMETER_TIME"])
+    except (KeyError, ValueError):
+        now = None
+    average_power, peak_15min_power = _demand(power)
+
+    if not hourly:
+        return MeterProfile(
+            hourly,
+            power,
+            now,
+            average_power=average_power,
+            peak_15min_power=peak_15min_power,
+        )
+
+    projection = None
+    elapsed = None if now is None else now.minute * 60 + now.second
+    if elapsed and hourly.hours[-1] == now.hour:
+        projection = hourly.imports[-1] * 3600 / elapsed
+    closed = len(hourly) > 1
+    return MeterProfile(
+        hourly,
+        power,
+        now,
+        average_power=average_power,
+        peak_15min_power=peak_15min_power,
+        hour_import=hourly.imports[-1],
+        hour_export=hourly.exports[-1],
+        hour_import_projection=projection,
+        last_hour_import=hourly.imports[-2] if closed else None,
+        last_hour_export=hourly.exports[-2] if closed else None,
+    )
@@ -0,0 +1,142 @@
+"""Power and energy derived from the cumulative counters of updateData."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from .const import (
+    CLOCK_SKEW_TOLERANCE,
+    COUNTER_ENERGY_KWH,
+    COUNTER_KEYS,
+    DELTA_MAX_POWER,
+    LOGGER,
+)
+
+if TYPE_CHECKING:
+    from datetime import date, datetime
+
+# Wh per counter unit and the counters of one direction.
+_UNIT_WH = COUNTER_ENERGY_KWH * 1000
+_PHASES = len(COUNTER_KEYS) // 2
+# Daily counters of the meter matching ``COUNTER_KEYS``.
+_DAILY_KEYS = tuple(key.replace("t", "d", 1) for key in COUNTER_KEYS)
+
+
+class EnergyDeltas:
+    """
+    Power, interval and daily energy from the steps of the energy counters.
+
+    Only the previous sample of every counter is kept, in fixed-size arrays.
+    The counters step in units of 10 Wh, so most polls see no change: the
+    power of a counter is its last step over the time since the step before
+    and decays while no further step arrives. A counter that went backwards
+    was reset, its new reading is the energy since the reset. A step that
+    implies more than ``DELTA_MAX_POWER`` is a glitch and only moves the
+    baseline.
+
+    The daily totals start from the daily counters of the meter and roll over
+    at the meter's midnight, or at the local one while the meter clock is off
+    by more than ``CLOCK_SKEW_TOLERANCE``.
+    """
+
+    __slots__ = (
+        "_changed_at",
+        "_day",
+        "_interval",
+        "_power",
+        "_previous",
+        "_sampled_at",
+        "_today",
+    )
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        size = len(COUNTER_KEYS)
+        # Last reading of every counter, -1 before the first one
+        self._previous = array("q", [-1] * size)
+        # Monotonic time of the last step and the power it implied
+        self._changed_at = array("d", [math.nan] * size)
+        self._power = array("d", [math.nan] * size)
+        # Counter units of the last sample and of the current day
+        self._interval = array("q", [0] * size)
+        self._today = array("q", [0] * size)
+        self._sampled_at: float | None = None
+        self._day: date | None = None
+
+    def update(
+        self,
+        data: dict[str, Any],
+        now: float,
+        local_now: datetime,
+        meter_now: datetime | None,
+    ) -> None:
+        """Merge the counters of a sample received at monotonic ``now``."""
+        skewed = (
+            meter_now is None
+            or abs((meter_now - local_now).total_seconds()) > CLOCK_SKEW_TOLERANCE
+        )
+        day = local_now.date() if skewed else meter_now.date()
+        if day != self._day:
+            # The meter's own daily counters are only right on its own day
+            first = self._day is None and not skewed
+            for index, key in enumerate(_DAILY_KEYS):
+                value = data.get(key)
+                self._today[index] = value if first and isinstance(value, int) else 0
+            self._day = day
+
+        elapsed = None if self._sampled_at is None else now - self._sampled_at
+        self._sampled_at = now
+        for index, key in enumerate(COUNTER_KEYS):
+            self._interval[index] = 0
+            value = data.get(key)
+            if not isinstance(value, int):
+                continue
+            previous = self._previous[index]
+            self._previous[index] = value
+            if previous < 0 or elapsed is None or elapsed <= 0:
+                continue
+            # A counter that went backwards was reset and counts up from zero
+            delta = value - previous if value >= previous else value
+            if delta * _UNIT_WH * 3600 > DELTA_MAX_POWER * elapsed:
+                LOGGER.debug(
+                    "Ignoring a step of %s from %s to %s", key, previous, value
+                )
+                self._changed_at[index] = math.nan
+                self._power[index] = math.nan
+                continue
+            changed_at = self._changed_at[index]
+            if not delta:
+                if not math.isnan(self._power[index]):
+                    # No step yet, the power is at most one unit since the last
+                    self._power[index] = min(
+                        self._power[index], _UNIT_WH * 3600 / (now - changed_at)
+                    )
+                continue
+            self._interval[index] = delta
+            self._today[index] += delta
+            if not math.isnan(changed_at):
+                self._power[index] = delta * _UNIT_WH * 3600 / (now - changed_at)
+            self._changed_at[index] = now
+
+    def power(self, *, export: bool) -> float | None:
+        """Return the power (W) of all phases, None before a second step."""
+        known = [
+            power for power in self._slice(self._power, export) if not math.isnan(power)
+        ]
+        return round(sum(known), 1) if known else None
+
+    def interval_energy(self, *, export: bool) -> float:
+        """Return the energy (Wh) of all phases since the previous sample."""
+        return sum(self._slice(self._interval, export)) * _UNIT_WH
+
+    def today(self, *, export: bool) -> float | None:
+        """Return the energy (kWh) of all phases today, None before a sample."""
+        if self._day is None:
+            return None
+        return round(sum(self._slice(self._today, export)) * COUNTER_ENERGY_KWH, 2)
+
+    @staticmethod
+    def _slice(values: array, export: bool) -> array:  # noqa: FBT001
+        return values[_PHASES:] if export else values[:_PHASES]
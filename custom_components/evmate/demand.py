@@ -0,0 +1,176 @@
+"""Rolling phase readings and the 15-minute demand guard for evmate."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Any
+
+from .const import DEMAND_LIMIT_KEY, DEMAND_PERIOD, DEMAND_WINDOWS, RING_CAPACITY
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+# Readings kept per sample, the powers first.
+CHANNELS: tuple[str, ...] = tuple(
+    f"{prefix}{phase}" for prefix in "PIU" for phase in (1, 2, 3)
+)
+_POWERS = 3
+# Readings are kept as integer hundredths, the running sums never drift.
+_SCALE = 100
+
+
+class PhaseRing:
+    """
+    Fixed-capacity ring of the phase readings with rolling averages.
+
+    The samples are written into ``array`` columns allocated once. Every
+    window keeps the sequence number of its oldest sample and the running
+    sums of its samples, a new sample adds to the sums and subtracts the
+    samples that left the window, which is O(1) amortized. Once the ring is
+    full the oldest sample is overwritten and leaves every window still
+    holding it.
+    """
+
+    __slots__ = ("_capacity", "_columns", "_count", "_sums", "_tails", "_times")
+
+    def __init__(self, capacity: int = RING_CAPACITY) -> None:
+        """Allocate the columns of ``capacity`` samples."""
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._columns = [array("q", bytes(8 * capacity)) for _ in CHANNELS]
+        # Samples added so far, the next one goes to ``_count % capacity``
+        self._count = 0
+        # Per window the sequence number of its oldest sample and its sums
+        self._tails = array("q", bytes(8 * len(DEMAND_WINDOWS)))
+        self._sums = [array("q", bytes(8 * len(CHANNELS))) for _ in DEMAND_WINDOWS]
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return min(self._count, self._capacity)
+
+    def add(self, values: dict[str, Any], now: float) -> None:
+        """Add the readings of a sample taken at monotonic ``now``."""
+        sequence = self._count
+        index = sequence % self._capacity
+        if sequence >= self._capacity:
+            for window in range(len(DEMAND_WINDOWS)):
+                if self._tails[window] <= sequence - self._capacity:
+                    self._drop(window)
+        self._times[index] = now
+        for channel, key in enumerate(CHANNELS):
+            value = values.get(key)
+            reading = round(value * _SCALE) if value is not None else 0
+            self._columns[channel][index] = reading
+            for sums in self._sums:
+                sums[channel] += reading
+        self._count = sequence + 1
+        for window, seconds in enumerate(DEMAND_WINDOWS):
+            while (
+                self._tails[window] < sequence
+                and self._times[self._tails[window] % self._capacity] <= now - seconds
+            ):
+                self._drop(window)
+
+    def _drop(self, window: int) -> None:
+        """Remove the oldest sample of a window from its sums."""
+        index = self._tails[window] % self._capacity
+        sums = self._sums[window]
+        for channel, column in enumerate(self._columns):
+            sums[channel] -= column[index]
+        self._tails[window] += 1
+
+    def average(self, key: str, seconds: int) -> float | None:
+        """Return the average of a reading over a window, None without samples."""
+        window = DEMAND_WINDOWS.index(seconds)
+        if not (count := self._count - self._tails[window]):
+            return None
+        return self._sums[window][CHANNELS.index(key)] / count / _SCALE
+
+    def power(self, seconds: int) -> float | None:
+        """Return the average power (W) of all phases over a window."""
+        window = DEMAND_WINDOWS.index(seconds)
+        if not (count := self._count - self._tails[window]):
+            return None
+        return sum(self._sums[window][:_POWERS]) / count / _SCALE
+
+
+class DemandGuard:
+    """
+    Projected energy of the current demand period against its limit.
+
+    The energy of the quarter hour is integrated from the power of every
+    sample since the first one in it, the rest of the quarter is projected
+    at the 1-minute average power. ``add`` tells when the projection crossed
+    the limit configured in the meter.
+    """
+
+    __slots__ = (
+        "_period",
+        "_power",
+        "_sampled_at",
+        "energy",
+        "exceeded",
+        "limit",
+        "projected_energy",
+        "ring",
+        "time_to_limit",
+    )
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        self.ring = PhaseRing()
+        self._period: datetime | None = None
+        self._sampled_at: float | None = None
+        self._power = 0.0
+        # kWh of the current period so far and projected to its end
+        self.energy = 0.0
+        self.projected_energy: float | None = None
+        self.limit: float | None = None
+        # Seconds until the limit is reached, None if not in this period
+        self.time_to_limit: float | None = None
+        self.exceeded = False
+
+    def add(
+        self, values: dict[str, Any], now: float, local_now: datetime
+    ) -> bool | None:
+        """
+        Add a sample taken at monotonic ``now``.
+
+        Return True when the projection went past the limit, False when it
+        went back below it and None otherwise.
+        """
+        self.ring.add(values, now)
+        minute = local_now.minute - local_now.minute % (DEMAND_PERIOD // 60)
+        period = local_now.replace(minute=minute, second=0, microsecond=0)
+        into_period = (local_now - period).total_seconds()
+        if self._sampled_at is not None:
+            elapsed = now - self._sampled_at
+            if period != self._period:
+                self.energy = 0.0
+                elapsed = min(elapsed, into_period)
+            self.energy += self._power * elapsed / 3_600_000
+        self._period = period
+        self._sampled_at = now
+        self._power = max(sum(values.get(f"P{phase}") or 0 for phase in (1, 2, 3)), 0)
+
+        power = max(self.ring.power(DEMAND_WINDOWS[0]) or 0, 0)
+        remaining = DEMAND_PERIOD - into_period
+        self.projected_energy = round(self.energy + power * remaining / 3_600_000, 3)
+        self.limit = values.get(DEMAND_LIMIT_KEY) or None
+        if self.limit is None:
+            self.time_to_limit = None
+        elif self.energy >= self.limit:
+            self.time_to_limit = 0
+        elif (
+            power
+            and (seconds := (self.limit - self.energy) * 3_600_000 / power) <= remaining
+        ):
+            self.time_to_limit = round(seconds)
+        else:
+            self.time_to_limit = None
+
+        exceeded = self.limit is not None and self.projected_energy >= self.limit
+        if exceeded == self.exceeded:
+            return None
+        self.exceeded = exceeded
+        return exceeded
@@ -0,0 +1,80 @@
+"""Diagnostics support for evmate."""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+from homeassistant.const import CONF_IP_ADDRESS
+
+from .fleet import async_get_fleet
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .data import IntegrationEVMateConfigEntry
+
+# The title is the address of the meter unless it was renamed
+TO_REDACT = {
+    CONF_IP_ADDRESS,
+    "ID",
+    "unique_id",
+    "title",
+    "STATIC_IP",
+    "GATEWAY",
+    "DNS",
+    "MASK",
+}
+
+
+def _redact_address(text: str | None, address: str) -> str | None:
+    """Remove the meter address from an error, the request URLs contain it."""
+    return None if text is None else text.replace(address, REDACTED)
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: IntegrationEVMateConfigEntry,
+) -> dict[str, Any]:
+    """Return the request metrics and refresh timings of a meter."""
+    coordinator = entry.runtime_data.coordinator
+    client = entry.runtime_data.client
+    fleet = async_get_fleet(hass)
+    address = entry.data[CONF_IP_ADDRESS]
+    now = time.monotonic()
+    endpoints = {
+        endpoint: metrics.as_dict() for endpoint, metrics in client.metrics.items()
+    }
+    for metrics in endpoints.values():
+        metrics["last_error"] = _redact_address(metrics["last_error"], address)
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "restored": coordinator.restored,
+            "last_exception": _redact_address(
+                repr(coordinator.last_exception), address
+            ),
+            "refresh_interval": coordinator.refresh_interval.total_seconds(),
+            "last_update_requests": coordinator.last_update_requests,
+            "last_update_latency": coordinator.last_update_latency,
+            "last_fan_out": coordinator.last_fan_out,
+            "stale_endpoints": sorted(coordinator.stale_endpoints),
+            "payload_ages": {
+                endpoint: now - received
+                for endpoint, received in coordinator.received.items()
+            },
+        },
+        "circuit": {
+            "state": client.breaker.state,
+            "failures": client.breaker.failures,
+            "retry_in": client.breaker.retry_at - now
+            if client.breaker.retry_at is not None
+            else None,
+        },
+        "requests": client.request_count,
+        "endpoints": endpoints,
+        "fleet": {"meters": len(fleet), "latencies": fleet.latencies()},
+        "data": async_redact_data(coordinator.data or {}, TO_REDACT),
+    }
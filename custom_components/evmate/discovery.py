@@ -0,0 +1,108 @@
+"""Discovery of the IoTMeters on the local networks for evmate."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from homeassistant.components import network
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import IntegrationEvmateApiClient, IntegrationEvmateApiClientError
+from .const import (
+    DISCOVERY_MAX_PREFIX,
+    DISCOVERY_PARALLEL,
+    DISCOVERY_PORT,
+    DISCOVERY_TIMEOUT,
+    ENDPOINT_SETTING,
+    LOGGER,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import aiohttp
+    from homeassistant.core import HomeAssistant
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveredMeter:
+    """An IoTMeter that answered the fingerprint request."""
+
+    address: str
+    port: int
+    meter_id: str
+    sw_version: str | None
+
+
+async def async_get_networks(hass: HomeAssistant) -> list[ipaddress.IPv4Network]:
+    """
+    Return the IPv4 networks of the enabled adapters to scan.
+
+    Networks larger than a /24 are narrowed to the /24 around the address of
+    Home Assistant, a scan of a /16 would take minutes.
+    """
+    networks: set[ipaddress.IPv4Network] = set()
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            prefix = max(ipv4["network_prefix"], DISCOVERY_MAX_PREFIX)
+            subnet = ipaddress.IPv4Network(f"{ipv4['address']}/{prefix}", strict=False)
+            if not subnet.is_loopback:
+                networks.add(subnet)
+    return sorted(networks)
+
+
+async def async_scan(
+    session: aiohttp.ClientSession,
+    networks: Iterable[ipaddress.IPv4Network],
+    port: int = DISCOVERY_PORT,
+    *,
+    parallel: int = DISCOVERY_PARALLEL,
+    request_timeout: float = DISCOVERY_TIMEOUT,
+) -> list[DiscoveredMeter]:
+    """
+    Return the meters answering on ``port`` in the given networks.
+
+    Every address gets a single updateSetting request, at most ``parallel``
+    of them in flight and each cut off after ``request_timeout`` seconds, so
+    a /24 takes about ``254 / parallel * request_timeout`` seconds at worst.
+    Addresses that do not answer with a payload carrying an ``ID`` are
+    skipped.
+    """
+    limiter = asyncio.Semaphore(parallel)
+
+    async def fingerprint(address: str) -> DiscoveredMeter | None:
+        client = IntegrationEvmateApiClient(
+            address,
+            port,
+            session=session,
+            timeouts={ENDPOINT_SETTING: request_timeout},
+            limiter=limiter,
+        )
+        try:
+            payloads = await client.async_get_endpoints([ENDPOINT_SETTING])
+        except IntegrationEvmateApiClientError:
+            return None
+        payload = payloads[ENDPOINT_SETTING]
+        if (meter_id := payload.get("ID")) is None:
+            return None
+        return DiscoveredMeter(
+            address, port, str(meter_id), payload.get("txt,ACTUAL SW VERSION")
+        )
+
+    addresses = [str(host) for subnet in networks for host in subnet.hosts()]
+    results = await asyncio.gather(*(fingerprint(address) for address in addresses))
+    meters = [meter for meter in results if meter is not None]
+    LOGGER.debug("Found %d meters at %d addresses", len(meters), len(addresses))
+    return meters
+
+
+async def async_discover(hass: HomeAssistant) -> list[DiscoveredMeter]:
+    """Return the meters on the local networks of Home Assistant."""
+    return await async_scan(
+        async_get_clientsession(hass), await async_get_networks(hass)
+    )
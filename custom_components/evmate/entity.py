@@ -0,0 +1,176 @@
+"""Base entity for evmate."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import EVMateDataUpdateCoordinator
+from .schema import encode_value, evse_value
+
+if TYPE_CHECKING:
+    from homeassistant.helpers.entity import EntityDescription
+
+
+class EVMateEntity(CoordinatorEntity[EVMateDataUpdateCoordinator]):
+    """
+    Base class of the EVMate entities.
+
+    Entities never poll and never request a refresh on their own, they are
+    written when the coordinator notifies its listeners and one of the data
+    keys they are derived from changed. Availability follows the last
+    coordinator update and the staleness of the endpoint the entity is read
+    from. While the coordinator data is the restored snapshot of the previous
+    run the entities carry a ``restored`` attribute.
+    """
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        unique_id: str,
+        entity_description: EntityDescription,
+        coordinator: EVMateDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        self._attr_name = entity_description.name
+        self._attr_unique_id = unique_id
+        # Key of the coordinator values the state is read from and written to
+        self._value_key = entity_description.key
+        # Keys of the coordinator data the state is derived from, None for all
+        self._data_keys: frozenset[str] | None = frozenset({self._value_key})
+        self._endpoint: str | None = getattr(entity_description, "endpoint", None)
+        self._written_available = True
+        # Entities are added with the state the coordinator has right now
+        self._written_restored = coordinator.restored
+
+    @property
+    def available(self) -> bool:
+        """Return whether the last update succeeded and the value is not stale."""
+        return super().available and (
+            self._endpoint not in self.coordinator.stale_endpoints
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag the values of the snapshot of the previous run."""
+        return {"restored": True} if self.coordinator.restored else None
+
+    def _flags_changed(self) -> bool:
+        """Return whether the availability or the restore changed since written."""
+        return (
+            self.available != self._written_available
+            or self.coordinator.restored != self._written_restored
+        )
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember the flags it was written with."""
+        self._written_available = self.available
+        self._written_restored = self.coordinator.restored
+        super().async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state when a key of the entity or a flag changed."""
+        changed = self.coordinator.changed_keys
+        if (
+            changed is None
+            or self._data_keys is None
+            or self._flags_changed()
+            or not self._data_keys.isdisjoint(changed)
+        ):
+            super()._handle_coordinator_update()
+
+    async def async_write_setting(self, value: float | str) -> None:
+        """Change the setting the entity is read from."""
+        await self.coordinator.config_entry.runtime_data.writer.async_set(
+            self._value_key, encode_value(value)
+        )
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the IoTMeter device the entity belongs to."""
+        entry = self.coordinator.config_entry
+        return DeviceInfo(
+            identifiers={(DOMAIN, entry.unique_id)},
+            name=entry.title,
+            manufacturer="EVMate",
+            model="IoTMeter",
+            sw_version=(self.coordinator.data or {}).get("txt,ACTUAL SW VERSION"),
+        )
+
+
+def evse_device_identifier(meter_id: str, evse: int) -> tuple[str, str]:
+    """Return the device registry identifier of a charger."""
+    return (DOMAIN, f"{meter_id}-evse{evse}")
+
+
+class EVMateEvseEntity(EVMateEntity):
+    """
+    Base class of the entities of one charger.
+
+    Every charger is a device of its own, connected via the meter. The key and
+    the array index the value is read from are resolved once, and an entity is
+    only written when its own element changed, not when any element of the
+    shared array did.
+    """
+
+    def __init__(
+        self,
+        entity_description: EntityDescription,
+        coordinator: EVMateDataUpdateCoordinator,
+        evse: int,
+    ) -> None:
+        """Initialize the entity of EVSE ``evse`` (counted from 1)."""
+        key = entity_description.key
+        super().__init__(
+            f"{coordinator.config_entry.unique_id}-evse{evse}-"
+            + key.replace(",", "_").replace(" ", "_"),
+            entity_description,
+            coordinator,
+        )
+        self.evse = evse
+        if getattr(entity_description, "per_evse_key", False):
+            self._value_key, self._index = f"{key}{evse}", None
+        else:
+            self._value_key, self._index = key, evse - 1
+        self._data_keys = frozenset({self._value_key})
+        self._written_value: Any = None
+
+    @property
+    def evse_value(self) -> Any:
+        """Return the value of the charger."""
+        return evse_value(self.coordinator.values, self._value_key, self._index)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state when the element of the charger changed."""
+        changed = self.coordinator.changed_keys
+        value = self.evse_value
+        if (
+            changed is not None
+            and not self._flags_changed()
+            and value == self._written_value
+        ):
+            return
+        self._written_value = value
+        super()._handle_coordinator_update()
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the charger device the entity belongs to."""
+        entry = self.coordinator.config_entry
+        return DeviceInfo(
+            identifiers={evse_device_identifier(entry.unique_id, self.evse)},
+            name=f"{entry.title} EVSE {self.evse}",
+            manufacturer="EVMate",
+            model="EVSE",
+            via_device=(DOMAIN, entry.unique_id),
+        )
@@ -0,0 +1,108 @@
+"""Chargers (EVSE) connected to an evmate meter."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers import device_registry as dr
+
+from .const import EVSE_COUNT_KEY, LOGGER, MAX_EVSE
+from .entity import evse_device_identifier
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .coordinator import EVMateDataUpdateCoordinator
+    from .data import IntegrationEVMateConfigEntry
+
+
+class EVMateEvseTracker:
+    """
+    Keeps one device with its entities per charger of a meter.
+
+    The number of chargers is read from ``NUMBER_OF_EVSE``. When it grows the
+    platforms create the entities of the new chargers, when it shrinks the
+    devices of the removed chargers are deleted together with their entities.
+    Neither reloads the config entry.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: IntegrationEVMateConfigEntry,
+        coordinator: EVMateDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the tracker of a meter."""
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._platforms: list[
+            tuple[Callable[[int], Iterable[Entity]], AddEntitiesCallback]
+        ] = []
+        self.count = 0
+
+    def _current_count(self) -> int:
+        count = self._coordinator.values.get(EVSE_COUNT_KEY)
+        return min(count, MAX_EVSE) if isinstance(count, int) and count > 0 else 0
+
+    @callback
+    def async_add_platform(
+        self,
+        create_entities: Callable[[int], Iterable[Entity]],
+        async_add_entities: AddEntitiesCallback,
+    ) -> None:
+        """Add the entities of every charger now and of chargers added later."""
+        self._platforms.append((create_entities, async_add_entities))
+        async_add_entities(
+            entity
+            for evse in range(1, self.count + 1)
+            for entity in create_entities(evse)
+        )
+
+    @callback
+    def async_update(self) -> None:
+        """Follow a change of the number of chargers."""
+        changed = self._coordinator.changed_keys
+        if changed is not None and EVSE_COUNT_KEY not in changed:
+            return
+        count = self._current_count()
+        if count == self.count:
+            return
+        LOGGER.debug(
+            "%s has %s chargers instead of %s", self._entry.title, count, self.count
+        )
+        previous, self.count = self.count, count
+        if count > previous:
+            for create_entities, async_add_entities in self._platforms:
+                async_add_entities(
+                    entity
+                    for evse in range(previous + 1, count + 1)
+                    for entity in create_entities(evse)
+                )
+        else:
+            self._async_remove_devices(count)
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Take the current number of chargers and start following it."""
+        self.count = self._current_count()
+        self._async_remove_devices(self.count)
+        return self._coordinator.async_add_listener(self.async_update)
+
+    @callback
+    def _async_remove_devices(self, count: int) -> None:
+        """Delete the devices, and with them the entities, of chargers > count."""
+        device_registry = dr.async_get(self._hass)
+        for evse in range(count + 1, MAX_EVSE + 1):
+            device = device_registry.async_get_device(
+                identifiers={evse_device_identifier(self._entry.unique_id, evse)}
+            )
+            if device is not None:
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=self._entry.entry_id
+                )
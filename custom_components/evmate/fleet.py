@@ -0,0 +1,170 @@
+"""Shared scheduling of the meters of all evmate config entries."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+from typing import TYPE_CHECKING
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+
+from .const import (
+    DOMAIN,
+    FLEET_CONNECTION_LIMIT,
+    FLEET_MAX_REQUESTS,
+    METER_CONNECTION_LIMIT,
+    METER_KEEPALIVE_TIMEOUT,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.core import Event, HomeAssistant
+
+    from .coordinator import EVMateDataUpdateCoordinator
+
+
+class EVMateFleet:
+    """
+    Refresh scheduler and connection pool shared by all meters.
+
+    Every coordinator gets a random phase within its interval when it joins,
+    so meters set up together do not refresh together. Its refreshes then stay
+    on that phase. All clients share one keep-alive connector and one
+    semaphore that caps the requests in flight across the fleet, a slow or
+    unreachable meter only holds its own slots.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize an empty fleet."""
+        self._hass = hass
+        self.limiter = asyncio.Semaphore(FLEET_MAX_REQUESTS)
+        self._session: aiohttp.ClientSession | None = None
+        self._coordinators: dict[str, EVMateDataUpdateCoordinator] = {}
+        # (due loop time, tie breaker, entry id, coordinator), entries of a
+        # removed or replaced coordinator are dropped when they come up
+        self._queue: list[tuple[float, int, str, EVMateDataUpdateCoordinator]] = []
+        self._order = itertools.count()
+        self._refreshing: set[str] = set()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the session on the connector shared by all meters."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=FLEET_CONNECTION_LIMIT,
+                    limit_per_host=METER_CONNECTION_LIMIT,
+                    keepalive_timeout=METER_KEEPALIVE_TIMEOUT,
+                )
+            )
+        return self._session
+
+    def __len__(self) -> int:
+        """Return the number of scheduled meters."""
+        return len(self._coordinators)
+
+    def async_add(
+        self,
+        entry_id: str,
+        coordinator: EVMateDataUpdateCoordinator,
+        *,
+        refresh: bool = False,
+    ) -> None:
+        """
+        Schedule the refreshes of a coordinator at a random phase.
+
+        With ``refresh`` the coordinator is also refreshed right away, e.g.
+        when its data was restored instead of read from the meter.
+        """
+        self._coordinators[entry_id] = coordinator
+        if refresh:
+            self._start(entry_id, coordinator)
+        interval = coordinator.refresh_interval.total_seconds()
+        phase = random.uniform(0, interval)  # noqa: S311
+        heapq.heappush(
+            self._queue,
+            (self._hass.loop.time() + phase, next(self._order), entry_id, coordinator),
+        )
+        if self._queue[0][3] is coordinator:
+            self._arm()
+
+    async def async_remove(self, entry_id: str) -> None:
+        """Stop refreshing a meter, closing the pool after the last one."""
+        self._coordinators.pop(entry_id, None)
+        if not self._coordinators:
+            await self.async_close()
+
+    async def async_close(self, _event: Event | None = None) -> None:
+        """Stop the refreshes and close the pool, e.g. when Home Assistant stops."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._queue.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def latencies(self) -> dict[str, float]:
+        """Return the last refresh latency (s) per entry ID, the slowest first."""
+        latencies = {
+            entry_id: coordinator.last_update_latency
+            for entry_id, coordinator in self._coordinators.items()
+            if coordinator.last_update_latency is not None
+        }
+        return dict(sorted(latencies.items(), key=lambda item: -item[1]))
+
+    def _arm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._hass.loop.call_at(self._queue[0][0], self._run_due)
+
+    def _run_due(self) -> None:
+        """Start the refreshes that are due and reschedule them on their phase."""
+        self._timer = None
+        # The timer fired for the head of the queue, it is due even if early
+        now = max(self._hass.loop.time(), self._queue[0][0])
+        while self._queue and self._queue[0][0] <= now:
+            due, _, entry_id, coordinator = heapq.heappop(self._queue)
+            if self._coordinators.get(entry_id) is not coordinator:
+                continue
+            interval = coordinator.refresh_interval.total_seconds()
+            due += interval
+            if due <= now:
+                # Behind schedule (e.g. a blocked loop), skip the missed ticks
+                due = now + interval
+            heapq.heappush(self._queue, (due, next(self._order), entry_id, coordinator))
+            if not coordinator.config_entry.pref_disable_polling:
+                self._start(entry_id, coordinator)
+        if self._queue:
+            self._arm()
+
+    def _start(self, entry_id: str, coordinator: EVMateDataUpdateCoordinator) -> None:
+        """Refresh a coordinator in the background unless it already is."""
+        if entry_id in self._refreshing:
+            return
+        self._refreshing.add(entry_id)
+        coordinator.config_entry.async_create_background_task(
+            self._hass,
+            self._async_refresh(entry_id, coordinator),
+            f"{DOMAIN} refresh {coordinator.config_entry.title}",
+        )
+
+    async def _async_refresh(
+        self, entry_id: str, coordinator: EVMateDataUpdateCoordinator
+    ) -> None:
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._refreshing.discard(entry_id)
+
+
+def async_get_fleet(hass: HomeAssistant) -> EVMateFleet:
+    """Return the fleet of the integration, creating it on first use."""
+    if (fleet := hass.data.get(DOMAIN)) is None:
+        fleet = hass.data[DOMAIN] = EVMateFleet(hass)
+        # Config entries are not unloaded when Home Assistant stops
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, fleet.async_close)
+    return fleet
@@ -0,0 +1,238 @@
+"""Energy history of the IoTMeter for evmate."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from homeassistant.core import HomeAssistant
+
+STORAGE_VERSION = 1
+# Seconds to collect history changes before they are written to storage.
+STORAGE_SAVE_DELAY = 60
+
+
+def day_key(text: str) -> int:
+    """Return the ordinal day of a ``mm/dd/yy`` date of the "D" array."""
+    month, day, year = text.split("/")
+    return date(2000 + int(year), int(month), int(day)).toordinal()
+
+
+def month_key(text: str) -> int:
+    """Return the running month number of a ``m/yy`` date of the "M" array."""
+    month, year = text.split("/")
+    return (2000 + int(year)) * 12 + int(month) - 1
+
+
+def month_start(key: int) -> date:
+    """Return the first day of the month with the given running month number."""
+    return date(key // 12, key % 12 + 1, 1)
+
+
+def meter_time(text: str) -> datetime:
+    """Return the local time of a ``dd.mm.yy  HH:MM:SS`` WATTMETER_TIME."""
+    return datetime.strptime(text, "%d.%m.%y %H:%M:%S").replace(
+        tzinfo=dt_util.get_default_time_zone()
+    )
+
+
+class EnergyHistory:
+    """
+    Import/export history of one resolution, indexed by an integer key.
+
+    Buckets are kept sorted by key in parallel ``array`` columns together with
+    running totals, so any range total is two bisections and a subtraction.
+    Energies are kept in the unit of the meter (0.01 kWh).
+    """
+
+    __slots__ = (
+        "_export_sums",
+        "_exports",
+        "_import_sums",
+        "_imports",
+        "_key_fn",
+        "_keys",
+        "_last_raw",
+    )
+
+    def __init__(self, key_fn: Callable[[str], int]) -> None:
+        """Initialize an empty history parsing dates with ``key_fn``."""
+        self._key_fn = key_fn
+        self._keys = array("I")
+        self._imports = array("I")
+        self._exports = array("I")
+        self._import_sums = array("Q")
+        self._export_sums = array("Q")
+        self._last_raw: str | None = None
+
+    def __len__(self) -> int:
+        """Return the number of stored buckets."""
+        return len(self._keys)
+
+    @property
+    def last_key(self) -> int | None:
+        """Return the key of the newest bucket."""
+        return self._keys[-1] if self._keys else None
+
+    def update(self, entries: list[str]) -> int:
+        """
+        Merge the raw meter entries and return the number of changed buckets.
+
+        The meter reports a rolling window ordered by date, so entries are
+        walked from the newest one back until a key older than the newest
+        stored bucket shows up. Only those entries are parsed. The newest
+        bucket is the one still being counted and is overwritten in place.
+        """
+        if not entries or entries[-1] == self._last_raw:
+            return 0
+
+        last_key = self.last_key
+        new: list[tuple[int, int, int]] = []
+        for raw in reversed(entries):
+            try:
+                text, _, values = raw.partition(":")
+                key = self._key_fn(text)
+                if last_key is not None and key < last_key:
+                    break
+                imported, exported = values.strip("[]").split(",")
+                new.append((key, int(imported), int(exported)))
+            except ValueError:
+                LOGGER.debug("Skipping malformed history entry %r", raw)
+
+        changed = 0
+        for key, imported, exported in reversed(new):
+            if self._keys and key == self._keys[-1]:
+                if (self._imports[-1], self._exports[-1]) == (imported, exported):
+                    continue
+                self._pop()
+            elif self._keys and key < self._keys[-1]:
+                continue
+            self._append(key, imported, exported)
+            changed += 1
+
+        self._last_raw = entries[-1]
+        return changed
+
+    def _append(self, key: int, imported: int, exported: int) -> None:
+        self._keys.append(key)
+        self._imports.append(imported)
+        self._exports.append(exported)
+        self._import_sums.append(
+            (self._import_sums[-1] if self._import_sums else 0) + imported
+        )
+        self._export_sums.append(
+            (self._export_sums[-1] if self._export_sums else 0) + exported
+        )
+
+    def _columns(self) -> tuple[array, ...]:
+        return (
+            self._keys,
+            self._imports,
+            self._exports,
+            self._import_sums,
+            self._export_sums,
+        )
+
+    def _pop(self) -> None:
+        for column in self._columns():
+            column.pop()
+
+    def _bounds(self, start: int | None, end: int | None) -> tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self._keys, start)
+        hi = len(self._keys) if end is None else bisect_left(self._keys, end)
+        return lo, max(lo, hi)
+
+    def totals(
+        self, start: int | None = None, end: int | None = None
+    ) -> tuple[int, int]:
+        """Return the (import, export) total of the keys in ``[start, end)``."""
+        lo, hi = self._bounds(start, end)
+        if lo == hi:
+            return 0, 0
+        imported = self._import_sums[hi - 1] - (self._import_sums[lo - 1] if lo else 0)
+        exported = self._export_sums[hi - 1] - (self._export_sums[lo - 1] if lo else 0)
+        return imported, exported
+
+    def entries(
+        self, start: int | None = None, end: int | None = None
+    ) -> Iterator[tuple[int, int, int]]:
+        """Yield the (key, import, export) buckets of the keys in ``[start, end)``."""
+        lo, hi = self._bounds(start, end)
+        for index in range(lo, hi):
+            yield self._keys[index], self._imports[index], self._exports[index]
+
+    def as_dict(self) -> dict[str, list[int]]:
+        """Return the history in a JSON serializable form."""
+        return {
+            "keys": self._keys.tolist(),
+            "imports": self._imports.tolist(),
+            "exports": self._exports.tolist(),
+        }
+
+    def load(self, data: dict[str, list[int]]) -> None:
+        """Replace the history with one returned by ``as_dict``."""
+        for column in self._columns():
+            del column[:]
+        self._last_raw = None
+        for key, imported, exported in zip(
+            data["keys"], data["imports"], data["exports"], strict=True
+        ):
+            self._append(key, imported, exported)
+
+
+class EVMateEnergyHistory:
+    """
+    Daily and monthly energy history of one meter.
+
+    The meter only reports a rolling window of the last days and months,
+    the history is persisted so older buckets survive once they leave it.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the history of the given config entry."""
+        self.daily = EnergyHistory(day_key)
+        self.monthly = EnergyHistory(month_key)
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+
+    async def async_load(self) -> None:
+        """Load the persisted history."""
+        if (data := await self._store.async_load()) is None:
+            return
+        self.daily.load(data["daily"])
+        self.monthly.load(data["monthly"])
+
+    @callback
+    def async_update(self, data: dict[str, Any]) -> int:
+        """Merge the "D" and "M" arrays of an updateData payload."""
+        changed = self.daily.update(data.get("D", [])) + self.monthly.update(
+            data.get("M", [])
+        )
+        if changed:
+            self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+        return changed
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"daily": self.daily.as_dict(), "monthly": self.monthly.as_dict()}
+
+    def daily_totals(self, start: date, end: date) -> tuple[int, int]:
+        """Return the (import, export) total of the days in ``[start, end)``."""
+        return self.daily.totals(start.toordinal(), end.toordinal())
+
+    def monthly_totals(self, start: date, end: date) -> tuple[int, int]:
+        """Return the (import, export) total of the months in ``[start, end)``."""
+        return self.monthly.totals(
+            start.year * 12 + start.month - 1, end.year * 12 + end.month - 1
+        )
@@ -0,0 +1,110 @@
+"""Instrumentation of the requests to an evmate meter."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass, field
+
+# Upper bounds (s) of the request latency histogram buckets, a last bucket
+# counts the slower requests.
+LATENCY_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """
+    Counters of the requests of one endpoint.
+
+    Recording is a few additions per request. The latency histogram only
+    counts answered requests with a known latency, the chunks of a stream
+    have none. Failures are counted on their own together with the failures
+    in a row since the last answer.
+    """
+
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_error: str | None = None
+    # Answered requests per latency bucket, see ``LATENCY_BUCKETS``
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+    latency_sum: float = 0.0
+    last_latency: float | None = None
+    bytes_received: int = 0
+    last_bytes: int = 0
+    # Bodies decoded and the seconds spent, unchanged bodies are not decoded
+    decodes: int = 0
+    decode_time: float = 0.0
+    last_decode_time: float | None = None
+
+    def record_answer(self, latency: float | None, size: int) -> None:
+        """Count an answer of ``size`` bytes that took ``latency`` s, if known."""
+        self.requests += 1
+        self.consecutive_failures = 0
+        if latency is not None:
+            self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+            self.latency_sum += latency
+            self.last_latency = latency
+        self.bytes_received += size
+        self.last_bytes = size
+
+    def record_decode(self, seconds: float) -> None:
+        """Count the decoding of a body that took ``seconds``."""
+        self.decodes += 1
+        self.decode_time += seconds
+        self.last_decode_time = seconds
+
+    def record_failure(self, exception: BaseException) -> None:
+        """Count a request that failed with ``exception``."""
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = repr(exception)
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """
+        Return the bucket bound below which ``quantile`` of the latencies are.
+
+        Latencies above the last bound return infinity, None without answers.
+        """
+        answered = sum(self.latency_histogram)
+        if not answered:
+            return None
+        rank = quantile * answered
+        count = 0
+        for bound, bucket in zip(
+            (*LATENCY_BUCKETS, float("inf")), self.latency_histogram, strict=True
+        ):
+            count += bucket
+            if count >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> dict[str, object]:
+        """Return the counters for the diagnostics."""
+        answered = sum(self.latency_histogram)
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "latency_histogram": dict(
+                zip(
+                    (*(f"<={bound}s" for bound in LATENCY_BUCKETS), "slower"),
+                    self.latency_histogram,
+                    strict=True,
+                )
+            ),
+            "latency_mean": self.latency_sum / answered if answered else None,
+            "latency_p50": self.latency_quantile(0.5),
+            "latency_p95": self.latency_quantile(0.95),
+            "last_latency": self.last_latency,
+            "bytes_received": self.bytes_received,
+            "last_bytes": self.last_bytes,
+            "decodes": self.decodes,
+            "decode_time_mean": self.decode_time / self.decodes
+            if self.decodes
+            else None,
+            "last_decode_time": self.last_decode_time,
+        }
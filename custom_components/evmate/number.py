@@ -0,0 +1,67 @@
+"""Number platform for evmate."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.number import NumberEntity
+
+from .entity import EVMateEntity, EVMateEvseEntity
+from .schema import EVSE_NUMBER_TYPES, NUMBER_TYPES
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import IntegrationEVMateConfigEntry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: IntegrationEVMateConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the number platform."""
+    async_add_entities(
+        EVMateNumber(
+            entry.unique_id
+            + "-"
+            + entity_description.key.replace(",", "_").replace(" ", "_"),
+            coordinator=entry.runtime_data.coordinator,
+            entity_description=entity_description,
+        )
+        for entity_description in NUMBER_TYPES
+    )
+    entry.runtime_data.evse.async_add_platform(
+        lambda evse: (
+            EVMateEvseNumber(entity_description, entry.runtime_data.coordinator, evse)
+            for entity_description in EVSE_NUMBER_TYPES
+        ),
+        async_add_entities,
+    )
+
+
+class EVMateNumber(EVMateEntity, NumberEntity):
+    """evmate number of a setting of the meter."""
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the value of the setting."""
+        return self.coordinator.values.get(self.entity_description.key)
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Change the setting."""
+        await self.async_write_setting(value)
+
+
+class EVMateEvseNumber(EVMateEvseEntity, NumberEntity):
+    """evmate number of a setting of one charger."""
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the value of the setting."""
+        return self.evse_value
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Change the setting."""
+        await self.async_write_setting(value)
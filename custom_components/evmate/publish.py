@@ -0,0 +1,92 @@
+"""Aggregation of the measurements between polling and writing them."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.sensor import SensorStateClass
+
+from .const import (
+    CONF_PUBLISH_AGGREGATE,
+    CONF_PUBLISH_INTERVALS,
+    DEFAULT_PUBLISH_AGGREGATE,
+    PUBLISH_GROUPS,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from homeassistant.components.sensor import SensorEntityDescription
+
+
+@dataclass(slots=True)
+class PublishWindow:
+    """
+    Samples of a measurement since its state was last written.
+
+    A sample is a few comparisons and additions. Once ``interval`` seconds
+    passed since the last write the mean, min or max of the window is
+    written. A sample that moved ``threshold`` or more away from the written
+    value, or that has no value, is written at once.
+    """
+
+    interval: float
+    threshold: float
+    aggregate: str = DEFAULT_PUBLISH_AGGREGATE
+    # Last written value and the time it was written at
+    value: float | None = None
+    written_at: float = -math.inf
+    count: int = 0
+    total: float = 0.0
+    low: float = math.inf
+    high: float = -math.inf
+
+    def add(self, sample: float | None, now: float) -> bool:
+        """Add a sample taken at ``now``, return whether ``value`` was updated."""
+        if (
+            sample is None
+            or self.value is None
+            or abs(sample - self.value) >= self.threshold
+        ):
+            self._write(sample, now)
+            return True
+        self.count += 1
+        self.total += sample
+        self.low = min(self.low, sample)
+        self.high = max(self.high, sample)
+        if now - self.written_at < self.interval:
+            return False
+        if self.aggregate == "min":
+            self._write(self.low, now)
+        elif self.aggregate == "max":
+            self._write(self.high, now)
+        else:
+            self._write(round(self.total / self.count, 2), now)
+        return True
+
+    def _write(self, value: float | None, now: float) -> None:
+        self.value = value
+        self.written_at = now
+        self.count = 0
+        self.total = 0.0
+        self.low = math.inf
+        self.high = -math.inf
+
+
+def publish_window(
+    options: Mapping[str, Any], description: SensorEntityDescription
+) -> PublishWindow | None:
+    """Return the window of a measurement, None if every change is written."""
+    if (
+        description.state_class != SensorStateClass.MEASUREMENT
+        or (group := PUBLISH_GROUPS.get(description.device_class)) is None
+        or not (interval := options.get(CONF_PUBLISH_INTERVALS[group[0]], 0))
+    ):
+        return None
+    return PublishWindow(
+        interval,
+        group[1],
+        options.get(CONF_PUBLISH_AGGREGATE, DEFAULT_PUBLISH_AGGREGATE),
+    )
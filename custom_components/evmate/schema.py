@@ -0,0 +1,520 @@
+"""
+Schema of the keys the IoTMeter endpoints deliver.
+
+Every known key is declared once, with the endpoint it comes from and how its
+raw value is turned into a state. The schema is compiled at import time into
+``EXTRACTORS``, a lookup table from key to extractor, so the coordinator
+converts a payload in a single pass and the entities only look up the result.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntityDescription,
+)
+from homeassistant.components.number import (
+    NumberDeviceClass,
+    NumberEntityDescription,
+)
+from homeassistant.components.select import SelectEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.components.switch import SwitchEntityDescription
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfApparentPower,
+    UnitOfElectricCurrent,
+    UnitOfElectricPotential,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfReactivePower,
+    UnitOfTime,
+)
+from homeassistant.helpers.typing import StateType
+
+from .const import (
+    COUNTER_ENERGY_KWH,
+    ENDPOINT_DATA,
+    ENDPOINT_EVSE,
+    ENDPOINT_SETTING,
+    EVSE_COUNT_KEY,
+    MAX_EVSE,
+)
+
+type Extractor = Callable[[Any], StateType]
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor read from one key of an endpoint."""
+
+    endpoint: str
+    # Factor from the raw value to the unit of measurement
+    scale: float = 1
+    # Of an EVSE entity: the value of EVSE n is the key "{key}{n}" instead of
+    # element n - 1 of the array under the key
+    per_evse_key: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Describes a binary sensor read from one key of an endpoint."""
+
+    endpoint: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateSwitchEntityDescription(SwitchEntityDescription):
+    """Describes a "0"/"1" setting of the meter."""
+
+    endpoint: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateNumberEntityDescription(NumberEntityDescription):
+    """Describes a numeric setting of the meter."""
+
+    endpoint: str
+    scale: float = 1
+    per_evse_key: bool = False
+
+
+@dataclass(frozen=True, kw_only=True)
+class EVMateSelectEntityDescription(SelectEntityDescription):
+    """Describes a setting of the meter with a fixed set of raw values."""
+
+    endpoint: str
+    # Raw value -> option
+    raw_options: dict[str, str]
+
+
+def _phases(
+    prefix: str,
+    name: str,
+    suffix: str = "",
+    *,
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT,
+    **kwargs: Any,
+) -> tuple[EVMateSensorEntityDescription, ...]:
+    """Return the descriptions of a value measured on each of the three phases."""
+    return tuple(
+        EVMateSensorEntityDescription(
+            key=f"{prefix}{phase}{suffix}",
+            name=f"{name} L{phase}",
+            endpoint=ENDPOINT_DATA,
+            state_class=state_class,
+            **kwargs,
+        )
+        for phase in (1, 2, 3)
+    )
+
+
+def _limit(key: str, name: str, **kwargs: Any) -> EVMateSensorEntityDescription:
+    """Return the description of a limit configured in the meter."""
+    return EVMateSensorEntityDescription(
+        key=f"in,{key}",
+        name=name,
+        endpoint=ENDPOINT_SETTING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        **kwargs,
+    )
+
+
+_PHASE_ENERGY = {
+    "native_unit_of_measurement": UnitOfEnergy.KILO_WATT_HOUR,
+    "device_class": SensorDeviceClass.ENERGY,
+    "state_class": SensorStateClass.TOTAL_INCREASING,
+    "scale": COUNTER_ENERGY_KWH,
+    "suggested_display_precision": 2,
+}
+
+SENSOR_TYPES: tuple[EVMateSensorEntityDescription, ...] = (
+    *_phases(
+        "U",
+        "Voltage",
+        native_unit_of_measurement=UnitOfElectricPotential.VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+    ),
+    *_phases(
+        "I",
+        "Current",
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        scale=0.01,
+        suggested_display_precision=2,
+    ),
+    *_phases(
+        "P",
+        "Power",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        device_class=SensorDeviceClass.POWER,
+    ),
+    *_phases(
+        "S",
+        "Apparent power",
+        native_unit_of_measurement=UnitOfApparentPower.VOLT_AMPERE,
+        device_class=SensorDeviceClass.APPARENT_POWER,
+    ),
+    *_phases(
+        "R",
+        "Reactive power",
+        native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+        device_class=SensorDeviceClass.REACTIVE_POWER,
+        entity_registry_enabled_default=False,
+    ),
+    *_phases(
+        "F",
+        "Power factor",
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=SensorDeviceClass.POWER_FACTOR,
+    ),
+    # Undocumented per-phase value, kept raw until its meaning is known
+    *_phases("W", "W value", entity_registry_enabled_default=False),
+    *_phases("E", "Energy import", "tP", **_PHASE_ENERGY),
+    *_phases("E", "Energy export", "tN", **_PHASE_ENERGY),
+    *_phases("E", "Energy import today", "dP", **_PHASE_ENERGY),
+    *_phases("E", "Energy export today", "dN", **_PHASE_ENERGY),
+    EVMateSensorEntityDescription(
+        key="EpDP",
+        name="Energy import today",
+        endpoint=ENDPOINT_DATA,
+        **_PHASE_ENERGY,
+    ),
+    EVMateSensorEntityDescription(
+        key="EpDN",
+        name="Energy export today",
+        endpoint=ENDPOINT_DATA,
+        **_PHASE_ENERGY,
+    ),
+    EVMateSensorEntityDescription(
+        key="BREAKER",
+        name="Main breaker",
+        endpoint=ENDPOINT_DATA,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    EVMateSensorEntityDescription(
+        key="RUN_TIME",
+        name="Run time",
+        endpoint=ENDPOINT_DATA,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+    ),
+    EVMateSensorEntityDescription(
+        key=EVSE_COUNT_KEY,
+        name="Number of EVSE",
+        endpoint=ENDPOINT_EVSE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+    _limit("EVSE-NUMBER", "Configured EVSE count"),
+    _limit(
+        "TIME-ZONE",
+        "Time zone offset",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        entity_registry_enabled_default=False,
+    ),
+)
+
+BINARY_SENSOR_TYPES: tuple[EVMateBinarySensorEntityDescription, ...] = (
+    EVMateBinarySensorEntityDescription(
+        key="sw,AUTOMATIC UPDATE",
+        name="Automatic update",
+        endpoint=ENDPOINT_SETTING,
+    ),
+    EVMateBinarySensorEntityDescription(
+        key="RELAY",
+        name="Relay",
+        endpoint=ENDPOINT_DATA,
+    ),
+)
+
+# Entities of every charger, read from the arrays of updateEvse that hold one
+# element per EVSE and from the "inp,EVSE<n>" keys of updateSetting.
+EVSE_SENSOR_TYPES: tuple[EVMateSensorEntityDescription, ...] = (
+    EVMateSensorEntityDescription(
+        key="EV_STATE",
+        name="EV state",
+        endpoint=ENDPOINT_EVSE,
+    ),
+    EVMateSensorEntityDescription(
+        key="ACTUAL_OUTPUT_CURRENT",
+        name="Charging current",
+        endpoint=ENDPOINT_EVSE,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    EVMateSensorEntityDescription(
+        key="ACTUAL_CONFIG_CURRENT",
+        name="Configured current",
+        endpoint=ENDPOINT_EVSE,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=SensorDeviceClass.CURRENT,
+    ),
+)
+
+EVSE_BINARY_SENSOR_TYPES: tuple[EVMateBinarySensorEntityDescription, ...] = (
+    EVMateBinarySensorEntityDescription(
+        key="EV_COMM_ERR",
+        name="EV communication error",
+        endpoint=ENDPOINT_EVSE,
+        device_class=BinarySensorDeviceClass.PROBLEM,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+)
+
+# Settings written back to the meter, all of them live in updateSetting.
+SWITCH_TYPES: tuple[EVMateSwitchEntityDescription, ...] = (
+    EVMateSwitchEntityDescription(
+        key="sw,ENABLE CHARGING",
+        name="Enable charging",
+        endpoint=ENDPOINT_SETTING,
+    ),
+    EVMateSwitchEntityDescription(
+        key="sw,ENABLE BALANCING",
+        name="Load balancing",
+        endpoint=ENDPOINT_SETTING,
+        entity_category=EntityCategory.CONFIG,
+    ),
+    EVMateSwitchEntityDescription(
+        key="sw,P-E15-GUARD",
+        name="15-minute energy guard",
+        endpoint=ENDPOINT_SETTING,
+        entity_category=EntityCategory.CONFIG,
+    ),
+)
+
+NUMBER_TYPES: tuple[EVMateNumberEntityDescription, ...] = (
+    EVMateNumberEntityDescription(
+        key="in,MAX-CURRENT-FROM-GRID-A",
+        name="Maximum grid current",
+        endpoint=ENDPOINT_SETTING,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=NumberDeviceClass.CURRENT,
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=100,
+    ),
+    EVMateNumberEntityDescription(
+        key="in,PV-GRID-ASSIST-A",
+        name="PV grid assist current",
+        endpoint=ENDPOINT_SETTING,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=NumberDeviceClass.CURRENT,
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=32,
+    ),
+    EVMateNumberEntityDescription(
+        key="in,MAX-P-KW",
+        name="Maximum power",
+        endpoint=ENDPOINT_SETTING,
+        native_unit_of_measurement=UnitOfPower.KILO_WATT,
+        device_class=NumberDeviceClass.POWER,
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=100,
+    ),
+    EVMateNumberEntityDescription(
+        key="in,MAX-E15-KWH",
+        name="Maximum 15-minute energy",
+        endpoint=ENDPOINT_SETTING,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=NumberDeviceClass.ENERGY,
+        entity_category=EntityCategory.CONFIG,
+        native_min_value=0,
+        native_max_value=100,
+    ),
+)
+
+EVSE_NUMBER_TYPES: tuple[EVMateNumberEntityDescription, ...] = (
+    EVMateNumberEntityDescription(
+        key="inp,EVSE",
+        name="Current limit",
+        endpoint=ENDPOINT_SETTING,
+        native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
+        device_class=NumberDeviceClass.CURRENT,
+        native_min_value=0,
+        native_max_value=32,
+        per_evse_key=True,
+    ),
+)
+
+# Raw values of "chargeMode" and the options they are shown as.
+CHARGE_MODES: dict[str, str] = {"0": "off", "1": "on", "2": "solar"}
+
+SELECT_TYPES: tuple[EVMateSelectEntityDescription, ...] = (
+    EVMateSelectEntityDescription(
+        key="chargeMode",
+        name="Charge mode",
+        translation_key="charge_mode",
+        endpoint=ENDPOINT_SETTING,
+        raw_options=CHARGE_MODES,
+        options=list(CHARGE_MODES.values()),
+    ),
+)
+
+# Keys that are known but not exposed as entities of their own: arrays
+# decoded elsewhere, identifiers, network configuration and settings.
+OTHER_KEYS = frozenset(
+    {
+        "A",
+        "D",
+        "M",
+        "Es",
+        "Pm",
+        "Eh",
+        "Em",
+        "En",
+        "ID",
+        "WATTMETER_TIME",
+        "txt,ACTUAL SW VERSION",
+        "bt,RESET WATTMETER",
+        "btn,PHOTOVOLTAIC",
+        "ERRORS",
+        "DHCP",
+        "STATIC_IP",
+        "DNS",
+        "MASK",
+        "GATEWAY",
+        "sw,WHEN AC IN: RELAY ON",
+        "sw,WHEN OVERFLOW: RELAY ON",
+        "sw,WHEN AC IN: CHARGING",
+        "sw,AC IN ACTIVE: HIGH",
+        "sw,TESTING SOFTWARE",
+        "sw,Wi-Fi AP",
+        "sw,MODBUS-TCP",
+    }
+)
+
+
+def _sensor_converter(
+    description: EVMateSensorEntityDescription | EVMateNumberEntityDescription,
+) -> Extractor:
+    """Compile the conversion of a raw sensor value."""
+    scale = description.scale
+    # Rounding away the float noise of the scale, 0.01 keeps two digits
+    digits = max(0, -math.floor(math.log10(scale))) if scale != 1 else None
+
+    def convert(raw: Any) -> StateType:
+        if raw is None or raw == "":
+            return None
+        value = raw if isinstance(raw, int | float) else float(raw)
+        if digits is not None:
+            return round(value * scale, digits)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    return convert
+
+
+def _binary_converter(_description: object) -> Extractor:
+    """Compile the conversion of a raw "0"/"1" value."""
+
+    def convert(raw: Any) -> bool | None:
+        return None if raw is None else str(raw) == "1"
+
+    return convert
+
+
+def _select_converter(description: EVMateSelectEntityDescription) -> Extractor:
+    """Compile the conversion of a raw value to its option."""
+    raw_options = description.raw_options
+
+    def convert(raw: Any) -> str | None:
+        return raw_options.get(str(raw))
+
+    return convert
+
+
+def _per_evse(convert: Extractor) -> Callable[[Any], tuple[StateType, ...]]:
+    """Compile the conversion of an array with one value per EVSE."""
+
+    def extract(raw: Any) -> tuple[StateType, ...]:
+        return tuple(map(convert, raw))
+
+    return extract
+
+
+def _compile() -> dict[str, Callable[[Any], Any]]:
+    """Compile the schema into the key -> extractor table."""
+    extractors: dict[str, Callable[[Any], Any]] = {}
+    for descriptions, converter in (
+        (SENSOR_TYPES, _sensor_converter),
+        (BINARY_SENSOR_TYPES, _binary_converter),
+        (SWITCH_TYPES, _binary_converter),
+        (NUMBER_TYPES, _sensor_converter),
+        (SELECT_TYPES, _select_converter),
+    ):
+        for description in descriptions:
+            extractors[description.key] = converter(description)
+    for descriptions, converter in (
+        (EVSE_SENSOR_TYPES, _sensor_converter),
+        (EVSE_BINARY_SENSOR_TYPES, _binary_converter),
+        (EVSE_NUMBER_TYPES, _sensor_converter),
+    ):
+        for description in descriptions:
+            convert = converter(description)
+            if getattr(description, "per_evse_key", False):
+                for evse in range(1, MAX_EVSE + 1):
+                    extractors[f"{description.key}{evse}"] = convert
+            else:
+                extractors[description.key] = _per_evse(convert)
+    return extractors
+
+
+# Values of the EVSE arrays are tuples with one value per EVSE.
+EXTRACTORS = _compile()
+
+KNOWN_KEYS = frozenset(EXTRACTORS) | OTHER_KEYS
+
+
+def evse_value(values: dict[str, Any], key: str, index: int | None) -> StateType:
+    """Return a value of one EVSE, element ``index`` of an array or a plain key."""
+    value = values.get(key)
+    if index is None:
+        return value
+    return value[index] if value is not None and index < len(value) else None
+
+
+def extract_values(
+    data: dict[str, Any], keys: Iterable[str] | None = None
+) -> dict[str, Any]:
+    """
+    Return the entity values of the given keys of the data, all by default.
+
+    A key missing from the data or whose value cannot be converted is None.
+    """
+    values: dict[str, Any] = {}
+    for key in data if keys is None else keys:
+        if (extractor := EXTRACTORS.get(key)) is None:
+            continue
+        try:
+            values[key] = extractor(data[key]) if key in data else None
+        except (TypeError, ValueError, IndexError):
+            values[key] = None
+    return values
+
+
+def encode_value(value: float | bool | str) -> str:
+    """Return a setting value the way the meter delivers and accepts it."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
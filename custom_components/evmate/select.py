@@ -0,0 +1,52 @@
+"""Select platform for evmate."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.components.select import SelectEntity
+
+from .entity import EVMateEntity
+from .schema import SELECT_TYPES, EVMateSelectEntityDescription
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import IntegrationEVMateConfigEntry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    entry: IntegrationEVMateConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the select platform."""
+    async_add_entities(
+        EVMateSelect(
+            entry.unique_id + "-" + entity_description.key,
+            coordinator=entry.runtime_data.coordinator,
+            entity_description=entity_description,
+        )
+        for entity_description in SELECT_TYPES
+    )
+
+
+class EVMateSelect(EVMateEntity, SelectEntity):
+    """evmate select of a setting of the meter."""
+
+    entity_description: EVMateSelectEntityDescription
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the selected option."""
+        return self.coordinator.values.get(self.entity_description.key)
+
+    async def async_select_option(self, option: str) -> None:
+        """Change the setting to the raw value of the option."""
+        raw = next(
+            raw
+            for raw, name in self.entity_description.raw_options.items()
+            if name == option
+        )
+        await self.async_write_setting(raw)
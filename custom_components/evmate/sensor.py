@@ -2,23 +2,37 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.core import callback
 
-from .const import SENSOR_TYPES
+from .const import (
+    COST_SENSOR_TYPES,
+    DELTA_SENSOR_TYPES,
+    DEMAND_SENSOR_TYPES,
+    DIAGNOSTIC_SENSOR_TYPES,
+    PROFILE_SENSOR_TYPES,
+    EVMateComputedSensorEntityDescription,
+)
+from .entity import EVMateEntity, EVMateEvseEntity
+from .publish import publish_window
+from .schema import EVSE_SENSOR_TYPES, SENSOR_TYPES
 
 if TYPE_CHECKING:
+    from homeassistant.components.sensor import SensorEntityDescription
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import StateType
 
     from .coordinator import EVMateDataUpdateCoordinator
     from .data import IntegrationEVMateConfigEntry
+    from .publish import PublishWindow
 
 
 async def async_setup_entry(
-    hass: HomeAssistant,  # noqa: ARG001 Unused function argument: `hass`
+    hass: HomeAssistant,
     entry: IntegrationEVMateConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
@@ -30,43 +44,143 @@ async def async_setup_entry(
             + entity_description.key.replace(",", "_").replace(" ", "_"),
             coordinator=entry.runtime_data.coordinator,
             entity_description=entity_description,
+            window=publish_window(entry.options, entity_description),
         )
         for entity_description in SENSOR_TYPES
     )
+    async_add_entities(
+        EVMateComputedSensor(
+            entry.unique_id + "-" + entity_description.key,
+            coordinator=entry.runtime_data.coordinator,
+            entity_description=entity_description,
+        )
+        for entity_description in (
+            *PROFILE_SENSOR_TYPES,
+            *DELTA_SENSOR_TYPES,
+            *DEMAND_SENSOR_TYPES,
+            *DIAGNOSTIC_SENSOR_TYPES,
+        )
+    )
+    entry.runtime_data.evse.async_add_platform(
+        lambda evse: (
+            EVMateEvseSensor(entity_description, entry.runtime_data.coordinator, evse)
+            for entity_description in EVSE_SENSOR_TYPES
+        ),
+        async_add_entities,
+    )
+    if entry.runtime_data.costs is not None:
+        async_add_entities(
+            EVMateComputedSensor(
+                entry.unique_id + "-" + entity_description.key,
+                coordinator=entry.runtime_data.coordinator,
+                entity_description=(
+                    replace(
+                        entity_description,
+                        native_unit_of_measurement=hass.config.currency,
+                    )
+                    if entity_description.device_class == SensorDeviceClass.MONETARY
+                    else entity_description
+                ),
+            )
+            for entity_description in COST_SENSOR_TYPES
+        )
 
 
-class EVMateSensor(SensorEntity):
-    """evmate Sensor class."""
+class EVMateSensor(EVMateEntity, SensorEntity):
+    """
+    evmate Sensor class.
+
+    With a ``window`` every payload of the endpoint is a sample of it and the
+    state is only written when the window says so, see ``PublishWindow``.
+    """
 
     def __init__(
         self,
         unique_id: str,
         entity_description: SensorEntityDescription,
         coordinator: EVMateDataUpdateCoordinator,
+        window: PublishWindow | None = None,
     ) -> None:
         """Initialize the sensor class."""
-        super().__init__()
-        self.entity_description = entity_description
-        self._coordinator = coordinator
-        self._attr_name = entity_description.name
-        self._attr_unique_id = unique_id
+        super().__init__(unique_id, entity_description, coordinator)
+        self._window = window
+        self._sampled_at: float | None = None
 
     @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._coordinator.last_update_success
-
-    async def async_added_to_hass(self) -> None:
-        """Connect to dispatcher listening for entity data notifications."""
-        self.async_on_remove(
-            self._coordinator.async_add_listener(self.async_write_ha_state)
-        )
+    def native_value(self) -> StateType:
+        """Return the state of the device."""
+        if self._window is not None and self._window.value is not None:
+            return self._window.value
+        return self.coordinator.values.get(self.entity_description.key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Sample every new payload and write the state when it is due."""
+        if self._window is None:
+            super()._handle_coordinator_update()
+            return
+        written = False
+        sampled_at = self.coordinator.received.get(self._endpoint)
+        if sampled_at is not None and sampled_at != self._sampled_at:
+            self._sampled_at = sampled_at
+            value = self._window.value
+            written = (
+                self._window.add(
+                    self.coordinator.values.get(self._value_key), sampled_at
+                )
+                and self._window.value != value
+            )
+        if written or self._flags_changed():
+            self.async_write_ha_state()
+
+
+class EVMateEvseSensor(EVMateEvseEntity, SensorEntity):
+    """evmate sensor of one charger."""
 
-    async def async_update(self) -> None:
-        """Get the latest data from OWM and updates the states."""
-        await self._coordinator.async_request_refresh()
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the charger."""
+        return self.evse_value
+
+
+class EVMateComputedSensor(EVMateEntity, SensorEntity):
+    """evmate sensor computed by the coordinator."""
+
+    entity_description: EVMateComputedSensorEntityDescription
+    # The hourly series and the rolling demand figures change all the time,
+    # keep them out of the recorder
+    _unrecorded_attributes = frozenset(
+        {
+            "hourly",
+            "energy",
+            "average_power_1min",
+            "average_power_5min",
+            "average_power_15min",
+        }
+    )
+
+    def __init__(
+        self,
+        unique_id: str,
+        entity_description: EVMateComputedSensorEntityDescription,
+        coordinator: EVMateDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the sensor class."""
+        super().__init__(unique_id, entity_description, coordinator)
+        self._data_keys = entity_description.data_keys
 
     @property
     def native_value(self) -> StateType:
         """Return the state of the device."""
-        return self._coordinator.data.get(self.entity_description.key, None)
+        return self.entity_description.value_fn(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the attributes computed alongside the state."""
+        attributes = super().extra_state_attributes
+        if self.entity_description.attributes_fn is None:
+            return attributes
+        computed = self.entity_description.attributes_fn(self.coordinator)
+        if attributes is None:
+            return computed
+        return {**(computed or {}), **attributes}
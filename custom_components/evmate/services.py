@@ -0,0 +1,81 @@
+"""Services of evmate."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import SupportsResponse, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
+
+    from .data import IntegrationEVMateConfigEntry
+
+SERVICE_GET_ENERGY_COSTS = "get_energy_costs"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+
+GET_ENERGY_COSTS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+    }
+)
+
+
+def _get_entry(hass: HomeAssistant, entry_id: str) -> IntegrationEVMateConfigEntry:
+    """Return the loaded config entry of a meter."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_found",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    if entry.state is not ConfigEntryState.LOADED:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="entry_not_loaded",
+            translation_placeholders={"title": entry.title},
+        )
+    return entry
+
+
+async def _async_get_energy_costs(call: ServiceCall) -> ServiceResponse:
+    """Return the cost totals of the days in the requested range."""
+    entry = _get_entry(call.hass, call.data[ATTR_CONFIG_ENTRY_ID])
+    if (costs := entry.runtime_data.costs) is None:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN,
+            translation_key="no_tariff",
+            translation_placeholders={"title": entry.title},
+        )
+    start = call.data[ATTR_START_DATE]
+    end = call.data[ATTR_END_DATE]
+    if start > end:
+        raise ServiceValidationError(
+            translation_domain=DOMAIN, translation_key="invalid_range"
+        )
+    # The end date is the last day of the range
+    return costs.query(start, end + timedelta(days=1)).as_dict()
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_ENERGY_COSTS,
+        _async_get_energy_costs,
+        schema=GET_ENERGY_COSTS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,192 @@
+"""Long-term statistics import of the meter history for evmate."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import COUNTER_ENERGY_KWH, DOMAIN, HOURLY_ENERGY_KWH, LOGGER
+from .history import month_start
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from homeassistant.core import HomeAssistant
+
+    from .decoder import MeterProfile
+    from .history import EVMateEnergyHistory
+
+# Buckets are (start, import kWh, export kWh).
+type Bucket = tuple[datetime, float, float]
+
+DIRECTIONS = ("import", "export")
+
+
+@dataclass(slots=True)
+class _StatisticSeries:
+    """High-water mark of one external statistic."""
+
+    metadata: StatisticMetaData
+    last_start: float | None = None
+    last_sum: float = 0.0
+    loaded: bool = False
+
+
+def _local_midnight(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), dt_util.get_default_time_zone())
+
+
+def hourly_buckets(profile: MeterProfile) -> list[Bucket]:
+    """Return the closed hours of the decoded "Es" array."""
+    hourly = profile.hourly
+    now = profile.time
+    if now is None or len(hourly) < 2 or hourly.hours[-1] != now.hour:  # noqa: PLR2004
+        return []
+    current = dt_util.as_utc(now.replace(minute=0, second=0, microsecond=0))
+    last = len(hourly) - 1
+    return [
+        (
+            current - timedelta(hours=last - index),
+            hourly.imports[index] * HOURLY_ENERGY_KWH,
+            hourly.exports[index] * HOURLY_ENERGY_KWH,
+        )
+        for index in range(last)
+        if hourly.valid[index]
+    ]
+
+
+class EVMateStatisticsImporter:
+    """
+    Imports the meter history into the recorder as external statistics.
+
+    Every resolution and direction is its own statistic. The start of the last
+    imported bucket is read from the recorder once and kept as a high-water
+    mark, afterwards each run only adds the buckets after it, all buckets of a
+    statistic in a single import job.
+    """
+
+    def __init__(self, hass: HomeAssistant, meter_id: str, title: str) -> None:
+        """Initialize the importer of one meter."""
+        self._hass = hass
+        self._lock = asyncio.Lock()
+        # Statistic IDs only allow lowercase letters, digits and underscores
+        object_id = slugify(meter_id)
+        self._series = {
+            (resolution, direction): _StatisticSeries(
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=f"{title} {resolution} energy {direction}",
+                    source=DOMAIN,
+                    statistic_id=f"{DOMAIN}:{object_id}_{resolution}_{direction}",
+                    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+                )
+            )
+            for resolution in ("hourly", "daily", "monthly")
+            for direction in DIRECTIONS
+        }
+
+    async def async_import(
+        self, profile: MeterProfile, history: EVMateEnergyHistory
+    ) -> None:
+        """Import the closed buckets of the decoded payload and the history."""
+        if self._lock.locked():
+            return
+        async with self._lock:
+            today = (profile.time or dt_util.now()).date()
+            # The newest day is still being counted, whatever date it carries
+            daily_end = min(today.toordinal(), history.daily.last_key or 0)
+
+            await self._async_import_buckets("hourly", hourly_buckets(profile))
+            await self._async_import_buckets(
+                "daily",
+                (
+                    (_local_midnight(date.fromordinal(key)), *self._kwh(imp, exp))
+                    for key, imp, exp in history.daily.entries(end=daily_end)
+                ),
+            )
+            await self._async_import_buckets(
+                "monthly",
+                (
+                    (_local_midnight(month_start(key)), *self._kwh(imp, exp))
+                    for key, imp, exp in history.monthly.entries(
+                        end=today.year * 12 + today.month - 1
+                    )
+                ),
+            )
+
+    @staticmethod
+    def _kwh(imported: int, exported: int) -> tuple[float, float]:
+        return imported * COUNTER_ENERGY_KWH, exported * COUNTER_ENERGY_KWH
+
+    async def _async_import_buckets(
+        self, resolution: str, buckets: Iterable[Bucket]
+    ) -> None:
+        series = [self._series[resolution, direction] for direction in DIRECTIONS]
+        for statistic in series:
+            if not statistic.loaded:
+                await self._async_load_high_water_mark(statistic)
+
+        rows: tuple[list[StatisticData], ...] = ([], [])
+        # The high-water marks only move once the rows were handed over
+        last_starts = [statistic.last_start for statistic in series]
+        last_sums = [statistic.last_sum for statistic in series]
+        for start, *values in buckets:
+            timestamp = start.timestamp()
+            for index, (value, statistic_rows) in enumerate(
+                zip(values, rows, strict=True)
+            ):
+                if last_starts[index] is not None and timestamp <= last_starts[index]:
+                    continue
+                last_sums[index] += value
+                statistic_rows.append(
+                    StatisticData(start=start, state=value, sum=last_sums[index])
+                )
+                last_starts[index] = timestamp
+
+        for index, (statistic, statistic_rows) in enumerate(
+            zip(series, rows, strict=True)
+        ):
+            if not statistic_rows:
+                continue
+            try:
+                async_add_external_statistics(
+                    self._hass, statistic.metadata, statistic_rows
+                )
+            except HomeAssistantError as exception:
+                LOGGER.warning(
+                    "Cannot import %s: %s",
+                    statistic.metadata["statistic_id"],
+                    exception,
+                )
+                continue
+            statistic.last_start = last_starts[index]
+            statistic.last_sum = last_sums[index]
+
+    async def _async_load_high_water_mark(self, statistic: _StatisticSeries) -> None:
+        statistic_id = statistic.metadata["statistic_id"]
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics,
+            self._hass,
+            1,
+            statistic_id,
+            True,  # noqa: FBT003
+            {"sum"},
+        )
+        if rows := last.get(statistic_id):
+            statistic.last_start = rows[0]["start"]
+            statistic.last_sum = rows[0].get("sum") or 0.0
+        statistic.loaded = True
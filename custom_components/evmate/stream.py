@@ -0,0 +1,65 @@
+"""Streaming of the live meter values for evmate."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from typing import TYPE_CHECKING
+
+from .api import IntegrationEvmateApiClientError
+from .const import (
+    ENDPOINT_DATA,
+    LOGGER,
+    STREAM_BACKOFF_MAX,
+    STREAM_BACKOFF_MIN,
+    STREAM_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    from .api import IntegrationEvmateApiClient
+    from .coordinator import EVMateDataUpdateCoordinator
+
+
+class EVMateStreamer:
+    """
+    Feeds the live values of a meter into the coordinator as they arrive.
+
+    While the stream is healthy the coordinator stops polling updateData.
+    When the stream fails the coordinator polls it again and the stream is
+    retried with an exponential, jittered backoff.
+    """
+
+    def __init__(
+        self,
+        client: IntegrationEvmateApiClient,
+        coordinator: EVMateDataUpdateCoordinator,
+        endpoint: str = ENDPOINT_DATA,
+    ) -> None:
+        """Initialize the streamer of one endpoint."""
+        self._client = client
+        self._coordinator = coordinator
+        self._endpoint = endpoint
+
+    async def async_run(self) -> None:
+        """Stream until cancelled, falling back to polling between attempts."""
+        backoff = STREAM_BACKOFF_MIN
+        while True:
+            try:
+                async for payload in self._client.async_stream(
+                    self._endpoint, STREAM_INTERVAL
+                ):
+                    if backoff != STREAM_BACKOFF_MIN:
+                        LOGGER.info("Streaming %s recovered", self._endpoint)
+                        backoff = STREAM_BACKOFF_MIN
+                    self._coordinator.async_set_streaming(
+                        self._endpoint, streaming=True
+                    )
+                    self._coordinator.async_set_endpoint_payload(
+                        self._endpoint, payload
+                    )
+            except IntegrationEvmateApiClientError as exception:
+                LOGGER.debug("%s, polling for %.0f s", exception, backoff)
+            finally:
+                self._coordinator.async_set_streaming(self._endpoint, streaming=False)
+            await asyncio.sleep(backoff * random.uniform(1, 1.5))  # noqa: S311
+            backoff = min(backoff * 2, STREAM_BACKOFF_MAX)
@@ -0,0 +1,65 @@
+"""Switch platform for evmate."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.binary_sensor import DOMAIN as BINARY_SENSOR_DOMAIN
+from homeassistant.components.switch import SwitchEntity
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+from .entity import EVMateEntity
+from .schema import SWITCH_TYPES
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+    from .data import IntegrationEVMateConfigEntry
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: IntegrationEVMateConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the switch platform."""
+    unique_ids = [
+        entry.unique_id
+        + "-"
+        + entity_description.key.replace(",", "_").replace(" ", "_")
+        for entity_description in SWITCH_TYPES
+    ]
+    # "Enable charging" used to be a read-only binary sensor
+    entity_registry = er.async_get(hass)
+    for unique_id in unique_ids:
+        if entity_id := entity_registry.async_get_entity_id(
+            BINARY_SENSOR_DOMAIN, DOMAIN, unique_id
+        ):
+            entity_registry.async_remove(entity_id)
+    async_add_entities(
+        EVMateSwitch(
+            unique_id,
+            coordinator=entry.runtime_data.coordinator,
+            entity_description=entity_description,
+        )
+        for unique_id, entity_description in zip(unique_ids, SWITCH_TYPES, strict=True)
+    )
+
+
+class EVMateSwitch(EVMateEntity, SwitchEntity):
+    """evmate switch of a setting of the meter."""
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return the state of the setting."""
+        return self.coordinator.values.get(self.entity_description.key)
+
+    async def async_turn_on(self, **_: Any) -> None:
+        """Turn the setting on."""
+        await self.async_write_setting("1")
+
+    async def async_turn_off(self, **_: Any) -> None:
+        """Turn the setting off."""
+        await self.async_write_setting("0")
@@ -0,0 +1,73 @@
+"""Coalesced writes of the settings of an evmate meter."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.helpers.debounce import Debouncer
+
+from .api import IntegrationEvmateApiClientError
+from .const import ENDPOINT_SETTING, LOGGER, WRITE_DEBOUNCE
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .api import IntegrationEvmateApiClient
+    from .coordinator import EVMateDataUpdateCoordinator
+
+
+class EVMateWriter:
+    """
+    Writes setting changes to the meter.
+
+    A change is shown right away by merging it into the coordinator data. The
+    changes made within ``WRITE_DEBOUNCE`` seconds are sent in a single
+    request, the last value of a key wins, and only updateSetting is re-read
+    afterwards. A failed write is logged and the re-read restores the values
+    the meter actually has.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: IntegrationEvmateApiClient,
+        coordinator: EVMateDataUpdateCoordinator,
+    ) -> None:
+        """Initialize the writer of a meter."""
+        self._client = client
+        self._coordinator = coordinator
+        self._pending: dict[str, str] = {}
+        self._debouncer = Debouncer(
+            hass,
+            LOGGER,
+            cooldown=WRITE_DEBOUNCE,
+            immediate=False,
+            function=self.async_flush,
+        )
+
+    async def async_set(self, key: str, value: str) -> None:
+        """Show a new setting value and write it with the next batch."""
+        self._pending[key] = value
+        self._coordinator.async_set_optimistic(ENDPOINT_SETTING, {key: value})
+        await self._debouncer.async_call()
+
+    async def async_flush(self) -> None:
+        """Write the pending changes and re-read the settings."""
+        if await self._async_write():
+            await self._coordinator.async_refresh_endpoints([ENDPOINT_SETTING])
+
+    async def async_shutdown(self) -> None:
+        """Write the changes still pending and stop."""
+        self._debouncer.async_cancel()
+        await self._async_write()
+
+    async def _async_write(self) -> bool:
+        """Write the pending changes, return whether there were any."""
+        values, self._pending = self._pending, {}
+        if not values:
+            return False
+        try:
+            await self._client.async_write(values)
+        except IntegrationEvmateApiClientError as exception:
+            LOGGER.error("Changing the settings failed: %s", exception)
+        return True
@@ -0,0 +1 @@
+"""Benchmarks of the EVMate integration."""
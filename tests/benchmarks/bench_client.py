@@ -0,0 +1,91 @@
+"""
+Benchmark of the API client against the local fake meter.
+
+Run with ``python -m tests.benchmarks.bench_client`` from the repository root.
+It compares the original request path (a general purpose session and a URL
+string built for every request) with the client on its dedicated keep-alive
+connector and prebuilt URLs, and prints requests per second and the refresh
+latency percentiles.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from custom_components.evmate.api import IntegrationEvmateApiClient
+from custom_components.evmate.const import ENDPOINTS
+from tests.fake_meter import FakeMeter
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+
+async def _measure(
+    refresh: Callable[[], Awaitable[Any]], refreshes: int
+) -> dict[str, float]:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        begin = time.perf_counter()
+        await refresh()
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_second": refreshes * len(ENDPOINTS) / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def bench(refreshes: int, latency: float) -> dict[str, dict[str, float]]:
+    """Run both variants against a fresh fake meter and return their results."""
+    meter = FakeMeter(latency=latency, max_connections=2)
+    port = await meter.start()
+    results = {}
+    try:
+        async with aiohttp.ClientSession() as session:
+            host = "http://127.0.0.1:" + str(port) + "/"
+
+            async def legacy_refresh() -> dict[str, Any]:
+                result = {}
+                for endpoint in ENDPOINTS:
+                    response = await session.get(host + endpoint)
+                    response.raise_for_status()
+                    result.update(json.loads(await response.text()))
+                return result
+
+            results["before"] = await _measure(legacy_refresh, refreshes)
+
+        client = IntegrationEvmateApiClient("127.0.0.1", port)
+        try:
+            results["after"] = await _measure(client.async_get_data, refreshes)
+        finally:
+            await client.async_close()
+    finally:
+        await meter.stop()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--refreshes", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+    for variant, result in asyncio.run(bench(args.refreshes, args.latency)).items():
+        print(  # noqa: T201
+            f"{variant:>6}: {result['requests_per_second']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+pytest-benchmark suite of the polling path against the simulated meter.
+
+Run with ``scripts/benchmark``. The results are saved under ``.benchmarks``
+and compared with the previous run, a median more than 25 % slower fails the
+run. The file is not collected by the regular test run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    MockEntityPlatform,
+)
+
+from custom_components.evmate.api import IntegrationEvmateApiClient
+from custom_components.evmate.const import DOMAIN, ENDPOINTS, LOGGER
+from custom_components.evmate.coordinator import EVMateDataUpdateCoordinator
+from custom_components.evmate.fleet import EVMateFleet
+from custom_components.evmate.history import EVMateEnergyHistory
+from custom_components.evmate.schema import SENSOR_TYPES, extract_values
+from custom_components.evmate.sensor import EVMateSensor
+from tests.fake_meter import FakeMeter, load_fixtures
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from homeassistant.core import HomeAssistant
+
+# Latency of the simulated meter (s) in the scaling benchmarks
+LATENCY = 0.005
+JITTER = 0.002
+
+
+def _run(
+    loop: asyncio.AbstractEventLoop, function: Callable[[], Awaitable[Any]]
+) -> Callable[[], Any]:
+    """Return a function running a coroutine function on the test loop."""
+    # The test loop runs in debug mode, which would dominate the timings
+    loop.set_debug(False)
+    return lambda: loop.run_until_complete(function())
+
+
+def _coordinator(
+    hass: HomeAssistant, client: IntegrationEvmateApiClient | None
+) -> EVMateDataUpdateCoordinator:
+    """Return a coordinator requesting every endpoint on every refresh."""
+    entry = MockConfigEntry(domain=DOMAIN, unique_id="bench", title="Bench")
+    entry.runtime_data = MagicMock(
+        client=client,
+        history=EVMateEnergyHistory(hass, entry.entry_id),
+        statistics=None,
+        costs=None,
+        archiver=None,
+    )
+    coordinator = EVMateDataUpdateCoordinator(
+        hass,
+        LOGGER,
+        DOMAIN,
+        dict.fromkeys(ENDPOINTS, timedelta(0)),
+        schedule=False,
+    )
+    coordinator.config_entry = entry
+    return coordinator
+
+
+def test_coordinator_refresh(
+    benchmark,  # noqa: ANN001
+    hass: HomeAssistant,
+    event_loop: asyncio.AbstractEventLoop,
+    socket_enabled,  # noqa: ANN001, ARG001
+) -> None:
+    """Benchmark a refresh of all endpoints with changing live values."""
+    meter = FakeMeter(vary=True)
+
+    async def start() -> IntegrationEvmateApiClient:
+        return IntegrationEvmateApiClient("127.0.0.1", await meter.start())
+
+    client = event_loop.run_until_complete(start())
+    coordinator = _coordinator(hass, client)
+
+    benchmark(_run(event_loop, coordinator.async_refresh))
+
+    assert coordinator.last_update_success
+    event_loop.run_until_complete(client.async_close())
+    event_loop.run_until_complete(meter.stop())
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_parse(benchmark, endpoint: str) -> None:  # noqa: ANN001
+    """Benchmark parsing and converting the body of an endpoint."""
+    body = json.dumps(load_fixtures()[endpoint]).encode()
+    client = IntegrationEvmateApiClient("127.0.0.1", 80, session=MagicMock())
+
+    def parse() -> dict[str, Any]:
+        # A new body every time, the cache of unchanged bodies must not hit
+        client._bodies.clear()  # noqa: SLF001
+        return extract_values(client._parse(endpoint, body))  # noqa: SLF001
+
+    assert benchmark(parse)
+
+
+def test_parse_long_history(benchmark) -> None:  # noqa: ANN001
+    """Benchmark parsing an updateData body with three years of daily history."""
+    data = load_fixtures()["updateData"]
+    data["D"] = data["D"] * 36
+    data["M"] = data["M"] * 3
+    body = json.dumps(data).encode()
+    client = IntegrationEvmateApiClient("127.0.0.1", 80, session=MagicMock())
+
+    def parse() -> dict[str, Any]:
+        client._bodies.clear()  # noqa: SLF001
+        return extract_values(client._parse("updateData", body))  # noqa: SLF001
+
+    assert benchmark(parse)
+
+
+@pytest.mark.parametrize("entities", [10, 100, 1000])
+@pytest.mark.parametrize("changed", ["all", "one"])
+def test_entity_fan_out(
+    benchmark,  # noqa: ANN001
+    hass: HomeAssistant,
+    event_loop: asyncio.AbstractEventLoop,
+    entities: int,
+    changed: str,
+) -> None:
+    """Benchmark notifying N sensors of an update changing all or one key."""
+    coordinator = _coordinator(hass, None)
+    data = load_fixtures()["updateData"]
+    coordinator.data = data
+    coordinator.values = extract_values(data)
+    descriptions = [
+        description
+        for description in SENSOR_TYPES
+        if description.entity_registry_enabled_default
+    ]
+    sensors = [
+        EVMateSensor(
+            f"bench-{index}", descriptions[index % len(descriptions)], coordinator
+        )
+        for index in range(entities)
+    ]
+    for index, sensor in enumerate(sensors):
+        sensor.entity_id = f"sensor.bench_{index}"
+    platform = MockEntityPlatform(hass, domain="sensor", platform_name=DOMAIN)
+    event_loop.run_until_complete(platform.async_add_entities(sensors))
+    coordinator.changed_keys = None if changed == "all" else {"U1"}
+
+    async def update() -> None:
+        coordinator.async_update_listeners()
+
+    benchmark(_run(event_loop, update))
+
+    assert len(hass.states.async_entity_ids("sensor")) == entities
+
+
+@pytest.mark.parametrize("meters", [1, 10, 50])
+def test_fleet_scaling(
+    benchmark,  # noqa: ANN001
+    hass: HomeAssistant,
+    event_loop: asyncio.AbstractEventLoop,
+    socket_enabled,  # noqa: ANN001, ARG001
+    meters: int,
+) -> None:
+    """Benchmark refreshing M meters at once on the shared fleet connections."""
+    fleet = EVMateFleet(hass)
+    simulated = [
+        FakeMeter(LATENCY, jitter=JITTER, vary=True, seed=seed)
+        for seed in range(meters)
+    ]
+
+    async def start(meter: FakeMeter) -> IntegrationEvmateApiClient:
+        return IntegrationEvmateApiClient(
+            "127.0.0.1",
+            await meter.start(),
+            session=fleet.session,
+            limiter=fleet.limiter,
+        )
+
+    coordinators = [
+        _coordinator(hass, event_loop.run_until_complete(start(meter)))
+        for meter in simulated
+    ]
+
+    async def refresh() -> None:
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+
+    benchmark(_run(event_loop, refresh))
+
+    assert all(coordinator.last_update_success for coordinator in coordinators)
+    event_loop.run_until_complete(fleet.session.close())
+    for meter in simulated:
+        event_loop.run_until_complete(meter.stop())
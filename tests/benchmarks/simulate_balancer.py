@@ -0,0 +1,131 @@
+"""
+Offline simulation of the solar surplus balancer.
+
+Run with ``python -m tests.benchmarks.simulate_balancer [updateData.json ...]``
+from the repository root. Every given updateData payload (the test fixture by
+default) is replayed second by second: the hourly net import/export of "Es"
+sets the level of each hour and the per-minute "Pm" profile its shape. A
+synthetic PV curve peaking at ``--pv-peak`` W can be added on top. The
+simulated chargers follow the balancer's setpoints one step later, and the
+run reports the step time percentiles, the energy charged from surplus and
+from the grid, and how often charging started and the setpoint changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from custom_components.evmate.balancer import BalancerSample, SurplusBalancer
+from custom_components.evmate.decoder import decode_profile
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "update_data.json"
+VOLTAGE = 230.0
+PHASES = 3
+
+
+def household_power(payload: dict[str, Any], pv_peak: float) -> Iterator[float]:
+    """Yield the grid power (W) of every second of the recorded hours."""
+    profile = decode_profile(payload)
+    minutes = list(profile.power) or [0]
+    shape = [sample - statistics.fmean(minutes) for sample in minutes]
+    for hour, imported, exported in zip(
+        profile.hourly.hours,
+        profile.hourly.imports,
+        profile.hourly.exports,
+        strict=True,
+    ):
+        level = imported - exported
+        for second in range(3600):
+            daytime = (hour + second / 3600 - 6) / 14
+            pv = pv_peak * math.sin(math.pi * daytime) if 0 < daytime < 1 else 0
+            yield level + shape[second // 60 % len(shape)] - pv
+
+
+def replay(
+    payloads: Iterable[dict[str, Any]],
+    *,
+    evse_count: int = 1,
+    grid_limit: float = 25,
+    pv_peak: float = 0,
+    period: float = 1,
+) -> dict[str, float]:
+    """Run the balancer on the replayed data and return its statistics."""
+    balancer = SurplusBalancer()
+    setpoints = (0,) * evse_count
+    step_times = []
+    surplus_kwh = grid_kwh = 0.0
+    starts = changes = 0
+    now = 0.0
+    for payload in payloads:
+        for index, house in enumerate(household_power(payload, pv_peak)):
+            if index % period:
+                continue
+            ev_power = sum(setpoints) * VOLTAGE * PHASES
+            grid = house + ev_power
+            phase_current = abs(grid) / (VOLTAGE * PHASES)
+            sample = BalancerSample(
+                phase_currents=(phase_current,) * PHASES,
+                grid_power=grid,
+                voltage=VOLTAGE,
+                evse_currents=setpoints,
+                grid_limit=grid_limit,
+            )
+            begin = time.perf_counter()
+            new = balancer.step(sample, now)
+            step_times.append(time.perf_counter() - begin)
+
+            from_grid = min(max(grid, 0), ev_power)
+            grid_kwh += from_grid * period / 3_600_000
+            surplus_kwh += (ev_power - from_grid) * period / 3_600_000
+            starts += sum(
+                1
+                for old, value in zip(setpoints, new, strict=True)
+                if value and not old
+            )
+            changes += new != setpoints
+            setpoints = new
+            now += period
+    quantiles = statistics.quantiles(step_times, n=100)
+    return {
+        "steps": len(step_times),
+        "step_p50_us": quantiles[49] * 1e6,
+        "step_p99_us": quantiles[98] * 1e6,
+        "surplus_kwh": surplus_kwh,
+        "grid_kwh": grid_kwh,
+        "starts": starts,
+        "setpoint_changes": changes,
+    }
+
+
+def main() -> None:
+    """Replay the given payloads and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("payloads", nargs="*", type=Path, default=[FIXTURE])
+    parser.add_argument("--evse", type=int, default=1)
+    parser.add_argument("--grid-limit", type=float, default=25)
+    parser.add_argument("--pv-peak", type=float, default=8000)
+    parser.add_argument("--period", type=int, default=1)
+    args = parser.parse_args()
+    payloads = (json.loads(path.read_text()) for path in args.payloads)
+    result = replay(
+        payloads,
+        evse_count=args.evse,
+        grid_limit=args.grid_limit,
+        pv_peak=args.pv_peak,
+        period=args.period,
+    )
+    for name, value in result.items():
+        print(f"{name:>17}: {value:10.2f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,27 @@
 """Fixtures for testing."""
 
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
 import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.const import (
+    DOMAIN,
+    ENDPOINT_DATA,
+    ENDPOINT_EVSE,
+    ENDPOINT_SETTING,
+    LOGGER,
+)
+from custom_components.evmate.coordinator import EVMateDataUpdateCoordinator
+
+DEFAULT_INTERVALS = {
+    ENDPOINT_SETTING: timedelta(hours=1),
+    ENDPOINT_DATA: timedelta(seconds=5),
+    ENDPOINT_EVSE: timedelta(seconds=30),
+}
 
 
 @pytest.fixture(autouse=True)
@@ -8,3 +29,27 @@ def auto_enable_custom_integrations(enable_custom_integrations) -> None:  # noqa
     # def auto_enable_custom_integrations(enable_custom_integrations) -> None:
     """Enable custom integrations."""
     return
+
+
+@pytest.fixture
+def create_coordinator(hass) -> Callable[..., EVMateDataUpdateCoordinator]:  # noqa: ANN001
+    """Return a factory of coordinators reading from the given client."""
+
+    def _create(
+        client: Any,
+        *,
+        archiver: Any = None,
+        intervals: dict[str, timedelta] = DEFAULT_INTERVALS,
+        store: Any = None,
+    ) -> EVMateDataUpdateCoordinator:
+        entry = MockConfigEntry(domain=DOMAIN, unique_id="test")
+        entry.runtime_data = MagicMock(
+            client=client, statistics=None, costs=None, archiver=archiver
+        )
+        coordinator = EVMateDataUpdateCoordinator(
+            hass=hass, logger=LOGGER, name=DOMAIN, intervals=intervals, store=store
+        )
+        coordinator.config_entry = entry
+        return coordinator
+
+    return _create
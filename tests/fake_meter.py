@@ -0,0 +1,214 @@
+"""
+Local simulation of the IoTMeter web server serving the fixtures.
+
+With ``vary`` set the live values of updateData move on by a second on every
+request. Run ``python -m tests.fake_meter`` from the repository root to serve
+a simulated meter to a development instance of Home Assistant.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+from custom_components.evmate.history import meter_time
+
+FIXTURES = {
+    "updateSetting": "update_setting.json",
+    "updateData": "update_data.json",
+    "updateEvse": "update_evse.json",
+}
+PHASES = (1, 2, 3)
+
+
+def load_fixtures() -> dict[str, dict[str, Any]]:
+    """Return the fixture payload of every endpoint."""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    payloads = {}
+    for endpoint, name in FIXTURES.items():
+        with Path.open(fixtures_path / name) as file:
+            payloads[endpoint] = json.load(file)
+    return payloads
+
+
+class FakeMeter:
+    """
+    IoTMeter web server on a free local port.
+
+    ``latency`` delays every answer like the meter's slow CPU does, spread
+    evenly by up to ``jitter`` either way, and ``max_connections`` limits the
+    requests served at the same time. ``failure_rate`` of the requests are
+    answered with HTTP 503 and ``drop_rate`` of them by closing the
+    connection. With ``stream_period`` set, updateData is answered with a
+    chunked stream of newline separated payloads, one every ``stream_period``
+    seconds. Settings posted to updateSetting are recorded in ``writes`` and
+    applied. The random choices are repeatable for the same ``seed``.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        latency: float = 0.0,
+        max_connections: int | None = None,
+        stream_period: float | None = None,
+        *,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        vary: bool = False,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the fake meter with the fixture payloads."""
+        self.payloads = load_fixtures()
+        self.requests: Counter[str] = Counter()
+        self.failures: Counter[str] = Counter()
+        self.writes: list[dict[str, str]] = []
+        # Requests being served at the same time, now and at most
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.port = 0
+        self._latency = latency
+        self._jitter = jitter
+        self._failure_rate = failure_rate
+        self._drop_rate = drop_rate
+        self._vary = vary
+        self._random = random.Random(seed)  # noqa: S311
+        self._limit = asyncio.Semaphore(max_connections) if max_connections else None
+        self._stream_period = stream_period
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, port: int = 0, host: str = "127.0.0.1") -> int:
+        """Start serving and return the port."""
+        app = web.Application()
+        app.router.add_get("/{endpoint}", self._handle)
+        app.router.add_post("/updateSetting", self._handle_write)
+        self._runner = web.AppRunner(app, access_log=None, shutdown_timeout=0.1)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def body(self, endpoint: str) -> bytes:
+        """Return the current body of an endpoint."""
+        return json.dumps(self.payloads[endpoint]).encode()
+
+    def advance(self, seconds: int = 1) -> None:
+        """Move the live values of updateData on by ``seconds``."""
+        data = self.payloads["updateData"]
+        for phase in PHASES:
+            voltage = min(
+                max(data[f"U{phase}"] + self._random.randint(-1, 1), 225), 245
+            )
+            data[f"U{phase}"] = voltage
+            if not data[f"I{phase}"]:
+                continue
+            # Current in 0.01 A, power factor in %
+            current = max(data[f"I{phase}"] + self._random.randint(-3, 3), 1)
+            data[f"I{phase}"] = current
+            data[f"S{phase}"] = round(voltage * current / 100)
+            data[f"P{phase}"] = round(data[f"S{phase}"] * data[f"F{phase}"] / 100)
+            # Counters in 0.01 kWh, rounded up so that they move visibly
+            energy = -(-data[f"P{phase}"] * seconds // 36_000)
+            data[f"E{phase}tP"] += energy
+            data[f"E{phase}dP"] += energy
+        data["RUN_TIME"] += seconds
+        before = meter_time(data["WATTMETER_TIME"])
+        now = before + timedelta(seconds=seconds)
+        data["WATTMETER_TIME"] = now.strftime("%d.%m.%y  %H:%M:%S")
+        if now.minute != before.minute:
+            # "Pm" starts with its length, the oldest minute drops out
+            power = sum(data[f"P{phase}"] for phase in PHASES)
+            data["Pm"] = [data["Pm"][0], *data["Pm"][2:], power]
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        endpoint = request.match_info["endpoint"]
+        if endpoint not in self.payloads:
+            raise web.HTTPNotFound
+        self.requests[endpoint] += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self._limit is None:
+                await self._delay()
+            else:
+                async with self._limit:
+                    await self._delay()
+        finally:
+            self.in_flight -= 1
+        roll = self._random.random()
+        if roll < self._failure_rate + self._drop_rate:
+            self.failures[endpoint] += 1
+            if roll < self._drop_rate and request.transport is not None:
+                request.transport.close()
+            raise web.HTTPServiceUnavailable
+        if self._vary and endpoint == "updateData":
+            self.advance()
+        if self._stream_period is not None and endpoint == "updateData":
+            return await self._stream(request, endpoint)
+        return web.Response(body=self.body(endpoint), content_type="application/json")
+
+    async def _delay(self) -> None:
+        jitter = self._random.uniform(-self._jitter, self._jitter)
+        await asyncio.sleep(max(self._latency + jitter, 0))
+
+    async def _handle_write(self, request: web.Request) -> web.Response:
+        values = {key: str(value) for key, value in (await request.post()).items()}
+        self.writes.append(values)
+        self.payloads["updateSetting"].update(values)
+        return web.Response()
+
+    async def _stream(self, request: web.Request, endpoint: str) -> web.StreamResponse:
+        response = web.StreamResponse()
+        response.content_type = "application/x-ndjson"
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        while True:
+            await response.write(self.body(endpoint) + b"\n")
+            await asyncio.sleep(self._stream_period)
+            if self._vary:
+                self.advance(max(round(self._stream_period), 1))
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    meter = FakeMeter(
+        args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        drop_rate=args.drop_rate,
+        vary=True,
+    )
+    port = await meter.start(args.port, args.host)
+    print(f"Simulated IoTMeter on http://{args.host}:{port}")  # noqa: T201
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await meter.stop()
+
+
+def main() -> None:
+    """Serve a simulated meter until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
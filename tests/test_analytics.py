@@ -0,0 +1,156 @@
+"""Tests for the tariff and cost analytics of the hourly history."""
+
+from datetime import date
+
+import pytest
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.exceptions import ServiceValidationError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.analytics import EVMateEnergyCosts, Tariff
+from custom_components.evmate.const import (
+    CONF_PEAK_END,
+    CONF_PEAK_START,
+    CONF_PRICE_EXPORT,
+    CONF_PRICE_OFFPEAK,
+    CONF_PRICE_PEAK,
+    DOMAIN,
+)
+from custom_components.evmate.decoder import decode_profile
+from tests.fake_meter import FakeMeter, load_fixtures
+
+OPTIONS = {
+    CONF_PRICE_PEAK: 0.3,
+    CONF_PRICE_OFFPEAK: 0.1,
+    CONF_PRICE_EXPORT: 0.05,
+    CONF_PEAK_START: 7,
+    CONF_PEAK_END: 21,
+}
+
+
+def _payload(time: str, hours: list[tuple[int, int, int]]) -> dict:
+    """Return an updateData payload with the (hour, import, export) groups."""
+    es = [len(hours) * 4]
+    for hour, imported, exported in hours:
+        es.extend((hour, imported, exported, 1))
+    return {"Es": es, "WATTMETER_TIME": time}
+
+
+def test_tariff_from_options() -> None:
+    """Test the hourly prices and a peak that wraps around midnight."""
+    assert Tariff.from_options({}) is None
+    tariff = Tariff.from_options(OPTIONS)
+    assert tariff.import_prices[6] == 0.1  # noqa: PLR2004
+    assert tariff.import_prices[7] == 0.3  # noqa: PLR2004
+    assert tariff.import_prices[21] == 0.1  # noqa: PLR2004
+
+    night = Tariff.from_options(OPTIONS | {CONF_PEAK_START: 22, CONF_PEAK_END: 6})
+    assert night.peak_hours == frozenset({22, 23, 0, 1, 2, 3, 4, 5})
+
+
+@pytest.mark.asyncio
+async def test_closed_hours_are_priced_once(hass) -> None:  # noqa: ANN001
+    """Test that only the open hour and the newly closed ones are priced."""
+    costs = EVMateEnergyCosts(hass, "entry", Tariff.from_options(OPTIONS))
+    costs.async_update(
+        decode_profile(
+            _payload(
+                "07.04.25  07:30:00",
+                [(5, 1000, 0), (6, 1000, 400), (7, 1500, 0)],
+            )
+        )
+    )
+    # The hours before 07:00 are off-peak and closed, 07:00 is still open
+    assert costs.days[date(2025, 4, 7)].import_cost == pytest.approx(0.2)
+    assert costs.today().import_cost == pytest.approx(0.65)
+    payload = _payload(
+        "07.04.25  08:10:00", [(6, 1000, 400), (7, 2000, 0), (8, 500, 0)]
+    )
+    costs.async_update(decode_profile(payload))
+    today = costs.today()
+    assert today.import_energy == pytest.approx(4.5)
+    assert today.import_cost == pytest.approx(0.1 + 0.1 + 0.6 + 0.15)
+    assert today.export_revenue == pytest.approx(0.02)
+    assert today.peak_share == 55.6  # noqa: PLR2004
+    assert costs.last_hour.import_cost == pytest.approx(0.6)
+
+    # The closed hours are not added again, the open one is priced anew
+    payload["Es"][-3] = 1000
+    costs.async_update(decode_profile(payload))
+    assert costs.today().import_cost == pytest.approx(0.1 + 0.1 + 0.6 + 0.3)
+    assert costs.this_month().import_energy == pytest.approx(5)
+
+
+@pytest.mark.asyncio
+async def test_days_split_at_midnight(hass) -> None:  # noqa: ANN001
+    """Test that the hours of a batch go to the days they belong to."""
+    costs = EVMateEnergyCosts(hass, "entry", Tariff.from_options(OPTIONS))
+    costs.async_update(
+        decode_profile(
+            _payload(
+                "01.05.25  01:05:00",
+                [(22, 1000, 0), (23, 1000, 0), (0, 3000, 0), (1, 100, 0)],
+            )
+        )
+    )
+    assert costs.days[date(2025, 4, 30)].import_energy == pytest.approx(2)
+    assert costs.days[date(2025, 5, 1)].import_energy == pytest.approx(3)
+    assert costs.months[date(2025, 4, 1)].import_cost == pytest.approx(0.2)
+    assert costs.query(date(2025, 4, 30), date(2025, 5, 2)).import_energy == (
+        pytest.approx(5.1)
+    )
+    assert costs.query(date(2025, 5, 1), date(2025, 5, 2)).import_cost == (
+        pytest.approx(0.31)
+    )
+
+
+@pytest.mark.asyncio
+async def test_energy_costs_service(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test the cost sensors and the range query of the service."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+        options=OPTIONS,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    es = load_fixtures()["updateData"]["Es"]
+    groups = [es[i : i + 4] for i in range(1, len(es), 4)]
+    imported = sum(group[1] for group in groups if group[3]) / 1000
+    response = await hass.services.async_call(
+        DOMAIN,
+        "get_energy_costs",
+        {
+            "config_entry_id": entry.entry_id,
+            "start_date": "2025-04-05",
+            "end_date": "2025-04-06",
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response["import_energy"] == round(imported, 3)
+    state = hass.states.get("sensor.garage_energy_cost_today")
+    assert state.attributes["unit_of_measurement"] == hass.config.currency
+    assert float(state.state) == round(entry.runtime_data.costs.today().import_cost, 2)
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            "get_energy_costs",
+            {
+                "config_entry_id": entry.entry_id,
+                "start_date": "2025-04-06",
+                "end_date": "2025-04-05",
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
@@ -2,10 +2,20 @@
 
 import json
 from pathlib import Path
+from unittest.mock import patch
 
+import aiohttp
 import pytest
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from custom_components.evmate.api import IntegrationEvmateApiClient
+from custom_components.evmate.api import (
+    IntegrationEvmateApiClient,
+    IntegrationEvmateApiClientAuthenticationError,
+    IntegrationEvmateApiClientCircuitOpenError,
+    IntegrationEvmateApiClientCommunicationError,
+    IntegrationEvmateApiClientPayloadError,
+)
+from tests.fake_meter import FakeMeter
 
 
 @pytest.mark.asyncio
@@ -35,9 +45,178 @@ async def test_get_data(hass, aioclient_mock) -> None:  # noqa: ANN001
         status=200,
     )
 
-    api = IntegrationEvmateApiClient("192.168.0.15", 8000, hass)
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
     result = await api.async_get_data()
 
     assert result["DHCP"] == "1"
     assert result["EV_STATE"] == [2]
     assert result["E2tN"] == 10252  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_get_data_partial(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that a failing endpoint does not drop the other payloads."""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    with Path.open(fixtures_path / "update_setting.json") as file:
+        update_setting = json.load(file)
+    with Path.open(fixtures_path / "update_evse.json") as file:
+        update_evse = json.load(file)
+
+    aioclient_mock.get(
+        "http://192.168.0.15:8000/updateSetting",
+        json=update_setting,
+        status=200,
+    )
+    aioclient_mock.get(
+        "http://192.168.0.15:8000/updateData",
+        exc=TimeoutError,
+    )
+    aioclient_mock.get(
+        "http://192.168.0.15:8000/updateEvse",
+        json=update_evse,
+        status=200,
+    )
+
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
+    result = await api.async_get_data()
+
+    assert result["DHCP"] == "1"
+    assert result["EV_STATE"] == [2]
+    assert "E2tN" not in result
+    assert "error" not in result
+
+
+@pytest.mark.asyncio
+async def test_unchanged_body_not_parsed(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that an unchanged body returns the previous payload object."""
+    aioclient_mock.get("http://192.168.0.15:8000/updateEvse", json={"EV_STATE": [2]})
+
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
+    first = await api.async_get_endpoints(["updateEvse"])
+    second = await api.async_get_endpoints(["updateEvse"])
+
+    assert second["updateEvse"] is first["updateEvse"]
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get("http://192.168.0.15:8000/updateEvse", json={"EV_STATE": [3]})
+    third = await api.async_get_endpoints(["updateEvse"])
+
+    assert third["updateEvse"] == {"EV_STATE": [3]}
+
+
+@pytest.mark.asyncio
+async def test_simulated_meter(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test the live values and the failures of the simulated meter."""
+    meter = FakeMeter(vary=True)
+    api = IntegrationEvmateApiClient(
+        "127.0.0.1", await meter.start(), session=async_get_clientsession(hass)
+    )
+    first = await api.async_get_endpoints(["updateData"])
+    second = await api.async_get_endpoints(["updateData"])
+    await meter.stop()
+
+    assert second["updateData"]["RUN_TIME"] == first["updateData"]["RUN_TIME"] + 1
+    assert second["updateData"]["E3tP"] >= first["updateData"]["E3tP"]
+
+    for failing in (FakeMeter(failure_rate=1), FakeMeter(drop_rate=1)):
+        api = IntegrationEvmateApiClient(
+            "127.0.0.1", await failing.start(), session=async_get_clientsession(hass)
+        )
+        with pytest.raises(IntegrationEvmateApiClientCommunicationError):
+            await api.async_get_data()
+        await failing.stop()
+        # The client retries a dropped keep-alive connection once
+        assert set(failing.failures) == {"updateSetting", "updateData", "updateEvse"}
+
+
+@pytest.mark.asyncio
+async def test_request_metrics(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that answers, bytes, decodes and failures are counted per endpoint."""
+    aioclient_mock.get("http://192.168.0.15:8000/updateEvse", json={"EV_STATE": [2]})
+    aioclient_mock.get("http://192.168.0.15:8000/updateData", exc=TimeoutError)
+
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
+    await api.async_get_endpoints(["updateEvse", "updateData"])
+    await api.async_get_endpoints(["updateEvse", "updateData"])
+
+    evse = api.metrics["updateEvse"]
+    assert (evse.requests, evse.failures, evse.decodes) == (2, 0, 1)
+    assert evse.bytes_received == 2 * len(b'{"EV_STATE":[2]}')
+    assert sum(evse.latency_histogram) == 2  # noqa: PLR2004
+    assert evse.latency_quantile(0.95) == 0.05  # noqa: PLR2004
+    data = api.metrics["updateData"]
+    assert (data.failures, data.consecutive_failures) == (2, 2)
+    assert "did not answer within 10 s" in data.last_error
+    assert data.latency_quantile(0.5) is None
+
+
+@pytest.mark.asyncio
+async def test_typed_errors(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that failures are raised as the matching client errors."""
+    aioclient_mock.get("http://192.168.0.15:8000/updateSetting", status=401)
+    aioclient_mock.get("http://192.168.0.15:8000/updateData", text="<html>")
+    aioclient_mock.get("http://192.168.0.15:8000/updateEvse", status=500)
+
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
+    with pytest.raises(IntegrationEvmateApiClientAuthenticationError):
+        await api.async_get_endpoints(["updateSetting"])
+    with pytest.raises(IntegrationEvmateApiClientPayloadError):
+        await api.async_get_endpoints(["updateData"])
+    with pytest.raises(IntegrationEvmateApiClientCommunicationError, match="500"):
+        await api.async_get_endpoints(["updateEvse"])
+    # Any authentication error wins over the others
+    with pytest.raises(IntegrationEvmateApiClientAuthenticationError):
+        await api.async_get_endpoints(["updateEvse", "updateSetting"])
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that an unreachable meter is only probed with a growing backoff."""
+    for endpoint in ("updateSetting", "updateData", "updateEvse"):
+        aioclient_mock.get(
+            f"http://192.168.0.15:8000/{endpoint}", exc=aiohttp.ClientError
+        )
+    api = IntegrationEvmateApiClient(
+        "192.168.0.15", 8000, session=async_get_clientsession(hass)
+    )
+
+    with (
+        patch("custom_components.evmate.api.time.monotonic") as monotonic,
+        patch("custom_components.evmate.api.random.uniform", return_value=1),
+    ):
+        monotonic.return_value = 1000
+        for _ in range(3):
+            with pytest.raises(IntegrationEvmateApiClientCommunicationError):
+                await api.async_get_data()
+        assert aioclient_mock.call_count == 9  # noqa: PLR2004
+        assert api.breaker.state == "open"
+
+        monotonic.return_value = 1009
+        with pytest.raises(IntegrationEvmateApiClientCircuitOpenError):
+            await api.async_get_data()
+        with pytest.raises(IntegrationEvmateApiClientCircuitOpenError):
+            await api.async_write({"chargeMode": "1"})
+        assert aioclient_mock.call_count == 9  # noqa: PLR2004
+
+        # The probe only requests one endpoint, its failure doubles the backoff
+        monotonic.return_value = 1010
+        with pytest.raises(IntegrationEvmateApiClientCommunicationError):
+            await api.async_get_data()
+        assert aioclient_mock.call_count == 10  # noqa: PLR2004
+        assert api.breaker.retry_at == 1030  # noqa: PLR2004
+
+        aioclient_mock.clear_requests()
+        aioclient_mock.get("http://192.168.0.15:8000/updateSetting", json={"ID": 1})
+        monotonic.return_value = 1030
+        assert await api.async_get_data() == {"ID": 1}
+        assert api.breaker.state == "closed"
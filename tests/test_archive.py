@@ -0,0 +1,181 @@
+"""Tests for the payload archive and its replay."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from homeassistant.const import (
+    CONF_IP_ADDRESS,
+    CONF_PORT,
+    EVENT_HOMEASSISTANT_FINAL_WRITE,
+)
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.archive import (
+    ArchiveReplayClient,
+    EVMateArchiver,
+    read_archive,
+)
+from custom_components.evmate.const import (
+    CONF_ARCHIVE,
+    DOMAIN,
+    ENDPOINT_DATA,
+    ENDPOINT_EVSE,
+    ENDPOINT_SETTING,
+)
+from tests.fake_meter import FakeMeter, load_fixtures
+
+ZERO_INTERVALS = dict.fromkeys(
+    (ENDPOINT_SETTING, ENDPOINT_DATA, ENDPOINT_EVSE), timedelta(seconds=0)
+)
+
+
+@pytest.mark.asyncio
+async def test_archive_rotation_and_range(hass, tmp_path) -> None:  # noqa: ANN001
+    """Test that the files rotate by day and size and a range reads back."""
+    start = datetime(2025, 4, 6, 23, 58, tzinfo=dt_util.get_default_time_zone())
+    archiver = EVMateArchiver(hass, tmp_path, max_bytes=1)
+    times = [start + timedelta(minutes=minute) for minute in range(4)]
+    for minute, time in enumerate(times[:1]):
+        archiver.async_append({ENDPOINT_DATA: {"U1": minute}}, time.timestamp())
+    await archiver.async_flush()
+    for minute, time in enumerate(times[1:], 1):
+        archiver.async_append({ENDPOINT_DATA: {"U1": minute}}, time.timestamp())
+    archiver.async_append({ENDPOINT_EVSE: {"EVSE": []}}, times[3].timestamp())
+    await archiver.async_close()
+
+    # The second batch crosses midnight, the full file of the 6th is not reused
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "2025-04-06.000.bin.gz",
+        "2025-04-06.001.bin.gz",
+        "2025-04-07.000.bin.gz",
+    ]
+    records = list(read_archive(tmp_path))
+    assert [record.payloads for record in records] == [
+        {ENDPOINT_DATA: {"U1": 0}},
+        {ENDPOINT_DATA: {"U1": 1}},
+        {ENDPOINT_DATA: {"U1": 2}},
+        {ENDPOINT_DATA: {"U1": 3}},
+        {ENDPOINT_EVSE: {"EVSE": []}},
+    ]
+    assert records[0].time == times[0]
+    ranged = read_archive(tmp_path, times[1], times[3])
+    assert [record.payloads[ENDPOINT_DATA]["U1"] for record in ranged] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_partly_written_record(hass, tmp_path) -> None:  # noqa: ANN001
+    """Test that a file cut off in the middle of a batch reads up to it."""
+    archiver = EVMateArchiver(hass, tmp_path)
+    now = dt_util.utcnow().timestamp()
+    archiver.async_append({ENDPOINT_DATA: {"U1": 230}}, now)
+    await archiver.async_flush()
+    archiver.async_append({ENDPOINT_DATA: {"U1": 231}}, now + 1)
+    await archiver.async_flush()
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(path.read_bytes()[:-10])
+
+    assert [record.payloads for record in read_archive(tmp_path)] == [
+        {ENDPOINT_DATA: {"U1": 230}}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coordinator_archive_and_replay(
+    hass,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+    create_coordinator,  # noqa: ANN001
+) -> None:
+    """Test that the changes of a coordinator replay into another one."""
+    payloads = load_fixtures()
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = [
+        payloads,
+        payloads,
+        {ENDPOINT_DATA: {**payloads[ENDPOINT_DATA], "U1": 229}},
+    ]
+    archiver = EVMateArchiver(hass, tmp_path)
+    coordinator = create_coordinator(
+        client, archiver=archiver, intervals=ZERO_INTERVALS
+    )
+    for _ in range(3):
+        await coordinator.async_refresh()
+    await archiver.async_close()
+
+    # The unchanged second refresh is not archived
+    records = list(read_archive(tmp_path))
+    assert len(records) == 2  # noqa: PLR2004
+    assert records[1].payloads == {
+        ENDPOINT_DATA: {**payloads[ENDPOINT_DATA], "U1": 229}
+    }
+
+    replay = ArchiveReplayClient(hass, read_archive(tmp_path))
+    replayed = create_coordinator(replay, intervals=ZERO_INTERVALS)
+    await replayed.async_refresh()
+    assert replayed.values["U1"] == 235  # noqa: PLR2004
+    await replayed.async_refresh()
+    assert replayed.values["U1"] == 229  # noqa: PLR2004
+    assert replay.time == records[1].time
+    await replayed.async_refresh()
+    assert not replayed.last_update_success
+
+
+@pytest.mark.asyncio
+async def test_optimistic_values_are_not_archived(
+    hass,  # noqa: ANN001
+    tmp_path,  # noqa: ANN001
+    create_coordinator,  # noqa: ANN001
+) -> None:
+    """Test that only the values the meter confirmed end up in the archive."""
+    payloads = load_fixtures()
+    confirmed = {**payloads[ENDPOINT_SETTING], "sw,ENABLE CHARGING": "1"}
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = [
+        payloads,
+        {ENDPOINT_SETTING: confirmed},
+    ]
+    archiver = EVMateArchiver(hass, tmp_path)
+    coordinator = create_coordinator(
+        client, archiver=archiver, intervals=ZERO_INTERVALS
+    )
+    await coordinator.async_refresh()
+    coordinator.async_set_optimistic(ENDPOINT_SETTING, {"sw,ENABLE CHARGING": "1"})
+    coordinator.async_set_optimistic(ENDPOINT_SETTING, {"sw,ENABLE CHARGING": "0"})
+    coordinator.async_set_optimistic(ENDPOINT_SETTING, {"sw,ENABLE CHARGING": "1"})
+    # The meter confirms the last value, equal to the optimistic payload
+    await coordinator.async_refresh_endpoints([ENDPOINT_SETTING])
+    await archiver.async_close()
+
+    records = list(read_archive(tmp_path))
+    assert [record.payloads for record in records] == [
+        payloads,
+        {ENDPOINT_SETTING: confirmed},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archive_written_when_hass_stops(hass, tmp_path, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that the buffered records are written when Home Assistant stops."""
+    hass.config.config_dir = str(tmp_path)
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+        options={CONF_ARCHIVE: True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    directory = tmp_path / DOMAIN / "archive" / "meter"
+    assert not directory.exists()
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    assert [record.payloads for record in read_archive(directory)] == [meter.payloads]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
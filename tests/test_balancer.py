@@ -0,0 +1,118 @@
+"""Tests for the solar surplus balancer."""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.balancer import (
+    BalancerSample,
+    EVMateBalancer,
+    SurplusBalancer,
+    sample_from_values,
+)
+from custom_components.evmate.const import DOMAIN
+from custom_components.evmate.schema import extract_values
+from tests.benchmarks.simulate_balancer import FIXTURE, replay
+
+
+def _sample(
+    surplus: float, evse: tuple[float, ...] = (0,), phase: float = 5
+) -> BalancerSample:
+    """Return a sample exporting ``surplus`` A per phase."""
+    return BalancerSample(
+        phase_currents=(phase, phase, phase),
+        grid_power=-surplus * 230 * 3,
+        voltage=230,
+        evse_currents=evse,
+        grid_limit=25,
+    )
+
+
+def test_start_with_hysteresis_and_ramp() -> None:
+    """Test that charging starts above the hysteresis and ramps up."""
+    balancer = SurplusBalancer(hold=0)
+    assert balancer.step(_sample(6.5), 0) == (0,)
+    assert balancer.step(_sample(7.5), 1) == (6,)
+    assert balancer.step(_sample(10, (6,)), 2) == (7,)
+    assert balancer.step(_sample(10, (7,)), 5) == (10,)
+    # Drops at once
+    assert balancer.step(_sample(-2, (10,)), 6) == (8,)
+
+
+def test_stop_is_held_unless_grid_forces_it() -> None:
+    """Test that a lack of surplus stops only after the hold time."""
+    balancer = SurplusBalancer(hold=60)
+    assert balancer.step(_sample(8), 0) == (6,)
+    assert balancer.step(_sample(-5, (6,)), 10) == (6,)
+    assert balancer.step(_sample(-5, (6,)), 61) == (0,)
+
+    assert balancer.step(_sample(8), 200) == (6,)
+    # Phase current at the grid limit stops charging right away
+    assert balancer.step(_sample(8, (6,), phase=26), 201) == (0,)
+
+
+def test_shared_between_chargers() -> None:
+    """Test that the current is shared evenly and capped by the headroom."""
+    balancer = SurplusBalancer(hold=0, ramp=100)
+    assert balancer.step(_sample(30, (0, 0)), 0) == (6, 6)
+    assert balancer.step(_sample(30, (6, 6), phase=17), 1) == (10, 10)
+
+
+def test_sample_from_values() -> None:
+    """Test the sample of the fixture values."""
+    values = {}
+    for name in ("update_setting.json", "update_data.json", "update_evse.json"):
+        with Path.open(Path(__file__).parent / "fixtures" / name) as file:
+            values |= extract_values(json.load(file))
+
+    sample = sample_from_values(values)
+
+    assert sample.grid_limit == 24  # noqa: PLR2004
+    assert sample.phase_currents == (0, 0.64, 0.68)
+    assert sample.grid_power == 306  # noqa: PLR2004
+    assert sample.evse_currents == (15,)
+    assert sample_from_values({**values, "I1": None}) is None
+
+
+@pytest.mark.asyncio
+async def test_balancer_writes_changed_setpoints(hass) -> None:  # noqa: ANN001
+    """Test that only changed setpoints are written."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+    values = {
+        **{f"I{phase}": 5 for phase in (1, 2, 3)},
+        **{f"P{phase}": -2000 for phase in (1, 2, 3)},
+        **{f"U{phase}": 230 for phase in (1, 2, 3)},
+        "BREAKER": 25,
+        "ACTUAL_OUTPUT_CURRENT": (0,),
+    }
+    coordinator = MagicMock(
+        hass=hass, config_entry=entry, values=values, changed_keys=None
+    )
+    writer = MagicMock(async_set=AsyncMock())
+    balancer = EVMateBalancer(coordinator, writer, SurplusBalancer(hold=0))
+
+    balancer.async_update()
+    coordinator.changed_keys = {"U1"}
+    balancer.async_update()
+    coordinator.changed_keys = {"sw,ENABLE CHARGING"}
+    balancer.async_update()
+    await hass.async_block_till_done()
+
+    writer.async_set.assert_awaited_once_with("inp,EVSE1", "6")
+
+
+def test_replay() -> None:
+    """Test the offline simulation on the recorded day."""
+    with Path.open(FIXTURE) as file:
+        payload = json.load(file)
+
+    result = replay([payload], pv_peak=8000, period=10)
+
+    assert result["steps"] == 24 * 360
+    assert result["surplus_kwh"] > 0
+    assert result["grid_kwh"] < 0.01 * result["surplus_kwh"]
+    assert result["starts"] == 1
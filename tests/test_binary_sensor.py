@@ -9,6 +9,7 @@ from homeassistant.components.binary_sensor import BinarySensorEntityDescription
 
 from custom_components.evmate.binary_sensor import EVMateBinarySensor
 from custom_components.evmate.coordinator import EVMateDataUpdateCoordinator
+from custom_components.evmate.schema import extract_values
 
 
 @pytest.mark.asyncio
@@ -31,6 +32,7 @@ async def _check_binary_sensor_value(name: str, key: str, expected_state: str) -
     # Mock the coordinator
     mock_coordinator = AsyncMock(spec=EVMateDataUpdateCoordinator)
     mock_coordinator.data = update_setting
+    mock_coordinator.values = extract_values(update_setting)
     mock_description = AsyncMock(spec=BinarySensorEntityDescription)
     mock_description.name = name
     mock_description.key = key
@@ -0,0 +1,228 @@
+"""Tests for the data update coordinator."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.evmate.api import IntegrationEvmateApiClient
+from custom_components.evmate.const import (
+    ENDPOINT_DATA,
+    ENDPOINT_EVSE,
+    ENDPOINT_SETTING,
+    EVENT_DEMAND_LIMIT,
+)
+from tests.fake_meter import load_fixtures
+
+
+@pytest.mark.asyncio
+async def test_only_due_endpoints_are_fetched(create_coordinator) -> None:  # noqa: ANN001
+    """Test that every endpoint is polled on its own interval."""
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = lambda endpoints: {
+        endpoint: {endpoint: 1} for endpoint in endpoints
+    }
+    coordinator = create_coordinator(client)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        assert client.async_get_endpoints.call_args.args[0] == [
+            ENDPOINT_SETTING,
+            ENDPOINT_DATA,
+            ENDPOINT_EVSE,
+        ]
+
+        monotonic.return_value = 1006
+        await coordinator.async_refresh()
+        assert client.async_get_endpoints.call_args.args[0] == [ENDPOINT_DATA]
+
+        monotonic.return_value = 1031
+        await coordinator.async_refresh()
+        assert client.async_get_endpoints.call_args.args[0] == [
+            ENDPOINT_DATA,
+            ENDPOINT_EVSE,
+        ]
+
+    assert coordinator.data == {ENDPOINT_SETTING: 1, ENDPOINT_DATA: 1, ENDPOINT_EVSE: 1}
+
+
+@pytest.mark.asyncio
+async def test_listeners_only_notified_on_change(create_coordinator) -> None:  # noqa: ANN001
+    """Test that an unchanged payload does not notify the listeners."""
+    payload = {"U1": 235}
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = lambda endpoints: {
+        endpoint: {endpoint: payload["U1"]} for endpoint in endpoints
+    }
+    coordinator = create_coordinator(client)
+    listener = MagicMock()
+    unsub = coordinator.async_add_listener(listener)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        assert listener.call_count == 1
+
+        monotonic.return_value = 1010
+        await coordinator.async_refresh()
+        assert listener.call_count == 1
+
+        payload["U1"] = 236
+        monotonic.return_value = 1020
+        await coordinator.async_refresh()
+        assert listener.call_count == 2  # noqa: PLR2004
+
+    unsub()
+    assert coordinator.data[ENDPOINT_DATA] == 236  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_requests_per_update(hass, aioclient_mock, create_coordinator) -> None:  # noqa: ANN001
+    """Test that the coordinator counts the HTTP requests of every update."""
+    for endpoint in (ENDPOINT_SETTING, ENDPOINT_DATA, ENDPOINT_EVSE):
+        aioclient_mock.get(f"http://192.168.0.15:8000/{endpoint}", json={endpoint: 1})
+    coordinator = create_coordinator(
+        IntegrationEvmateApiClient(
+            "192.168.0.15", 8000, session=async_get_clientsession(hass)
+        ),
+    )
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        assert coordinator.last_update_requests == 3  # noqa: PLR2004
+
+        monotonic.return_value = 1002
+        await coordinator.async_refresh()
+        assert coordinator.last_update_requests == 0
+
+        monotonic.return_value = 1006
+        await coordinator.async_refresh()
+        assert coordinator.last_update_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_keys(create_coordinator) -> None:  # noqa: ANN001
+    """Test that the coordinator reports which keys changed."""
+    payloads = {
+        ENDPOINT_SETTING: {"ID": "1", "DHCP": "1"},
+        ENDPOINT_DATA: {"ID": "2", "U1": 235, "U2": 233},
+        ENDPOINT_EVSE: {"EV_STATE": [2]},
+    }
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = lambda endpoints: {
+        endpoint: dict(payloads[endpoint]) for endpoint in endpoints
+    }
+    coordinator = create_coordinator(client)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        assert coordinator.changed_keys is None
+
+        payloads[ENDPOINT_DATA] = {"ID": "3", "U1": 236, "U2": 233}
+        monotonic.return_value = 1006
+        await coordinator.async_refresh()
+        assert coordinator.changed_keys == {"ID", "U1"}
+
+        monotonic.return_value = 1012
+        await coordinator.async_refresh()
+        assert coordinator.changed_keys == set()
+        assert coordinator.values["U1"] == 236  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_unknown_keys_logged_once(caplog, create_coordinator) -> None:  # noqa: ANN001
+    """Test that keys missing from the schema are logged only once."""
+    payloads = {
+        ENDPOINT_SETTING: {"ID": "1"},
+        ENDPOINT_DATA: {"U1": 235, "X9": 1},
+        ENDPOINT_EVSE: {"EV_STATE": [2]},
+    }
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = lambda endpoints: {
+        endpoint: dict(payloads[endpoint]) for endpoint in endpoints
+    }
+    coordinator = create_coordinator(client)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        payloads[ENDPOINT_DATA] = {"U1": 236, "X9": 2}
+        monotonic.return_value = 1006
+        await coordinator.async_refresh()
+
+    assert caplog.text.count("unknown to this integration: X9") == 1
+    assert coordinator.values == {"U1": 236, "EV_STATE": (2,)}
+
+
+@pytest.mark.asyncio
+async def test_failing_endpoint_goes_stale(create_coordinator) -> None:  # noqa: ANN001
+    """Test that a failing endpoint keeps its payload until it is stale."""
+    failing: set[str] = set()
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.side_effect = lambda endpoints: {
+        endpoint: {endpoint: 1} for endpoint in endpoints if endpoint not in failing
+    }
+    coordinator = create_coordinator(client)
+    listener = MagicMock()
+    unsub = coordinator.async_add_listener(listener)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        await coordinator.async_refresh()
+        failing.add(ENDPOINT_DATA)
+
+        monotonic.return_value = 1012
+        await coordinator.async_refresh()
+        assert coordinator.stale_endpoints == frozenset()
+        assert coordinator.data[ENDPOINT_DATA] == 1
+        assert listener.call_count == 1
+
+        # Three intervals of updateData without an answer
+        monotonic.return_value = 1016
+        await coordinator.async_refresh()
+        assert coordinator.stale_endpoints == {ENDPOINT_DATA}
+        assert coordinator.last_update_success
+        assert listener.call_count == 2  # noqa: PLR2004
+        assert coordinator.changed_keys == set()
+
+        failing.clear()
+        monotonic.return_value = 1020
+        await coordinator.async_refresh()
+        assert coordinator.stale_endpoints == frozenset()
+        assert listener.call_count == 3  # noqa: PLR2004
+
+    unsub()
+    assert coordinator.received[ENDPOINT_DATA] == 1020  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_restore_only_fills_the_entities(hass, create_coordinator) -> None:  # noqa: ANN001
+    """Test that the snapshot is not counted, only the first live payload is."""
+    payloads = load_fixtures()
+    store = MagicMock()
+    store.async_load = AsyncMock(return_value={"payloads": payloads})
+    client = AsyncMock(request_count=0)
+    client.async_get_endpoints.return_value = payloads
+    coordinator = create_coordinator(client, store=store)
+    runtime_data = coordinator.config_entry.runtime_data
+    runtime_data.statistics = MagicMock(async_import=AsyncMock())
+    demand_events = []
+    hass.bus.async_listen(EVENT_DEMAND_LIMIT, demand_events.append)
+
+    assert await coordinator.async_restore()
+    await hass.async_block_till_done()
+    assert coordinator.profile is not None
+    runtime_data.history.async_update.assert_not_called()
+    runtime_data.statistics.async_import.assert_not_called()
+    assert coordinator.demand.projected_energy is None
+
+    # The meter still reports the same readings
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    runtime_data.history.async_update.assert_called_once()
+    runtime_data.statistics.async_import.assert_awaited_once()
+    assert coordinator.demand.projected_energy is not None
+    assert not demand_events
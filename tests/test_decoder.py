@@ -0,0 +1,42 @@
+"""Tests for the Es/Pm decoder."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.evmate.decoder import decode_profile
+
+
+def test_decode_profile() -> None:
+    """Test the decoded profile of the update_data.json fixture."""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    with Path.open(fixtures_path / "update_data.json") as file:
+        update_data = json.load(file)
+
+    profile = decode_profile(update_data)
+
+    assert len(profile.hourly) == 24  # noqa: PLR2004
+    assert profile.hourly.hours[0] == 18  # noqa: PLR2004
+    assert profile.hourly.series()[1] == [19, 328, 178]
+    assert profile.hour_import == update_data["Eh"]
+    assert profile.last_hour_import == 651  # noqa: PLR2004
+    assert profile.last_hour_export == 7  # noqa: PLR2004
+    # 271 Wh in the first 48:35 of the hour
+    assert profile.hour_import_projection == pytest.approx(271 * 3600 / 2915)
+
+    power = update_data["Pm"][1:]
+    assert len(profile.power) == 60  # noqa: PLR2004
+    assert profile.average_power == pytest.approx(sum(power) / 60)
+    assert profile.peak_15min_power == pytest.approx(
+        max(sum(power[index : index + 15]) / 15 for index in range(46))
+    )
+
+
+def test_decode_empty_profile() -> None:
+    """Test that a payload without history decodes to an empty profile."""
+    profile = decode_profile({})
+
+    assert len(profile.hourly) == 0
+    assert profile.peak_15min_power is None
+    assert profile.hour_import is None
@@ -0,0 +1,78 @@
+"""Tests for the energy deltas of the cumulative counters."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.evmate.delta import EnergyDeltas
+
+START = datetime(2025, 4, 6, 23, 58, tzinfo=UTC)
+
+
+def _sample(imported: int, exported: int = 0) -> dict[str, int]:
+    return {
+        "E1tP": imported,
+        "E2tP": 0,
+        "E3tP": 0,
+        "E1tN": exported,
+        "E2tN": 0,
+        "E3tN": 0,
+        "E1dP": 120,
+        "E1dN": 3,
+    }
+
+
+def test_power_and_interval_energy() -> None:
+    """Test the power between counter steps and its decay without steps."""
+    deltas = EnergyDeltas()
+    deltas.update(_sample(1000), 0, START, START)
+    assert deltas.power(export=False) is None
+    assert deltas.today(export=False) == 1.2  # noqa: PLR2004
+    assert deltas.today(export=True) == 0.03  # noqa: PLR2004
+
+    # The first step has no step before it to measure the power from
+    deltas.update(_sample(1001), 5, START, START)
+    assert deltas.interval_energy(export=False) == 10  # noqa: PLR2004
+    assert deltas.power(export=False) is None
+
+    deltas.update(_sample(1001), 10, START, START)
+    assert deltas.interval_energy(export=False) == 0
+    deltas.update(_sample(1002), 41, START, START)
+    # 10 Wh in 36 s
+    assert deltas.power(export=False) == 1000  # noqa: PLR2004
+    # No step for 72 s, at most 10 Wh went through since the last one
+    deltas.update(_sample(1002), 113, START, START)
+    assert deltas.power(export=False) == 500  # noqa: PLR2004
+    assert deltas.power(export=True) is None
+    assert deltas.today(export=False) == pytest.approx(1.22)
+
+
+def test_reset_and_glitch() -> None:
+    """Test that resets count from zero and implausible steps are ignored."""
+    deltas = EnergyDeltas()
+    deltas.update(_sample(1000), 0, START, START)
+    # The counter was reset and counted 20 Wh since
+    deltas.update(_sample(2), 5, START, START)
+    assert deltas.interval_energy(export=False) == 20  # noqa: PLR2004
+    # 100 kWh in 5 s
+    deltas.update(_sample(10002), 10, START, START)
+    assert deltas.interval_energy(export=False) == 0
+    deltas.update(_sample(10003), 15, START, START)
+    assert deltas.interval_energy(export=False) == 10  # noqa: PLR2004
+    assert deltas.today(export=False) == pytest.approx(1.23)
+
+
+def test_day_rollover_and_clock_skew() -> None:
+    """Test that the days follow the meter clock unless it is off."""
+    deltas = EnergyDeltas()
+    deltas.update(_sample(1000), 0, START, START)
+    midnight = START + timedelta(minutes=3)
+    deltas.update(_sample(1001), 180, midnight, midnight)
+    assert deltas.today(export=False) == 0.01  # noqa: PLR2004
+
+    # A meter clock an hour behind does not move the day back
+    skewed = EnergyDeltas()
+    skewed.update(_sample(1000), 0, midnight, midnight - timedelta(hours=1))
+    assert skewed.today(export=False) == 0
+    skewed.update(_sample(1001), 5, midnight, midnight - timedelta(hours=1))
+    assert skewed.today(export=False) == 0.01  # noqa: PLR2004
@@ -0,0 +1,65 @@
+"""Tests for the ring of phase readings and the demand guard."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from custom_components.evmate.demand import DemandGuard, PhaseRing
+
+START = datetime(2025, 4, 6, 17, 45, tzinfo=UTC)
+
+
+def _readings(power: float) -> dict[str, float]:
+    return {"P1": power, "P2": 0, "P3": 0, "I1": power / 230, "U1": 230}
+
+
+def test_rolling_averages() -> None:
+    """Test that the windows only average the samples within them."""
+    ring = PhaseRing()
+    for second in range(0, 600, 10):
+        ring.add(_readings(1000 if second < 550 else 4000), second)  # noqa: PLR2004
+
+    # The last minute holds 540..590, the 5 minutes 300..590
+    assert ring.average("P1", 60) == 3500  # noqa: PLR2004
+    assert ring.power(300) == pytest.approx((25 * 1000 + 5 * 4000) / 30)
+    assert ring.power(900) == pytest.approx((55 * 1000 + 5 * 4000) / 60)
+    assert ring.average("U1", 900) == 230  # noqa: PLR2004
+    assert ring.average("I2", 900) == 0
+
+
+def test_ring_capacity() -> None:
+    """Test that overwritten samples leave the windows."""
+    ring = PhaseRing(capacity=4)
+    for second in range(10):
+        ring.add(_readings(second * 100), second)
+
+    assert len(ring) == 4  # noqa: PLR2004
+    assert ring.power(900) == (600 + 700 + 800 + 900) / 4
+    assert ring.power(60) == (600 + 700 + 800 + 900) / 4
+
+
+def test_demand_projection() -> None:
+    """Test the projection of the quarter hour against the limit."""
+    guard = DemandGuard()
+    values = {**_readings(20_000), "in,MAX-E15-KWH": 4}
+    # 20 kW for the quarter would be 5 kWh
+    assert guard.add(values, 0, START) is True
+    assert guard.add(values, 300, START + timedelta(minutes=5)) is None
+    assert guard.energy == pytest.approx(5 / 3)
+    assert guard.projected_energy == 5  # noqa: PLR2004
+    # 7/3 kWh are left at 20 kW
+    assert guard.time_to_limit == 420  # noqa: PLR2004
+
+    values = {**_readings(0), "in,MAX-E15-KWH": 4}
+    # Once the load is off the projection falls back below the limit
+    crossed = [
+        guard.add(values, second, START + timedelta(seconds=second))
+        for second in range(310, 370, 10)
+    ]
+    assert crossed == [False, None, None, None, None, None]
+    assert guard.projected_energy == pytest.approx(5 / 3 + 20 / 360, abs=0.001)
+    assert guard.time_to_limit is None
+
+    # The next quarter starts from zero
+    guard.add(values, 900, START + timedelta(minutes=15))
+    assert guard.energy == 0
@@ -0,0 +1,94 @@
+"""Tests for the diagnostics and the slow refresh log."""
+
+import logging
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.const import CONF_SLOW_REFRESH, DOMAIN
+from custom_components.evmate.diagnostics import async_get_config_entry_diagnostics
+from tests.fake_meter import FakeMeter
+
+
+@pytest.mark.asyncio
+async def test_diagnostics(hass, socket_enabled, caplog) -> None:  # noqa: ANN001, ARG001
+    """Test the request metrics in the diagnostics and the slow refresh log."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+        options={CONF_SLOW_REFRESH: 0.000001},
+    )
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        meter.payloads["updateData"]["U1"] = 240
+        monotonic.return_value = 1010
+        with caplog.at_level(logging.WARNING):
+            await entry.runtime_data.coordinator.async_refresh()
+    assert "Refreshing Garage took" in caplog.text
+    assert "updateData" in caplog.text
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["entry"]["data"][CONF_IP_ADDRESS] == "**REDACTED**"
+    assert diagnostics["data"]["ID"] == "**REDACTED**"
+    assert diagnostics["entry"]["title"] == "**REDACTED**"
+    for key in ("STATIC_IP", "GATEWAY", "DNS", "MASK"):
+        assert diagnostics["data"][key] == "**REDACTED**"
+    assert list(diagnostics["fleet"]["latencies"]) == [entry.entry_id]
+    assert diagnostics["coordinator"]["last_fan_out"] is not None
+    assert diagnostics["coordinator"]["stale_endpoints"] == []
+    assert diagnostics["circuit"]["state"] == "closed"
+    data = diagnostics["endpoints"]["updateData"]
+    assert data["requests"] == meter.requests["updateData"]
+    assert data["failures"] == 0
+    assert data["decodes"] == 2  # noqa: PLR2004
+    assert data["bytes_received"] > 0
+    assert data["latency_p50"] == 0.05  # noqa: PLR2004
+    assert diagnostics["fleet"]["meters"] == 1
+
+    state = hass.states.get("sensor.garage_failed_requests_in_a_row")
+    assert state.state == "0"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_redact_failed_requests(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that the errors of failed requests do not reveal the address."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data.coordinator
+
+    await meter.stop()
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1e6
+        await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert "127.0.0.1" in repr(coordinator.last_exception)
+    assert "127.0.0.1" not in repr(diagnostics)
+    assert "**REDACTED**" in diagnostics["coordinator"]["last_exception"]
+    assert "**REDACTED**" in diagnostics["endpoints"]["updateData"]["last_error"]
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,127 @@
+"""Tests for the discovery of the meters and the config flow."""
+
+from ipaddress import IPv4Network
+from unittest.mock import patch
+
+import pytest
+from homeassistant import config_entries
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.config_flow import CONF_METER
+from custom_components.evmate.const import DOMAIN
+from custom_components.evmate.discovery import DiscoveredMeter, async_scan
+from tests.fake_meter import FakeMeter
+
+
+@pytest.mark.asyncio
+async def test_scan(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that a meter is fingerprinted and an address without one skipped."""
+    session = async_get_clientsession(hass)
+    meter = FakeMeter()
+    port = await meter.start()
+    # The tests may only connect to 127.0.0.1, a second meter is stopped
+    stopped = FakeMeter()
+    stopped_port = await stopped.start()
+    await stopped.stop()
+
+    meters = await async_scan(session, [IPv4Network("127.0.0.1/32")], port)
+    assert meters == [DiscoveredMeter("127.0.0.1", port, "12345", "2.120")]
+    assert meter.requests == {"updateSetting": 1}
+    assert await async_scan(session, [IPv4Network("127.0.0.1/32")], stopped_port) == []
+    await meter.stop()
+
+
+@pytest.mark.asyncio
+async def test_discovery_flow(hass) -> None:  # noqa: ANN001
+    """Test that a discovered meter is set up under its ID."""
+    MockConfigEntry(domain=DOMAIN, unique_id="1").add_to_hass(hass)
+    meters = [
+        DiscoveredMeter("192.168.0.15", 8000, "1", "2.120"),
+        DiscoveredMeter("192.168.0.16", 8000, "2", "2.120"),
+    ]
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] is FlowResultType.MENU
+
+    with (
+        patch(
+            "custom_components.evmate.config_flow.async_discover", return_value=meters
+        ),
+        patch("custom_components.evmate.async_setup_entry", return_value=True),
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"next_step_id": "discover"}
+        )
+        # The configured meter is not offered again
+        options = result["data_schema"].schema[CONF_METER].config["options"]
+        assert [option["value"] for option in options] == ["2"]
+
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_METER: "2"}
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == "2"
+    assert result["data"] == {CONF_IP_ADDRESS: "192.168.0.16", CONF_PORT: 8000}
+
+
+@pytest.mark.asyncio
+async def test_manual_flow(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that a meter entered by address is fingerprinted with one request."""
+    aioclient_mock.get(
+        "http://192.168.0.15:8000/updateSetting", json={"ID": 12345, "U1": 235}
+    )
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "manual"}
+    )
+    with patch("custom_components.evmate.async_setup_entry", return_value=True):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_IP_ADDRESS: "192.168.0.15", CONF_PORT: "8000"}
+        )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert result["result"].unique_id == "12345"
+    assert aioclient_mock.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_flows_skip_meter_keyed_by_address(hass, aioclient_mock) -> None:  # noqa: ANN001
+    """Test that a meter added by its address is not added again by its ID."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="192-168-0-15",
+        data={CONF_IP_ADDRESS: "192.168.0.15", CONF_PORT: 8000},
+    ).add_to_hass(hass)
+    meters = [DiscoveredMeter("192.168.0.15", 8000, "12345", "2.120")]
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    with patch(
+        "custom_components.evmate.config_flow.async_discover", return_value=meters
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"next_step_id": "discover"}
+        )
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "no_devices_found"
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": "manual"}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_IP_ADDRESS: "192.168.0.15", CONF_PORT: "8000"}
+    )
+    assert result["type"] is FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert aioclient_mock.call_count == 0
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 1
@@ -0,0 +1,73 @@
+"""Tests for the devices and entities of the chargers."""
+
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.evmate.const import DOMAIN
+from tests.fake_meter import FakeMeter
+
+
+def _set_evse_count(meter: FakeMeter, count: int) -> None:
+    meter.payloads["updateEvse"] = {
+        "NUMBER_OF_EVSE": count,
+        "EV_STATE": [2] * count,
+        "EV_COMM_ERR": [0] * count,
+        "ACTUAL_CONFIG_CURRENT": [0] * count,
+        "ACTUAL_OUTPUT_CURRENT": list(range(10, 10 + count)),
+    }
+
+
+@pytest.mark.asyncio
+async def test_chargers_follow_number_of_evse(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that chargers are added and removed without a reload."""
+    meter = FakeMeter()
+    _set_evse_count(meter, 2)
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+    )
+    entry.add_to_hass(hass)
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+
+    def current(evse: int) -> str | None:
+        entity_id = entity_registry.async_get_entity_id(
+            "sensor", DOMAIN, f"meter-evse{evse}-ACTUAL_OUTPUT_CURRENT"
+        )
+        return None if entity_id is None else hass.states.get(entity_id).state
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        assert (current(1), current(2), current(3)) == ("10", "11", None)
+        device = device_registry.async_get_device(identifiers={(DOMAIN, "meter-evse2")})
+        assert device.via_device_id == (
+            device_registry.async_get_device(identifiers={(DOMAIN, "meter")}).id
+        )
+
+        _set_evse_count(meter, 1)
+        monotonic.return_value = 1100
+        await entry.runtime_data.coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert (current(1), current(2)) == ("10", None)
+        assert not device_registry.async_get_device(
+            identifiers={(DOMAIN, "meter-evse2")}
+        )
+
+        _set_evse_count(meter, 3)
+        monotonic.return_value = 1200
+        await entry.runtime_data.coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert (current(1), current(2), current(3)) == ("10", "11", "12")
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
@@ -0,0 +1,112 @@
+"""Tests for the shared scheduling of the meters."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.evmate.api import IntegrationEvmateApiClient
+from custom_components.evmate.const import DOMAIN
+from custom_components.evmate.fleet import EVMateFleet, async_get_fleet
+from tests.fake_meter import FakeMeter
+
+
+def _coordinator(title: str, latency: float | None = None) -> MagicMock:
+    return MagicMock(
+        config_entry=MockConfigEntry(domain=DOMAIN, title=title),
+        refresh_interval=timedelta(seconds=5),
+        last_update_latency=latency,
+        async_refresh=AsyncMock(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_refreshes_stay_on_their_phase(hass) -> None:  # noqa: ANN001
+    """Test that every meter is refreshed on its own random phase."""
+    fleet = EVMateFleet(hass)
+    first = _coordinator("first")
+    second = _coordinator("second")
+    now = dt_util.utcnow()
+
+    with patch("custom_components.evmate.fleet.random.uniform", side_effect=[1, 3]):
+        fleet.async_add("first", first)
+        fleet.async_add("second", second)
+
+    async_fire_time_changed(hass, now + timedelta(seconds=1.5))
+    await hass.async_block_till_done()
+    assert first.async_refresh.await_count == 1
+    assert second.async_refresh.await_count == 0
+
+    async_fire_time_changed(hass, now + timedelta(seconds=3.5))
+    await hass.async_block_till_done()
+    assert second.async_refresh.await_count == 1
+
+    async_fire_time_changed(hass, now + timedelta(seconds=6.5))
+    await hass.async_block_till_done()
+    assert first.async_refresh.await_count == 2  # noqa: PLR2004
+    assert second.async_refresh.await_count == 1
+
+    await fleet.async_remove("first")
+    await fleet.async_remove("second")
+    assert len(fleet) == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_limited_across_meters(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that the shared limiter caps the requests in flight."""
+    meter = FakeMeter(latency=0.02)
+    port = await meter.start()
+    limiter = asyncio.Semaphore(2)
+    clients = [
+        IntegrationEvmateApiClient(
+            "127.0.0.1", port, session=async_get_clientsession(hass), limiter=limiter
+        )
+        for _ in range(6)
+    ]
+
+    results = await asyncio.gather(*(client.async_get_data() for client in clients))
+    await meter.stop()
+
+    assert all(results)
+    assert sum(meter.requests.values()) == 18  # noqa: PLR2004
+    assert meter.peak_in_flight == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_latencies_and_shared_pool(hass) -> None:  # noqa: ANN001
+    """Test the latency report and that the last meter closes the pool."""
+    fleet = async_get_fleet(hass)
+    assert async_get_fleet(hass) is fleet
+    session = fleet.session
+    fleet.async_add("fast", _coordinator("192.168.0.15", 0.05))
+    fleet.async_add("slow", _coordinator("192.168.0.16", 2.5))
+    fleet.async_add("new", _coordinator("192.168.0.17"))
+
+    assert list(fleet.latencies().items()) == [("slow", 2.5), ("fast", 0.05)]
+
+    await fleet.async_remove("fast")
+    await fleet.async_remove("slow")
+    assert not session.closed
+    await fleet.async_remove("new")
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_pool_closed_when_hass_closes(hass) -> None:  # noqa: ANN001
+    """Test that the pool is closed when Home Assistant closes."""
+    fleet = async_get_fleet(hass)
+    session = fleet.session
+    fleet.async_add("meter", _coordinator("192.168.0.15"))
+
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    await hass.async_block_till_done()
+
+    assert session.closed
@@ -0,0 +1,62 @@
+"""Tests for the energy history."""
+
+import json
+from datetime import date
+from pathlib import Path
+
+from custom_components.evmate.history import EnergyHistory, day_key, month_key
+
+
+def _load_update_data() -> dict:
+    fixtures_path = Path(__file__).parent / "fixtures"
+    with Path.open(fixtures_path / "update_data.json") as file:
+        return json.load(file)
+
+
+def test_daily_history() -> None:
+    """Test the daily history with data from the update_data.json fixture."""
+    history = EnergyHistory(day_key)
+    assert history.update(_load_update_data()["D"]) == 31  # noqa: PLR2004
+
+    assert history.last_key == date(2025, 4, 5).toordinal()
+    assert history.totals(
+        date(2025, 4, 1).toordinal(), date(2025, 4, 3).toordinal()
+    ) == (1175 + 1206, 103 + 103)
+    assert list(history.entries(date(2025, 4, 5).toordinal())) == [
+        (date(2025, 4, 5).toordinal(), 1311, 88)
+    ]
+    assert history.totals(
+        date(2024, 1, 1).toordinal(), date(2024, 2, 1).toordinal()
+    ) == (
+        0,
+        0,
+    )
+
+
+def test_incremental_update() -> None:
+    """Test that only new or changed buckets are merged."""
+    entries = _load_update_data()["M"]
+    history = EnergyHistory(month_key)
+    history.update(entries)
+    total = history.totals()
+
+    assert history.update(entries) == 0
+
+    # The rolling window moves by a month and the current month grows
+    entries = [*entries[1:-1], "4/25:[8600,566]", "5/25:[10,0]"]
+    assert history.update(entries) == 2  # noqa: PLR2004
+    assert len(history) == 25  # noqa: PLR2004
+    assert history.totals() == (total[0] + 7 + 10, total[1])
+    assert history.totals(month_key("4/25")) == (8610, 566)
+
+
+def test_history_persistence() -> None:
+    """Test that the history survives a round trip through storage."""
+    history = EnergyHistory(day_key)
+    history.update(_load_update_data()["D"])
+
+    restored = EnergyHistory(day_key)
+    restored.load(json.loads(json.dumps(history.as_dict())))
+
+    assert list(restored.entries()) == list(history.entries())
+    assert restored.totals() == history.totals()
@@ -1,10 +1,87 @@
 """Test component setup."""
 
+import asyncio
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
 from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.evmate.const import DOMAIN
+from custom_components.evmate.const import CONF_STREAMING, DOMAIN
+from tests.fake_meter import FakeMeter, load_fixtures
 
 
 async def test_async_setup(hass) -> None:  # noqa: ANN001
     """Test the component gets setup."""
     assert await async_setup_component(hass, DOMAIN, {}) is True
+
+
+@pytest.mark.asyncio
+async def test_setup_from_snapshot(hass, hass_storage, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that the setup does not wait for a meter that has a snapshot."""
+    meter = FakeMeter(latency=0.2)
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+    )
+    entry.add_to_hass(hass)
+    payloads = load_fixtures()
+    payloads["updateData"]["U1"] = 229
+    hass_storage[f"{DOMAIN}.{entry.entry_id}.snapshot"] = {
+        "version": 1,
+        "key": f"{DOMAIN}.{entry.entry_id}.snapshot",
+        "data": {"payloads": payloads},
+    }
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = entry.runtime_data.coordinator
+    assert coordinator.restored
+    assert hass.states.get("sensor.garage_voltage_l1").state == "229"
+    # The entities of every kind are flagged until the meter answered
+    for entity_id in ("sensor.garage_voltage_l1", "sensor.garage_peak_15_minute_power"):
+        assert hass.states.get(entity_id).attributes["restored"] is True
+
+    # The meter is read in the background
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert not coordinator.restored
+    assert hass.states.get("sensor.garage_voltage_l1").state == "235"
+    for entity_id in ("sensor.garage_voltage_l1", "sensor.garage_peak_15_minute_power"):
+        assert "restored" not in hass.states.get(entity_id).attributes
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
+
+
+@pytest.mark.asyncio
+async def test_reload_on_options_change(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that an options change stops everything the old setup started."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+        options={CONF_STREAMING: True},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    old = entry.runtime_data.coordinator
+    await asyncio.sleep(0.1)
+    assert "updateData" in old._streamed  # noqa: SLF001
+
+    hass.config_entries.async_update_entry(entry, options={CONF_STREAMING: False})
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    assert entry.runtime_data.coordinator is not old
+    assert len(entry.update_listeners) == 1
+    # The stream of the old setup was cancelled
+    assert not old._streamed  # noqa: SLF001
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
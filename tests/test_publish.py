@@ -0,0 +1,51 @@
+"""Tests for the aggregation of the measurements before they are written."""
+
+import pytest
+
+from custom_components.evmate.const import CONF_PUBLISH_INTERVALS
+from custom_components.evmate.publish import PublishWindow, publish_window
+from custom_components.evmate.schema import SENSOR_TYPES
+
+
+def _description(key: str):  # noqa: ANN202
+    return next(description for description in SENSOR_TYPES if description.key == key)
+
+
+@pytest.mark.parametrize(
+    ("aggregate", "expected"), [("mean", 232.33), ("min", 231), ("max", 234)]
+)
+def test_window(aggregate: str, expected: float) -> None:
+    """Test that a window is written as its aggregate once it is due."""
+    window = PublishWindow(10, 5, aggregate)
+    assert window.add(230, 0)
+    assert window.value == 230  # noqa: PLR2004
+    assert not window.add(232, 4)
+    assert not window.add(231, 8)
+    assert window.add(234, 12)
+    assert window.value == expected
+    assert window.written_at == 12  # noqa: PLR2004
+
+
+def test_significant_change_written_at_once() -> None:
+    """Test that a jump past the threshold is not held back."""
+    window = PublishWindow(60, 5)
+    window.add(230, 0)
+    assert not window.add(233, 1)
+    assert window.add(224, 2)
+    assert window.value == 224  # noqa: PLR2004
+    # The window starts over after the write
+    assert not window.add(226, 3)
+    assert window.add(None, 4)
+    assert window.value is None
+
+
+def test_publish_window_options() -> None:
+    """Test which sensors get a window from the options."""
+    options = {CONF_PUBLISH_INTERVALS["voltage"]: 30}
+    window = publish_window(options, _description("U1"))
+    assert (window.interval, window.threshold, window.aggregate) == (30, 5, "mean")
+    assert publish_window(options, _description("I1")) is None
+    # Energy counters are never aggregated
+    options = {CONF_PUBLISH_INTERVALS["power"]: 30}
+    assert publish_window(options, _description("P1")) is not None
+    assert publish_window(options, _description("E1tP")) is None
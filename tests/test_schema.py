@@ -0,0 +1,69 @@
+"""Tests for the key schema."""
+
+import json
+from pathlib import Path
+
+from custom_components.evmate.schema import (
+    BINARY_SENSOR_TYPES,
+    KNOWN_KEYS,
+    SENSOR_TYPES,
+    evse_value,
+    extract_values,
+)
+
+
+def _fixture(name: str) -> dict:
+    with Path.open(Path(__file__).parent / "fixtures" / name) as file:
+        return json.load(file)
+
+
+def test_fixture_keys_are_known() -> None:
+    """Test that the schema covers every key the meter delivers."""
+    for name in ("update_setting.json", "update_data.json", "update_evse.json"):
+        assert _fixture(name).keys() <= KNOWN_KEYS
+
+
+def test_keys_are_declared_once() -> None:
+    """Test that no key is described twice."""
+    keys = [description.key for description in (*SENSOR_TYPES, *BINARY_SENSOR_TYPES)]
+    assert len(keys) == len(set(keys))
+    assert next(d for d in SENSOR_TYPES if d.key == "U2").name == "Voltage L2"
+
+
+def test_extract_values() -> None:
+    """Test the scaling and conversion of the raw values."""
+    values = extract_values(
+        {
+            **_fixture("update_setting.json"),
+            **_fixture("update_data.json"),
+            **_fixture("update_evse.json"),
+        }
+    )
+
+    assert values["U1"] == 235  # noqa: PLR2004
+    assert values["I2"] == 0.64  # noqa: PLR2004
+    assert values["E2tP"] == 1192.37  # noqa: PLR2004
+    assert values["in,MAX-P-KW"] == 40  # noqa: PLR2004
+    assert values["ACTUAL_OUTPUT_CURRENT"] == (15,)
+    assert values["EV_COMM_ERR"] == (False,)
+    assert values["inp,EVSE2"] == 10  # noqa: PLR2004
+    assert values["sw,AUTOMATIC UPDATE"] is True
+    assert values["RELAY"] is False
+    assert "Es" not in values
+
+
+def test_extract_missing_and_invalid_values() -> None:
+    """Test that missing and malformed values become None."""
+    assert extract_values({"I1": "n/a", "EV_STATE": []}, ["I1", "EV_STATE", "U3"]) == {
+        "I1": None,
+        "EV_STATE": (),
+        "U3": None,
+    }
+
+
+def test_evse_value() -> None:
+    """Test the indexed access to the values of one charger."""
+    values = {"EV_STATE": (2, 3), "inp,EVSE2": 10}
+    assert evse_value(values, "EV_STATE", 1) == 3  # noqa: PLR2004
+    assert evse_value(values, "EV_STATE", 2) is None
+    assert evse_value(values, "inp,EVSE2", None) == 10  # noqa: PLR2004
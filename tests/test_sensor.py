@@ -2,12 +2,13 @@
 
 import json
 from pathlib import Path
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from custom_components.evmate.const import SENSOR_TYPES
 from custom_components.evmate.coordinator import EVMateDataUpdateCoordinator
+from custom_components.evmate.publish import PublishWindow
+from custom_components.evmate.schema import SENSOR_TYPES, extract_values
 from custom_components.evmate.sensor import EVMateSensor
 
 
@@ -31,6 +32,7 @@ async def _check_sensor_value(key: str, expected_state: str) -> None:
     # Mock the coordinator
     mock_coordinator = AsyncMock(spec=EVMateDataUpdateCoordinator)
     mock_coordinator.data = update_data
+    mock_coordinator.values = extract_values(update_data)
 
     # Find the right EntityDescription
     description = next(t for t in SENSOR_TYPES if t.key == key)
@@ -43,3 +45,57 @@ async def _check_sensor_value(key: str, expected_state: str) -> None:
 
     # Assert the state and attributes for the first delivery in the fixture
     assert sensor.state == expected_state
+    # Entities are pushed by the coordinator and never poll on their own
+    assert sensor.should_poll is False
+
+
+@pytest.mark.asyncio
+async def test_sensor_skips_unchanged_keys() -> None:
+    """Test that a sensor is only written when its key changed."""
+    mock_coordinator = AsyncMock(spec=EVMateDataUpdateCoordinator)
+    mock_coordinator.data = {"U1": 235}
+    mock_coordinator.values = {"U1": 235}
+    mock_coordinator.last_update_success = True
+    description = next(t for t in SENSOR_TYPES if t.key == "U1")
+    sensor = EVMateSensor("test", description, mock_coordinator)
+
+    with patch.object(sensor, "async_write_ha_state") as write:
+        mock_coordinator.changed_keys = {"U2"}
+        sensor._handle_coordinator_update()  # noqa: SLF001
+        assert write.call_count == 0
+
+        mock_coordinator.changed_keys = {"U1", "U2"}
+        sensor._handle_coordinator_update()  # noqa: SLF001
+        assert write.call_count == 1
+
+        mock_coordinator.changed_keys = set()
+        mock_coordinator.last_update_success = False
+        sensor._handle_coordinator_update()  # noqa: SLF001
+        assert write.call_count == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_sensor_writes_aggregated_window() -> None:
+    """Test that a sensor with a window samples every payload but writes less."""
+    mock_coordinator = AsyncMock(spec=EVMateDataUpdateCoordinator)
+    mock_coordinator.values = {"U1": 230}
+    mock_coordinator.received = {"updateData": 0}
+    mock_coordinator.last_update_success = True
+    mock_coordinator.stale_endpoints = frozenset()
+    description = next(t for t in SENSOR_TYPES if t.key == "U1")
+    sensor = EVMateSensor(
+        "test", description, mock_coordinator, window=PublishWindow(10, 5)
+    )
+
+    with patch.object(sensor, "async_write_ha_state") as write:
+        for now, value in enumerate((230, 232, 231, 233, 232), start=1):
+            mock_coordinator.values = {"U1": value}
+            mock_coordinator.received = {"updateData": now * 3}
+            sensor._handle_coordinator_update()  # noqa: SLF001
+        # The first sample and the mean of the 12 s after it
+        assert write.call_count == 2  # noqa: PLR2004
+        assert sensor.native_value == 232  # noqa: PLR2004
+
+        # Another endpoint changed, no new sample
+        sensor._handle_coordinator_update()  # noqa: SLF001
+        assert write.call_count == 2  # noqa: PLR2004
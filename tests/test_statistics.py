@@ -0,0 +1,101 @@
+"""Tests for the long-term statistics import."""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.evmate.decoder import decode_profile
+from custom_components.evmate.history import EnergyHistory, day_key, month_key
+from custom_components.evmate.statistics import EVMateStatisticsImporter
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations) -> None:  # noqa: ANN001, ARG001
+    """Enable custom integrations with the recorder set up before hass."""
+    return
+
+
+@pytest.mark.asyncio
+async def test_import_statistics(hass) -> None:  # noqa: ANN001
+    """Test the import of the history from the update_data.json fixture."""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    with Path.open(fixtures_path / "update_data.json") as file:
+        update_data = json.load(file)
+    history = MagicMock(daily=EnergyHistory(day_key), monthly=EnergyHistory(month_key))
+    history.daily.update(update_data["D"])
+    history.monthly.update(update_data["M"])
+
+    importer = EVMateStatisticsImporter(hass, "12345", "IoTMeter")
+    await importer.async_import(decode_profile(update_data), history)
+    await async_wait_recording_done(hass)
+
+    # A second run with the same data does not add anything
+    await importer.async_import(decode_profile(update_data), history)
+    await async_wait_recording_done(hass)
+
+    stats = await hass.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(datetime(2023, 1, 1)),  # noqa: DTZ001
+        None,
+        {
+            "evmate:12345_hourly_import",
+            "evmate:12345_daily_import",
+            "evmate:12345_monthly_export",
+        },
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+
+    # 24 hours of which the last one is still counted
+    assert len(stats["evmate:12345_hourly_import"]) == 23  # noqa: PLR2004
+    assert stats["evmate:12345_hourly_import"][-1]["state"] == pytest.approx(0.651)
+    # The newest day is the one still being counted
+    assert len(stats["evmate:12345_daily_import"]) == 30  # noqa: PLR2004
+    assert stats["evmate:12345_daily_import"][-1]["sum"] == pytest.approx(
+        sum(int(entry.split("[")[1].split(",")[0]) for entry in update_data["D"][:-1])
+        / 100
+    )
+    # The month of the meter time (April 2025) is not closed yet
+    assert len(stats["evmate:12345_monthly_export"]) == 23  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_import_statistics_slug_id(hass) -> None:  # noqa: ANN001
+    """Test a meter keyed by its slugified address and a failing import."""
+    fixtures_path = Path(__file__).parent / "fixtures"
+    with Path.open(fixtures_path / "update_data.json") as file:
+        update_data = json.load(file)
+    history = MagicMock(daily=EnergyHistory(day_key), monthly=EnergyHistory(month_key))
+    importer = EVMateStatisticsImporter(hass, "192-168-0-15", "IoTMeter")
+
+    # Buckets that could not be imported are tried again on the next run
+    with patch(
+        "custom_components.evmate.statistics.async_add_external_statistics",
+        side_effect=HomeAssistantError("Invalid statistic_id"),
+    ):
+        await importer.async_import(decode_profile(update_data), history)
+    await importer.async_import(decode_profile(update_data), history)
+    await async_wait_recording_done(hass)
+
+    stats = await hass.async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.as_utc(datetime(2023, 1, 1)),  # noqa: DTZ001
+        None,
+        {"evmate:192_168_0_15_hourly_import"},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    assert len(stats["evmate:192_168_0_15_hourly_import"]) == 23  # noqa: PLR2004
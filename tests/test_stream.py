@@ -0,0 +1,117 @@
+"""Tests for the streaming mode."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.evmate.api import (
+    IntegrationEvmateApiClient,
+    IntegrationEvmateApiClientCircuitOpenError,
+)
+from custom_components.evmate.stream import EVMateStreamer
+
+from .fake_meter import FakeMeter
+
+
+@pytest.mark.asyncio
+async def test_chunked_stream(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that every pushed payload of a chunked answer is yielded."""
+    meter = FakeMeter(stream_period=0.01)
+    port = await meter.start()
+    api = IntegrationEvmateApiClient(
+        "127.0.0.1", port, session=async_get_clientsession(hass)
+    )
+
+    payloads = []
+    async for payload in api.async_stream("updateData", min_interval=0):
+        payloads.append(payload)
+        meter.payloads["updateData"]["P1"] = len(payloads)
+        if len(payloads) == 3:  # noqa: PLR2004
+            break
+    await meter.stop()
+
+    assert meter.requests["updateData"] == 1
+    assert payloads[0]["P1"] == 0
+    assert payloads[2]["P1"] == 2  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_polled_stream(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that a plain answer is requested again on the same session."""
+    meter = FakeMeter()
+    port = await meter.start()
+    api = IntegrationEvmateApiClient(
+        "127.0.0.1", port, session=async_get_clientsession(hass)
+    )
+
+    payloads = []
+    async for payload in api.async_stream("updateData", min_interval=0):
+        payloads.append(payload)
+        if len(payloads) == 3:  # noqa: PLR2004
+            break
+    await meter.stop()
+
+    assert meter.requests["updateData"] == 3  # noqa: PLR2004
+    # Unchanged bodies are not parsed again
+    assert payloads[2] is payloads[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_limited_and_guarded(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that stream requests take a limiter slot and respect the breaker."""
+    meter = FakeMeter()
+    port = await meter.start()
+    limiter = asyncio.Semaphore(1)
+    api = IntegrationEvmateApiClient(
+        "127.0.0.1", port, session=async_get_clientsession(hass), limiter=limiter
+    )
+    stream = api.async_stream("updateData", min_interval=0)
+
+    # No request while another client holds the only slot
+    async with limiter:
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        assert meter.requests["updateData"] == 0
+    await pending
+    # The slot is not held while the consumer has the payload
+    assert not limiter.locked()
+
+    for _ in range(3):
+        api.breaker.record_failure(time.monotonic())
+    with pytest.raises(IntegrationEvmateApiClientCircuitOpenError):
+        await anext(stream)
+    await meter.stop()
+
+    assert meter.requests["updateData"] == 1
+
+
+@pytest.mark.asyncio
+async def test_streamer_falls_back_to_polling(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that a failing stream hands the endpoint back to polling."""
+    meter = FakeMeter(stream_period=0.01)
+    port = await meter.start()
+    api = IntegrationEvmateApiClient(
+        "127.0.0.1", port, session=async_get_clientsession(hass)
+    )
+    pushed = asyncio.Event()
+    fell_back = asyncio.Event()
+    coordinator = MagicMock()
+    coordinator.async_set_endpoint_payload.side_effect = lambda *_: pushed.set()
+    coordinator.async_set_streaming.side_effect = (
+        lambda _, streaming: None if streaming else fell_back.set()
+    )
+    streamer = EVMateStreamer(api, coordinator)
+
+    task = hass.async_create_background_task(streamer.async_run(), "stream")
+    await pushed.wait()
+    coordinator.async_set_streaming.assert_called_with("updateData", streaming=True)
+
+    await meter.stop()
+    await fell_back.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
@@ -0,0 +1,145 @@
+"""Tests for writing the settings of the meter."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.components.number import DOMAIN as NUMBER_DOMAIN
+from homeassistant.components.number import SERVICE_SET_VALUE
+from homeassistant.components.switch import DOMAIN as SWITCH_DOMAIN
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    CONF_IP_ADDRESS,
+    CONF_PORT,
+    SERVICE_TURN_ON,
+)
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.evmate.api import IntegrationEvmateApiClientCommunicationError
+from custom_components.evmate.const import DOMAIN, ENDPOINT_SETTING
+from custom_components.evmate.write import EVMateWriter
+from tests.fake_meter import FakeMeter
+
+
+@pytest.mark.asyncio
+async def test_writes_are_coalesced(hass) -> None:  # noqa: ANN001
+    """Test that a burst of changes becomes one write and one re-read."""
+    client = AsyncMock()
+    coordinator = MagicMock(async_refresh_endpoints=AsyncMock())
+    writer = EVMateWriter(hass, client, coordinator)
+
+    await writer.async_set("in,MAX-CURRENT-FROM-GRID-A", "20")
+    await writer.async_set("sw,ENABLE CHARGING", "1")
+    await writer.async_set("in,MAX-CURRENT-FROM-GRID-A", "22")
+    assert coordinator.async_set_optimistic.call_count == 3  # noqa: PLR2004
+    client.async_write.assert_not_called()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+    await hass.async_block_till_done()
+
+    client.async_write.assert_awaited_once_with(
+        {"in,MAX-CURRENT-FROM-GRID-A": "22", "sw,ENABLE CHARGING": "1"}
+    )
+    coordinator.async_refresh_endpoints.assert_awaited_once_with([ENDPOINT_SETTING])
+    await writer.async_shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_read_back(hass) -> None:  # noqa: ANN001
+    """Test that a failed write re-reads the settings the meter has."""
+    client = AsyncMock()
+    client.async_write.side_effect = IntegrationEvmateApiClientCommunicationError
+    coordinator = MagicMock(async_refresh_endpoints=AsyncMock())
+    writer = EVMateWriter(hass, client, coordinator)
+
+    await writer.async_set("sw,ENABLE CHARGING", "1")
+    await writer.async_flush()
+    await writer.async_shutdown()
+
+    coordinator.async_refresh_endpoints.assert_awaited_once_with([ENDPOINT_SETTING])
+
+
+@pytest.mark.asyncio
+async def test_write_through_entities(hass, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test the optimistic state and that only the settings are re-read."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+    )
+    entry.add_to_hass(hass)
+    entity_registry = er.async_get(hass)
+
+    with patch("custom_components.evmate.coordinator.time.monotonic") as monotonic:
+        monotonic.return_value = 1000
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        switch = entity_registry.async_get_entity_id(
+            SWITCH_DOMAIN, DOMAIN, "meter-sw_ENABLE_CHARGING"
+        )
+        number = entity_registry.async_get_entity_id(
+            NUMBER_DOMAIN, DOMAIN, "meter-evse1-inp_EVSE"
+        )
+        assert hass.states.get(switch).state == "off"
+        assert hass.states.get(number).state == "5"
+        requests = meter.requests.copy()
+
+        await hass.services.async_call(
+            SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: switch}, blocking=True
+        )
+        for value in (8, 12, 16):
+            await hass.services.async_call(
+                NUMBER_DOMAIN,
+                SERVICE_SET_VALUE,
+                {ATTR_ENTITY_ID: number, "value": value},
+                blocking=True,
+            )
+        assert hass.states.get(switch).state == "on"
+        assert hass.states.get(number).state == "16"
+        assert meter.writes == []
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+        await hass.async_block_till_done()
+
+    assert meter.writes == [{"sw,ENABLE CHARGING": "1", "inp,EVSE1": "16"}]
+    assert meter.requests - requests == {"updateSetting": 1}
+    assert hass.states.get(number).state == "16"
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
+
+
+@pytest.mark.asyncio
+async def test_pending_write_sent_on_unload(hass, caplog, socket_enabled) -> None:  # noqa: ANN001, ARG001
+    """Test that the last meter sends its pending write before the pool closes."""
+    meter = FakeMeter()
+    port = await meter.start()
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="meter",
+        title="Garage",
+        data={CONF_IP_ADDRESS: "127.0.0.1", CONF_PORT: port},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    switch = er.async_get(hass).async_get_entity_id(
+        SWITCH_DOMAIN, DOMAIN, "meter-sw_ENABLE_CHARGING"
+    )
+
+    await hass.services.async_call(
+        SWITCH_DOMAIN, SERVICE_TURN_ON, {ATTR_ENTITY_ID: switch}, blocking=True
+    )
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await meter.stop()
+
+    assert meter.writes == [{"sw,ENABLE CHARGING": "1"}]
+    assert "Changing the settings failed" not in caplog.text